@@ -1,4 +1,7 @@
 import pyttsx3
+from utils.logger import Logger
+
+logger = Logger.get_logger("accessibility")
 
 
 class Accessibility:
@@ -46,7 +49,7 @@ class Accessibility:
             self.engine.say(message)
             self.engine.runAndWait()
         except Exception as e:
-            print(f"Error in text-to-speech: {e}")
+            logger.error("Error in text-to-speech: %s", e)
 
     def stop(self):
         """Stops any ongoing speech."""
@@ -1,131 +1,202 @@
-import cv2
-import dlib
 import time
-from scipy.spatial import distance
-import pyautogui
+from utils.frame_bus import FrameBus
+from utils.perception import PerceptionStage
+import numpy as np
+from utils.landmarks import LandmarkModel, eye_aspect_ratio
+from utils.actuator import CursorActuator
+from utils.gestures import ActionDispatcher, GestureStateMachine
+from utils.blink_classifier import BlinkClassifier
+from utils.adaptive_threshold import AdaptiveEarThreshold
+from utils.visualizer import Visualizer
+from utils.models import DEFAULT_PREDICTOR_PATH, ModelRegistry
+from utils.logger import Logger
+
+logger = Logger.get_logger("blink_detector")
 
 
 class BlinkDetector:
     """Detects blinks and allows sensitivity adjustments."""
 
-    def __init__(self, blink_threshold=0.25, blink_duration=0.2, double_blink_interval=0.5):
-        # Load pre-trained models
-        self.detector = dlib.get_frontal_face_detector()
-        # self.predictor = dlib.shape_predictor("models/shape_predictor_68_face_landmarks.dat")  # Ensure model file is available
-        self.predictor = dlib.shape_predictor("models/shape_predictor_5_face_landmarks.dat")
-
-        # Eye landmark indices
-        self.left_eye_indices = [36, 37, 38, 39, 40, 41]
-        self.right_eye_indices = [42, 43, 44, 45, 46, 47]
+    def __init__(self, blink_threshold=0.25, blink_duration=0.2, double_blink_interval=0.5, long_blink_duration=2.0, actuator=None, adaptive_threshold=True,
+                 visualizer=None, predictor_path=DEFAULT_PREDICTOR_PATH, recalibrator=None):
+        # Pre-trained models are shared through the registry and loaded on first use
+        # predictor_path="models/shape_predictor_68_face_landmarks.dat" for the 68-point model
+        self.predictor_path = predictor_path
+        self._landmark_model = None  # Eye indices and openness measure, chosen from the predictor's point count
 
         # Blink detection parameters
         self.blink_threshold = blink_threshold
         self.blink_duration = blink_duration
         self.double_blink_interval = double_blink_interval
-
-        # State variables
-        self.last_blink_time = 0
-        self.blink_start_time = 0
-        self.is_blinking = False
+        self.long_blink_duration = long_blink_duration
+        self.classifier = BlinkClassifier(blink_threshold, blink_duration, double_blink_interval, long_blink_duration)
+
+        # Per-user threshold learned from the open-eye EAR; None keeps the threshold fixed
+        self.adaptive_threshold = AdaptiveEarThreshold(blink_threshold) if adaptive_threshold else None
+        self.last_ear = None
+
+        # Blinks become gesture events; their mouse actions run on the dispatcher thread
+        self.actuator = actuator if actuator is not None else CursorActuator()
+        self.gestures = GestureStateMachine()
+        self.dispatcher = ActionDispatcher(self.actuator)
+
+        # Optional OnlineRecalibrator shared with the eye tracker; each click refines the gaze mapping
+        self.recalibrator = recalibrator
+
+        # Debug window rendered on its own thread; Visualizer(mode="off") for headless runs
+        if visualizer is None:
+            visualizer = Visualizer("Blink Detector")
+        self.visualizer = visualizer
+
+    @property
+    def detector(self):
+        """Shared face detector, loaded on first use."""
+        return ModelRegistry.face_detector()
+
+    @property
+    def predictor(self):
+        """Shared landmark predictor, loaded on first use."""
+        return ModelRegistry.shape_predictor(self.predictor_path)
+
+    @property
+    def landmark_model(self):
+        """Topology of the loaded predictor; raises ValueError for unsupported models."""
+        if self._landmark_model is None:
+            self._landmark_model = LandmarkModel.for_points(self.predictor.num_parts)
+        return self._landmark_model
+
+    @property
+    def left_eye_indices(self):
+        return self.landmark_model.left_eye_indices
+
+    @property
+    def right_eye_indices(self):
+        return self.landmark_model.right_eye_indices
 
     def set_sensitivity(self, blink_threshold=None, blink_duration=None, double_blink_interval=None):
-        """Adjust sensitivity parameters."""
+        """Adjust sensitivity parameters. Setting a threshold by hand turns off adaptation."""
         if blink_threshold:
             self.blink_threshold = blink_threshold
+            self.adaptive_threshold = None
         if blink_duration:
             self.blink_duration = blink_duration
         if double_blink_interval:
             self.double_blink_interval = double_blink_interval
+        self.classifier.blink_threshold = self.blink_threshold
+        self.classifier.blink_duration = self.blink_duration
+        self.classifier.double_blink_interval = self.double_blink_interval
 
     def eye_aspect_ratio(self, eye_points):
         """Calculates the Eye Aspect Ratio (EAR) for an eye."""
-        vertical_1 = distance.euclidean(eye_points[1], eye_points[5])
-        vertical_2 = distance.euclidean(eye_points[2], eye_points[4])
-        horizontal = distance.euclidean(eye_points[0], eye_points[3])
-        ear = (vertical_1 + vertical_2) / (2.0 * horizontal)
-        return ear
-
-    def detect_blinks(self, landmarks):
-        """Calculates EAR and checks for blink status."""
-        left_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in self.left_eye_indices]
-        right_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in self.right_eye_indices]
-
-        left_ear = self.eye_aspect_ratio(left_eye)
-        right_ear = self.eye_aspect_ratio(right_eye)
-
-        # Average EAR for both eyes
-        avg_ear = (left_ear + right_ear) / 2.0
-        return avg_ear
-
-    def process_blink(self, blink_duration):
-        """Handles blink actions based on blink duration."""
-        if blink_duration < self.blink_duration:
-            self.process_single_blink()
-        elif self.blink_duration <= blink_duration < 2.0:  # Long blink threshold
+        return eye_aspect_ratio(eye_points)
+
+    def detect_blinks(self, landmarks, gray=None):
+        """
+        Calculates eye openness from an (N, 2) landmark array and checks for blink status.
+
+        This is the EAR for 68-point models. The 5-point model has no eyelid points, so
+        openness is measured from the grayscale frame around the eye corners instead.
+        Returns None if neither eye can be measured.
+        """
+        openness = self.landmark_model.eye_openness(landmarks, gray)
+        measured = openness[~np.isnan(openness)]
+        if measured.size == 0:
+            return None
+
+        # Average openness of both eyes
+        return float(measured.mean())
+
+    def process_blink(self, blink_event):
+        """Handles blink actions based on the classified blink."""
+        if blink_event.kind == "single":
+            self.process_single_blink(blink_event)
+        elif blink_event.kind == "double":
             self.process_double_blink()
-        else:
+        elif blink_event.kind == "long":
             self.process_long_blink()
 
-    def process_single_blink(self):
+    def dispatch_gesture(self, blink_kind):
+        """Feeds a classified blink to the gesture state machine and queues the resulting actions."""
+        for event in self.gestures.on_blink(blink_kind, time.monotonic()):
+            logger.info("Gesture: %s", event.kind)
+            self.dispatcher.dispatch(event)
+
+    def process_single_blink(self, blink_event=None):
         """Handles a single blink (e.g., left-click)."""
-        print("Single Blink Detected: Left Click")
-        pyautogui.click()
+        logger.info("Single Blink Detected: Left Click")
+        self.dispatch_gesture("single")
+
+        # Only a cursor the user put on the target by hand says where they were looking; a click
+        # where the tracker put the cursor would just restate the current correction
+        position = self.actuator.hand_position()
+        if self.recalibrator is not None and blink_event is not None and position is not None:
+            self.recalibrator.on_click(position[0], position[1], blink_event.start)
 
     def process_double_blink(self):
         """Handles a double blink (e.g., right-click)."""
-        print("Double Blink Detected: Right Click")
-        pyautogui.rightClick()
+        logger.info("Double Blink Detected: Right Click")
+        self.dispatch_gesture("double")
 
     def process_long_blink(self):
-        """Handles a long blink (e.g., drag-and-drop)."""
-        print("Long Blink Detected: Drag-and-Drop")
-        pyautogui.mouseDown()
-        time.sleep(0.5)  # Simulate dragging
-        pyautogui.mouseUp()
-
-    def run(self):
-        """Runs the blink detection loop."""
-        cap = cv2.VideoCapture(0)  # Start webcam capture
-        if not cap.isOpened():
-            print("Error: Webcam not accessible.")
+        """Handles a long blink: presses the button to start a drag; the next blink drops."""
+        logger.info("Long Blink Detected: Drag-and-Drop")
+        self.dispatch_gesture("long")
+
+    def process_perception(self, result):
+        """Updates the blink state from a shared perception result and returns the EAR."""
+        # Detect blinks, timed by the frame's capture timestamp
+        ear = self.detect_blinks(result.landmarks, result.gray) if result.landmarks is not None else None
+        if ear is None:
+            # No eyes to measure: a pending single blink may still be due, but a closure can't span the gap
+            for blink_event in self.classifier.interrupt(result.timestamp):
+                self.process_blink(blink_event)
+            return None
+        self.last_ear = ear
+        if self.adaptive_threshold is not None:
+            self.blink_threshold = self.classifier.blink_threshold = self.adaptive_threshold.update(ear)
+        for blink_event in self.classifier.update(ear, result.timestamp):
+            self.process_blink(blink_event)
+        return ear
+
+    def run(self, device_index=0, frame_bus=None, perception=None):
+        """Runs the blink detection loop, reading results from a shared perception stage if given."""
+        owns_bus = frame_bus is None
+        if owns_bus:
+            frame_bus = FrameBus(device_index)  # Start webcam capture
+        owns_perception = perception is None
+        if owns_perception:
+            perception = PerceptionStage(frame_bus, self.detector, self.predictor, mode="track")
+        subscription = perception.subscribe()
+        if not perception.start():
+            subscription.close()
             return
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Failed to capture frame.")
-                break
-
-            # Convert frame to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-            # Detect faces
-            faces = self.detector(gray)
-            for face in faces:
-                # Predict facial landmarks
-                landmarks = self.predictor(gray, face)
-
-                # Detect blinks
-                ear = self.detect_blinks(landmarks)
-
-                # Check EAR threshold for blink detection
-                if ear < self.blink_threshold:  # Eye closed
-                    if not self.is_blinking:
-                        self.is_blinking = True
-                        self.blink_start_time = time.time()
-                else:  # Eye open
-                    if self.is_blinking:
-                        self.is_blinking = False
-                        blink_duration = time.time() - self.blink_start_time
-                        self.process_blink(blink_duration)
-
-            # Display the frame for debugging
-            cv2.putText(frame, f"Blink Threshold: {self.blink_threshold}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            cv2.imshow("Blink Detector", frame)
-
-            # Break loop on 'q' key press
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
-
-        cap.release()
-        cv2.destroyAllWindows()
+        self.visualizer.eye_indices = (self.left_eye_indices, self.right_eye_indices)
+        self.visualizer.start()
+        while not self.visualizer.quit_requested.is_set():  # 'q' in the debug window
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                if not perception.is_running():
+                    break
+                continue
+
+            # Detection and landmarks are computed once by the perception stage
+            self.process_perception(result)
+
+            if self.visualizer.enabled:
+                status = [(f"Blink Threshold: {self.blink_threshold:.3f}", (0, 255, 0))]
+                if self.last_ear is not None:
+                    status.append((f"EAR: {self.last_ear:.3f}", (0, 255, 0)))
+                if self.adaptive_threshold is not None:
+                    stats = self.adaptive_threshold.summary()
+                    status.append((f"Open-eye EAR: {stats['baseline']:.3f} +/- {stats['deviation']:.3f} (n={stats['samples']})", (0, 255, 0)))
+                self.visualizer.submit(result, status)
+
+        self.visualizer.stop()
+        for event in self.gestures.reset():  # Never leave the button held down
+            self.dispatcher.dispatch(event)
+        subscription.close()
+        if owns_perception:
+            perception.stop()
+        if owns_bus:
+            frame_bus.stop()
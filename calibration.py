@@ -3,16 +3,28 @@ import numpy as np
 import os
 from screeninfo import get_monitors
 from utils.homography import HomographyManager
+from utils.calibration_engine import CalibrationEngine, format_calibration_report
+from utils.calibration_store import camera_id
+from utils.frame_bus import FrameBus
+from utils.perception import PerceptionStage
 from eye_tracker import EyeTracker  # Import EyeTracker for gaze input
 import time
+from utils.logger import Logger
+
+logger = Logger.get_logger("calibration")
 
 
 class Calibration:
     """Handles calibration for accurate gaze tracking."""
 
     @staticmethod
-    def run_calibration():
-        """Runs the calibration process."""
+    def run_calibration(device_index=0, frame_bus=None, perception=None, eye_tracker=None):
+        """
+        Runs the calibration process, reading results from a shared perception stage if given.
+
+        Returns:
+            CalibrationResult: The fitted mapping and its per-target residuals, or None on failure.
+        """
         # Setup screen dimensions
         monitor = get_monitors()[0]
         window_width, window_height = monitor.width // 2, monitor.height // 2
@@ -33,15 +45,29 @@ class Calibration:
             (3 * window_width // 4, 3 * window_height // 4),
         ]
 
-        detected_gaze_points = []
-        eye_tracker = EyeTracker()  # Initialize EyeTracker for real gaze input
-        cap = cv2.VideoCapture(0)  # Start webcam capture
-
-        if not cap.isOpened():
-            print("Error: Camera not accessible for calibration.")
-            return
-
-        print("Follow the green dots with your eyes. Press SPACE to capture, or wait 2 seconds.")
+        # Targets are registered in screen coordinates, where the mapped cursor lands
+        offset_x, offset_y = monitor.width // 4, monitor.height // 4
+        engine = CalibrationEngine()
+        for x, y in grid_points:
+            engine.add_target((x + offset_x, y + offset_y))
+
+        if eye_tracker is None:
+            eye_tracker = EyeTracker()  # Initialize EyeTracker for real gaze input
+        owns_bus = frame_bus is None
+        if owns_bus:
+            frame_bus = FrameBus(device_index)  # Start webcam capture
+        owns_perception = perception is None
+        if owns_perception:
+            perception = PerceptionStage(frame_bus, eye_tracker.detector, eye_tracker.predictor)
+        subscription = perception.subscribe()
+
+        if not perception.start():
+            subscription.close()
+            logger.error("Camera not accessible for calibration.")
+            return None
+
+        resolution = None
+        logger.info("Follow the green dots with your eyes. Press SPACE to capture, or wait 2 seconds.")
 
         # Iterate through each calibration point
         for i, point in enumerate(grid_points):
@@ -50,43 +76,58 @@ class Calibration:
             cv2.putText(frame, f"Look at the dot ({i+1}/{len(grid_points)}).", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
             cv2.imshow("Calibration", frame)
 
-            # Initialize gaze position capture
+            # Collect raw per-frame samples; the engine rejects outliers when fitting
             start_time = time.time()
-            gaze_x, gaze_y = 0, 0
-            gaze_samples = []
+            sample_count = 0
 
             while time.time() - start_time < 2:  # Capture gaze for 2 seconds
-                ret, camera_frame = cap.read()
-                if not ret:
+                result = subscription.get(timeout=0.1)
+                if result is None:
                     continue
-                gray = cv2.cvtColor(camera_frame, cv2.COLOR_BGR2GRAY)
+                resolution = (result.gray.shape[1], result.gray.shape[0])
 
-                # Get gaze position
-                gaze_position = eye_tracker.calculate_gaze_position(gray)
+                # Get gaze position from the shared detection result
+                gaze_position = eye_tracker.gaze_from_perception(result) if result.landmarks is not None else None
                 if gaze_position:
-                    gaze_samples.append(gaze_position)
+                    engine.add_sample(i, gaze_position)
+                    sample_count += 1
 
                 if cv2.waitKey(1) & 0xFF == ord(" "):  # Press SPACE to confirm point
                     break
 
-            # Average the gaze samples for stability
-            if gaze_samples:
-                avg_gaze = np.mean(gaze_samples, axis=0)
-                detected_gaze_points.append(avg_gaze)
-                print(f"Captured gaze point {i + 1}: {avg_gaze}")
+            if sample_count:
+                logger.info("Captured %d gaze samples for point %d.", sample_count, i + 1)
             else:
-                print(f"Failed to capture gaze for point {i + 1}. Using fallback center point.")
-                detected_gaze_points.append(point)  # Fallback to grid point
+                logger.warning("Failed to capture gaze for point %d; it will be left out of the fit.", i + 1)
 
-        cap.release()
+        subscription.close()
+        if owns_perception:
+            perception.stop()
+        if owns_bus:
+            frame_bus.stop()
         cv2.destroyWindow("Calibration")
 
-        # Save homography matrix
-        if len(detected_gaze_points) >= 4:
-            HomographyManager.save_homography_matrix(grid_points, detected_gaze_points)
-            print("Calibration complete.")
-        else:
-            print("Error: Not enough valid points for homography calculation.")
+        # Fit every mapping model and keep the most accurate one
+        try:
+            result = engine.fit()
+        except ValueError as e:
+            logger.error("Calibration failed: %s", e)
+            return None
+
+        logger.info("Calibration residuals:\n%s", format_calibration_report(result))
+
+        # Stored for this user, camera and monitor layout; a running tracker switches to it
+        key = eye_tracker.calibration_key._replace(camera=camera_id(perception.frame_bus.device_index))
+        eye_tracker.calibration_store.save(key, result.model, resolution, result.residuals[result.kind], result.rms[result.kind],
+                                           features=eye_tracker.gaze_features)
+        eye_tracker.use_calibration(camera=perception.frame_bus.device_index)
+
+        # The homography of image positions is still saved for tools that read the legacy matrix
+        valid = ~np.isnan(result.gaze_points[:, 0])
+        if eye_tracker.gaze_features == "image" and valid.sum() >= 4:
+            HomographyManager.save_homography_matrix(result.targets[valid], result.gaze_points[valid])
+        logger.info("Calibration complete.")
+        return result
 
     @staticmethod
     def map_gaze_to_screen(gaze_point):
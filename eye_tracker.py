@@ -1,18 +1,41 @@
-import cv2
-import dlib
-import pyautogui
+import time
 import numpy as np
 from screeninfo import get_monitors
 from utils.homography import HomographyManager
+from utils.calibration_store import CalibrationKey, CalibrationStore, CalibrationWatcher, camera_id, layout_id
+from utils.frame_bus import FrameBus
+from utils.perception import PerceptionStage
+from utils.landmarks import LandmarkModel
+from utils.head_pose import HeadPoseEstimator
+from utils.pupil import PupilLocator
+from utils.smoothing import create_filter
+from utils.pipeline import StageLatency, format_latency_report
+from utils.actuator import CursorActuator
+from utils.metrics import MetricsRegistry
+from utils.visualizer import Visualizer
+from utils.models import DEFAULT_PREDICTOR_PATH, ModelRegistry, ThreadLocalModel
+from utils.logger import Logger
+
+logger = Logger.get_logger("eye_tracker")
 
 
 class EyeTracker:
     """Handles real-time eye tracking and cursor control."""
 
-    def __init__(self):
-        # Load pre-trained models
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor("models/shape_predictor_5_face_landmarks.dat")
+    def __init__(self, cursor_filter="one_euro", actuator=None, metrics=None, visualizer=None, predictor_path=DEFAULT_PREDICTOR_PATH,
+                 user="default", calibration_store=None, recalibrator=None, head_pose=True, pupils=True):
+        # Pre-trained models are shared through the registry and loaded on first use
+        self.predictor_path = predictor_path
+        self._frame_perception = None
+        self._landmark_model = None  # Eye indices and features, chosen from the predictor's point count
+        self._head_pose = None
+
+        # Gaze input, named for the calibration store: head pose angles that ignore head translation
+        # and/or pupil positions within the eye, or raw "image" eye landmark positions
+        self.gaze_features = {(True, True): "head_pose_pupil", (True, False): "head_pose",
+                              (False, True): "pupil", (False, False): "image"}[(bool(head_pose), bool(pupils))]
+        self.pupils = pupils
+        self.pupil_locator = ThreadLocalModel(PupilLocator)  # Crop buffers are per thread
 
         # Initialize screen dimensions for multi-monitor setups
         self.monitors = get_monitors()
@@ -22,121 +45,321 @@ class EyeTracker:
         # State variables for active monitor detection
         self.active_monitor = self.monitors[0]
 
-        # Load homography matrix from calibration
+        # Smoothing between gaze mapping and cursor output
+        self.cursor_filter = create_filter(cursor_filter)
+
+        # Cursor output runs on the actuator's own thread; created on first run if not shared
+        self.actuator = actuator
+
+        # Pipeline stage latencies owned by the tracker
+        self.map_latency = StageLatency("map")
+
+        # Instrumentation shared with the overlay, the periodic log line and the exporter
+        self.metrics = metrics if metrics is not None else MetricsRegistry.default()
+        self.metrics.register_stage(self.map_latency)
+        self.face_lost = self.metrics.counter("face_lost", "Transitions from a tracked face to no face.")
+        self.homography_failures = self.metrics.counter("homography_failures", "Gaze points the calibrated mapping could not map.")
+
+        # Debug window rendered on its own thread; Visualizer(mode="off") for headless runs
+        if visualizer is None:
+            visualizer = Visualizer("Eye Tracker", metrics=self.metrics)
+        self.visualizer = visualizer
+
+        # Optional OnlineRecalibrator, shared with the blink detector, that refines the mapping from clicks
+        self.recalibrator = recalibrator
+
+        # Calibrations are stored per user, camera and monitor layout; the watcher swaps in
+        # a recalibrated mapping while the loop runs
+        self.calibration_store = calibration_store if calibration_store is not None else CalibrationStore()
+        self.calibration_key = CalibrationKey(user, camera_id(0), layout_id(self.monitors))
+        self.calibration = None
+        self.homography_matrix = None
+        self.gaze_mapper = self.load_gaze_mapper()
+        self.calibration_watcher = CalibrationWatcher(self.calibration_store, self.calibration_key, self.apply_calibration)
+
+    @property
+    def detector(self):
+        """Shared face detector, loaded on first use."""
+        return ModelRegistry.face_detector()
+
+    @property
+    def predictor(self):
+        """Shared landmark predictor, loaded on first use."""
+        return ModelRegistry.shape_predictor(self.predictor_path)
+
+    @property
+    def landmark_model(self):
+        """Topology of the loaded predictor; raises ValueError for unsupported models."""
+        if self._landmark_model is None:
+            self._landmark_model = LandmarkModel.for_points(self.predictor.num_parts)
+        return self._landmark_model
+
+    @property
+    def head_pose(self):
+        """Head pose estimator for the loaded predictor, created on first use."""
+        if self._head_pose is None:
+            self._head_pose = HeadPoseEstimator(self.landmark_model)
+        return self._head_pose
+
+    @property
+    def left_eye_indices(self):
+        return self.landmark_model.left_eye_indices
+
+    @property
+    def right_eye_indices(self):
+        return self.landmark_model.right_eye_indices
+
+    @property
+    def frame_perception(self):
+        """Perception stage for synchronous single-frame use."""
+        if self._frame_perception is None:
+            self._frame_perception = PerceptionStage(None, self.detector, self.predictor)
+        return self._frame_perception
+
+    def load_gaze_mapper(self):
+        """Loads the stored calibration for the current key, or the legacy homography."""
+        try:
+            entry = self.calibration_store.load(self.calibration_key)
+        except (KeyError, ValueError) as e:
+            logger.warning("Error loading calibration for %s: %s", "/".join(self.calibration_key), e)
+            entry = None
+        if entry is not None and self.apply_calibration(entry):
+            return entry.model
+
+        self.calibration = None
+        if self.gaze_features != "image":
+            # The legacy homography maps image positions, not head-relative angles
+            logger.warning("No calibration for %s. Run calibration first.", "/".join(self.calibration_key))
+            return None
         self.homography_matrix = self.load_homography_matrix()
+        return HomographyManager.compile(self.homography_matrix)
+
+    def apply_calibration(self, entry):
+        """
+        Makes a stored calibration the active mapping; safe to call while the loop runs.
+
+        Returns:
+            bool: False if the calibration was made for other gaze features and was not applied.
+        """
+        features = entry.metadata.get("features", "image")
+        if features != self.gaze_features:
+            logger.warning("Calibration for %s maps %s features but the tracker uses %s; recalibrate.",
+                           "/".join(entry.key), features, self.gaze_features)
+            return False
+        self.calibration = entry
+        self.gaze_mapper = entry.model  # A single assignment, so the loop sees the old or the new mapping
+        if self.recalibrator is not None:
+            self.recalibrator.reset()  # Corrections learned on the old mapping don't apply to the new one
+        logger.info("Using %s calibration for %s.", entry.model.kind, "/".join(entry.key))
+        return True
+
+    def use_calibration(self, user=None, camera=None):
+        """
+        Switches to, or reloads, the calibration of a user and camera without restarting capture.
+
+        Args:
+            user (str): User name; unchanged if None.
+            camera (int or str): Camera index or recording path; unchanged if None.
+        """
+        key = self.calibration_key
+        if user is not None:
+            key = key._replace(user=user)
+        if camera is not None:
+            key = key._replace(camera=camera_id(camera))
+        self.calibration_key = key
+        self.calibration_watcher.watch(key)
+        self.gaze_mapper = self.load_gaze_mapper()
 
     def load_homography_matrix(self):
         """Loads the homography matrix saved during calibration."""
         try:
             matrix_path = "calibration_data/homography_matrix.npy"
             homography_matrix = np.load(matrix_path)
-            print("Homography matrix loaded successfully.")
+            logger.info("Homography matrix loaded successfully.")
             return homography_matrix
         except FileNotFoundError:
-            print("Homography matrix not found. Run calibration first.")
+            logger.warning("Homography matrix not found. Run calibration first.")
             return None
 
     def get_eye_region(self, landmarks, eye_indices):
-        """Extracts the eye region from the facial landmarks."""
+        """Extracts the eye region from an (N, 2) landmark array."""
         try:
             if landmarks is None:
                 raise ValueError("No landmarks detected.")
-            eye_points = [(landmarks.part(i).x, landmarks.part(i).y) for i in eye_indices]
-            return np.array(eye_points)
+            return landmarks[eye_indices]
         except (IndexError, ValueError) as e:
-            print(f"Error extracting eye region: {e}")
+            logger.warning("Error extracting eye region: %s", e)
             return np.array([])
 
+    def gaze_from_perception(self, result):
+        """
+        Calculates the gaze input from a shared perception result.
+
+        With head pose compensation this is the head direction plus the eyes' rotation
+        in the head, in degrees, taken from the pupils when they are located. With pupils
+        alone it is the mean pupil position in the eye boxes; otherwise the average eye
+        landmark position in the image. Returns None when no pupil is visible.
+        """
+        if self.gaze_features != "image":
+            pupil_centers = None
+            if self.pupils:
+                corners = self.landmark_model.eye_corners(result.landmarks)
+                pupils = self.pupil_locator.get().locate_both(result.gray, corners)
+                found = [pupil for pupil in pupils if pupil is not None]
+                if not found:
+                    return None
+                if self.gaze_features == "pupil":
+                    return tuple(np.mean([box for box, _ in found], axis=0).tolist())
+                pupil_centers = self.pupil_centers(pupils, corners)
+            return self.head_pose.gaze_angles(result.landmarks, result.gray.shape, pupil_centers)
+        try:
+            centroids = self.landmark_model.eye_centers(result.landmarks)
+        except IndexError as e:
+            logger.warning("Error extracting eye region: %s", e)
+            return None
+
+        # Average of both eye centroids
+        gaze_x, gaze_y = centroids.mean(axis=0)
+        return gaze_x, gaze_y
+
+    @staticmethod
+    def pupil_centers(pupils, corners):
+        """
+        Returns (2, 2) [left, right] pupil centers in the image.
+
+        An eye whose pupil was not found borrows the other eye's offset from its corner
+        midpoint, as both eyes look the same way.
+        """
+        midpoints = corners.mean(axis=1)
+        offsets = [np.subtract(pupil[1], midpoint) for pupil, midpoint in zip(pupils, midpoints) if pupil is not None]
+        mean_offset = np.mean(offsets, axis=0)
+        return np.array([pupil[1] if pupil is not None else midpoint + mean_offset for pupil, midpoint in zip(pupils, midpoints)])
+
     def calculate_gaze_position(self, gray_frame):
         """Calculates the average gaze position."""
-        faces = self.detector(gray_frame)
-        for face in faces:
-            landmarks = self.predictor(gray_frame, face)
-            left_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in [36, 37, 38, 39, 40, 41]])
-            right_eye = np.array([(landmarks.part(i).x, landmarks.part(i).y) for i in [42, 43, 44, 45, 46, 47]])
-
-            if left_eye.size and right_eye.size:
-                gaze_x = (np.mean(left_eye[:, 0]) + np.mean(right_eye[:, 0])) / 2
-                gaze_y = (np.mean(left_eye[:, 1]) + np.mean(right_eye[:, 1])) / 2
-                return gaze_x, gaze_y
-        return None
+        result = self.frame_perception.process(gray_frame)
+        if result.landmarks is None:
+            return None
+        return self.gaze_from_perception(result)
 
     def calculate_gaze(self, eye_region):
-        """Calculates the average position of the pupil in the eye region."""
+        """Calculates the average position of the eye region landmarks."""
         if eye_region.size > 0:
             return np.mean(eye_region[:, 0]), np.mean(eye_region[:, 1])
         return None, None
 
-    def map_gaze_to_screen(self, gaze_x, gaze_y):
-        """Maps gaze coordinates to screen coordinates using the homography matrix."""
-        try:
-            if self.homography_matrix is None:
-                raise ValueError("Homography matrix not loaded. Run calibration first.")
-            gaze_point = np.array([[gaze_x, gaze_y]], dtype=np.float32).reshape(1, 1, 2)
-            transformed_point = cv2.perspectiveTransform(gaze_point, self.homography_matrix)
-            screen_x, screen_y = transformed_point[0][0]
-            return int(screen_x), int(screen_y)
-        except Exception as e:
-            print(f"Error mapping gaze to screen: {e}")
-            return None, None
+    def map_gaze_to_screen(self, gaze_x, gaze_y, timestamp=None):
+        """
+        Maps gaze coordinates to screen coordinates using the calibrated mapping.
 
-    def run(self, device_index=0):
-        """Runs the eye tracking loop."""
-        cap = cv2.VideoCapture(device_index)  # Open selected camera
-        if not cap.isOpened():
-            print(f"Error: Camera device {device_index} not accessible.")
-            return
-
-        left_eye_indices = [36, 37, 38, 39, 40, 41]
-        right_eye_indices = [42, 43, 44, 45, 46, 47]
+        With a recalibrator, the mapped point is recorded under the frame's capture
+        `timestamp` for pairing with later clicks, and the learned correction is applied.
+        """
+        if self.gaze_mapper is None:
+            return None, None
+        screen_point = self.gaze_mapper.map_point(gaze_x, gaze_y)
+        if screen_point is None:
+            return None, None
+        if self.recalibrator is not None:
+            if timestamp is not None:
+                self.recalibrator.observe(timestamp, *screen_point)
+            screen_point = self.recalibrator.correct(*screen_point)
+        return int(screen_point[0]), int(screen_point[1])
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("Error: Failed to capture frame.")
-                break
+    def latency_report(self, perception):
+        """Formats per-stage latency for the capture, detect, map and actuate stages."""
+        stages = [perception.frame_bus.latency, perception.latency, self.map_latency]
+        if self.actuator is not None:
+            stages += [self.actuator.latency, self.actuator.glass_to_cursor_latency]
+        return format_latency_report(stages)
 
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.detector(gray)
-            for face in faces:
-                # Predict facial landmarks
-                landmarks = self.predictor(gray, face)
+    def register_metrics(self, perception, subscription):
+        """Registers the pipeline stage latencies and dropped-frame gauges of one run."""
+        for stage in (perception.frame_bus.latency, perception.latency, self.actuator.latency, self.actuator.glass_to_cursor_latency):
+            self.metrics.register_stage(stage)
+        frame_subscription = perception.frame_subscription
+        self.metrics.register_gauge("dropped_frames", lambda: frame_subscription.dropped if frame_subscription else 0)
+        self.metrics.register_gauge("dropped_results", lambda: subscription.dropped)
+        if self.recalibrator is not None:
+            self.metrics.register_gauge("recalibration_clicks", lambda: self.recalibrator.samples_accepted)
 
-                # Extract and calculate gaze positions
-                left_eye = self.get_eye_region(landmarks, left_eye_indices)
-                right_eye = self.get_eye_region(landmarks, right_eye_indices)
+    def run(self, device_index=0, frame_bus=None, perception=None):
+        """
+        Runs the eye tracking pipeline.
 
-                if left_eye.size == 0 or right_eye.size == 0:
-                    print("Eye region not detected. Skipping frame.")
-                    continue
+        Capture and detection run on the frame bus and perception stage threads, gaze
+        mapping runs on this thread, and cursor output runs on the actuator thread,
+        which coalesces moves and caps their rate, so no stage waits on another. The
+        debug window, if enabled, is drawn by the visualizer's render thread.
+        """
+        owns_bus = frame_bus is None
+        if owns_bus:
+            frame_bus = FrameBus(device_index)  # Open selected camera
+        owns_perception = perception is None
+        if owns_perception:
+            perception = PerceptionStage(frame_bus, self.detector, self.predictor, mode="track")
+        subscription = perception.subscribe(capacity=1)
+        if not perception.start():
+            subscription.close()
+            return
 
-                left_gaze_x, left_gaze_y = self.calculate_gaze(left_eye)
-                right_gaze_x, right_gaze_y = self.calculate_gaze(right_eye)
+        if self.actuator is None:
+            self.actuator = CursorActuator()
+        self.use_calibration(camera=perception.frame_bus.device_index)
+        self.calibration_watcher.start()
+        self.register_metrics(perception, subscription)
+        self.visualizer.eye_indices = (self.left_eye_indices, self.right_eye_indices)
+        self.visualizer.start()
 
-                if None in (left_gaze_x, left_gaze_y, right_gaze_x, right_gaze_y):
-                    continue
+        face_present = False
+        while not self.visualizer.quit_requested.is_set():  # 'q' in the debug window
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                if not perception.is_running():
+                    break
+                continue
 
-                # Average the gaze positions
-                gaze_x = (left_gaze_x + right_gaze_x) / 2
-                gaze_y = (left_gaze_y + right_gaze_y) / 2
+            status = ()
+            if result.landmarks is None:
+                self.cursor_filter.reset()  # Don't smooth across a lost face
+                if face_present:
+                    self.face_lost.inc()
+                face_present = False
+            else:
+                face_present = True
+                start_time = time.perf_counter()
+                gaze = self.gaze_from_perception(result)
+                if gaze is None:
+                    logger.warning("Eye region not detected. Skipping frame.")
+                else:
+                    gaze_x, gaze_y = gaze
 
-                # Map gaze coordinates to screen
-                screen_x, screen_y = self.map_gaze_to_screen(gaze_x, gaze_y)
-                if screen_x is not None and screen_y is not None:
-                    # Clamp the cursor position to the screen bounds
-                    screen_x = min(max(0, screen_x), self.screen_width)
-                    screen_y = min(max(0, screen_y), self.screen_height)
-                    pyautogui.moveTo(screen_x, screen_y)
+                    # Map gaze coordinates to screen
+                    screen_x, screen_y = self.map_gaze_to_screen(gaze_x, gaze_y, result.timestamp)
+                    if screen_x is not None and screen_y is not None:
+                        filtered_x, filtered_y = self.cursor_filter.filter(screen_x, screen_y, result.timestamp)
+                        screen_x, screen_y = int(filtered_x), int(filtered_y)
 
-                # Visualize for debugging
-                cv2.putText(frame, f"Gaze: ({gaze_x:.1f}, {gaze_y:.1f})", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                cv2.putText(frame, f"Screen: ({screen_x}, {screen_y})", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+                        # Clamp the cursor position to the screen bounds
+                        screen_x = min(max(0, screen_x), self.screen_width)
+                        screen_y = min(max(0, screen_y), self.screen_height)
+                        self.actuator.move(screen_x, screen_y, result.timestamp)
+                    else:
+                        self.homography_failures.inc()
+                    self.map_latency.record_since(start_time)
 
-            cv2.imshow("Eye Tracker", frame)
+                    if self.visualizer.enabled:
+                        status = ((f"Gaze: ({gaze_x:.1f}, {gaze_y:.1f})", (0, 255, 0)), (f"Screen: ({screen_x}, {screen_y})", (255, 0, 0)))
 
-            # Break loop on 'q' key press
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+            # Drawn and shown later on the render thread, at its own capped rate
+            self.visualizer.submit(result, status)
 
-        cap.release()
-        cv2.destroyAllWindows()
+        self.visualizer.stop()
+        self.calibration_watcher.stop()
+        subscription.close()
+        logger.info("Stage latency:\n%s", self.latency_report(perception))
+        logger.info("Cursor filter (%s): %s", self.cursor_filter.name, self.cursor_filter.metrics.summary())
+        if owns_perception:
+            perception.stop()
+        if owns_bus:
+            frame_bus.stop()
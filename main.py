@@ -1,41 +1,131 @@
 import tkinter as tk
 from tkinter import messagebox, ttk, Menu
-from calibration import Calibration
-from eye_tracker import EyeTracker
-from blink_detector import BlinkDetector
-from accessibility import Accessibility
-from utils.tray_icon import TrayIcon
 from utils.test_runner import TestRunner  # Import TestRunner
 from utils.camera_manager import CameraDeviceManager
-import keyboard
-from pystray import Icon, Menu as SysMenu, MenuItem
-from PIL import Image
+from utils.online_calibration import OnlineRecalibrator
+from utils.logger import Logger
+from utils.metrics import MetricsExporter
+from utils.models import ModelRegistry
 import threading
 import os
 
+# cv2, dlib, pyautogui, pyttsx3, keyboard, pystray and PIL are imported where first used,
+# so the window appears before they load; preload() warms them up in the background.
+
+logger = Logger.get_logger("main")
+
 
 class EyeTrackingApp:
     """Main application to integrate all modules."""
 
     def __init__(self):
-        self.eye_tracker = EyeTracker()
-        self.blink_detector = BlinkDetector()
-        self.accessibility = Accessibility()
+        self.recalibrator = OnlineRecalibrator()  # Blink clicks refine the tracker's gaze mapping
+        self._actuator = None
+        self._eye_tracker = None
+        self._blink_detector = None
+        self._accessibility = None
+        self.component_lock = threading.RLock()  # Components create the shared actuator while holding it
         self.is_tracking = False
         self.tray_icon = None
         self.tracking_thread = None
         self.quit_to_tray = None
         self.selected_device = None
+        self.frame_bus = None
+        self.perception = None
+        Logger.setup_logger()  # Console and app.log, written off the tracking threads
+        self.metrics_exporter = MetricsExporter()  # Periodic log line and metrics.prom dump
+        self.metrics_exporter.start()
+
+    @property
+    def actuator(self):
+        """One output thread shared by cursor moves and clicks, created on first use (imports pyautogui)."""
+        with self.component_lock:
+            if self._actuator is None:
+                from utils.actuator import CursorActuator
+                self._actuator = CursorActuator()
+            return self._actuator
+
+    @property
+    def eye_tracker(self):
+        """The eye tracker, created on first use."""
+        with self.component_lock:
+            if self._eye_tracker is None:
+                from eye_tracker import EyeTracker
+                self._eye_tracker = EyeTracker(actuator=self.actuator, recalibrator=self.recalibrator)
+            return self._eye_tracker
+
+    @property
+    def blink_detector(self):
+        """The blink detector, created on first use."""
+        with self.component_lock:
+            if self._blink_detector is None:
+                from blink_detector import BlinkDetector
+                self._blink_detector = BlinkDetector(actuator=self.actuator, recalibrator=self.recalibrator)
+            return self._blink_detector
+
+    @property
+    def accessibility(self):
+        """Voice feedback, created on first use; speech engines must stay on the GUI thread."""
+        if self._accessibility is None:
+            from accessibility import Accessibility
+            self._accessibility = Accessibility()
+        return self._accessibility
+
+    def preload(self, root):
+        """Loads models and pipeline modules in the background once the window is showing."""
+        def load():
+            try:
+                ModelRegistry.preload().join()
+                self.actuator
+                self.eye_tracker
+                self.blink_detector
+                logger.info("Models:\n%s", ModelRegistry.format_report())
+            except Exception as e:
+                logger.error("Error preloading components: %s", e)
+
+        threading.Thread(target=load, daemon=True).start()
+        root.after(500, lambda: self.accessibility)  # Text-to-speech init on the GUI thread, after first paint
+
+    def get_device_index(self):
+        """Parse the camera index from the selected device label."""
+        try:
+            return int(self.selected_device.get().split("Index ")[1].rstrip(")"))
+        except (AttributeError, IndexError, ValueError):
+            return 0
+
+    def get_frame_bus(self):
+        """Return the shared frame bus for the selected camera, starting it if needed."""
+        device_index = self.get_device_index()
+        if self.frame_bus is None or self.frame_bus.device_index != device_index or not self.frame_bus.is_running():
+            if self.frame_bus is not None:
+                self.frame_bus.stop()
+            from utils.frame_bus import FrameBus
+            self.frame_bus = FrameBus(device_index)
+            self.frame_bus.start()
+        return self.frame_bus
+
+    def get_perception(self):
+        """Return the shared perception stage, so detection runs once per frame for all consumers."""
+        frame_bus = self.get_frame_bus()
+        if self.perception is None or self.perception.frame_bus is not frame_bus or not self.perception.is_running():
+            if self.perception is not None:
+                self.perception.stop()
+            from utils.perception import PerceptionStage
+            self.perception = PerceptionStage(frame_bus, self.eye_tracker.detector, self.eye_tracker.predictor, mode="track", workers=2)
+            self.perception.start()
+        return self.perception
 
     def start_tracking(self):
         """Start eye tracking."""
         if not self.is_tracking:
             try:
                 self.is_tracking = True
-                device_index = int(self.selected_device.get().split("Index ")[1].rstrip(")"))
+                perception = self.get_perception()
                 self.accessibility.speak("Starting eye tracking.")
-                print(f"Starting Eye Tracking on {self.selected_device.get()}...")
-                self.tracking_thread = threading.Thread(target=self.eye_tracker.run, args=(device_index,), daemon=True)
+                logger.info("Starting Eye Tracking on %s...", self.selected_device.get())
+                self.tracking_thread = threading.Thread(
+                    target=self.eye_tracker.run, args=(perception.frame_bus.device_index, perception.frame_bus, perception), daemon=True
+                )
                 self.tracking_thread.start()
             except Exception as e:
                 self.accessibility.speak("Error occurred while starting eye tracking.")
@@ -45,8 +135,9 @@ class EyeTrackingApp:
         """Start blink detection."""
         try:
             self.accessibility.speak("Starting blink detection.")
-            print("Starting Blink Detection...")
-            self.blink_detector.run()
+            logger.info("Starting Blink Detection...")
+            perception = self.get_perception()
+            self.blink_detector.run(perception.frame_bus.device_index, perception.frame_bus, perception)
         except Exception as e:
             self.accessibility.speak("Error occurred while starting blink detection.")
             messagebox.showerror("Error", f"An error occurred: {e}")
@@ -55,8 +146,10 @@ class EyeTrackingApp:
         """Run the calibration module."""
         try:
             self.accessibility.speak("Starting calibration.")
-            print("Running Calibration...")
-            Calibration.run_calibration()
+            logger.info("Running Calibration...")
+            perception = self.get_perception()
+            from calibration import Calibration
+            Calibration.run_calibration(perception.frame_bus.device_index, perception.frame_bus, perception, self.eye_tracker)
         except Exception as e:
             self.accessibility.speak("Calibration failed.")
             messagebox.showerror("Error", f"Calibration failed: {e}")
@@ -65,20 +158,31 @@ class EyeTrackingApp:
         """Stop the tracking system gracefully."""
         if self.is_tracking:
             self.is_tracking = False
+            if self.perception is not None:
+                self.perception.stop()
+            if self.frame_bus is not None:
+                self.frame_bus.stop()  # Ends every loop reading from the shared camera
             self.accessibility.speak("Stopping tracking.")
-            print("Tracking stopped.")
+            logger.info("Tracking stopped.")
             messagebox.showinfo("Info", "Tracking stopped.")
 
     def quit_app(self):
         """Quit the application."""
         self.stop_tracking()
+        if self._actuator is not None:
+            self._actuator.stop()
+        self.metrics_exporter.stop()
         if self.tray_icon:
             self.tray_icon.stop()
-        print("Application exited.")
+        logger.info("Application exited.")
+        Logger.shutdown()  # Flush queued records before the forced exit
         os._exit(0)  # Forcefully exit the program
 
     def create_tray_icon(self, root):
         """Create a system tray icon for the application."""
+        from pystray import Icon, Menu as SysMenu, MenuItem
+        from utils.tray_icon import TrayIcon
+
         icon_image = TrayIcon.load_tray_icon()
 
         # Define system tray menu options
@@ -109,7 +213,7 @@ class EyeTrackingApp:
         if root.state() == "withdrawn":
             root.deiconify()
             self.accessibility.speak("Window restored.")
-            print("Window restored from system tray.")
+            logger.info("Window restored from system tray.")
 
     def run_tray_icon(self, root):
         """Run the tray icon in a separate thread."""
@@ -126,15 +230,30 @@ def list_camera_devices():
 
 def setup_shortcuts(app):
     """Set up keyboard shortcuts for the application."""
+    import keyboard
+
     keyboard.add_hotkey("ctrl+alt+t", lambda: app.start_tracking())
     keyboard.add_hotkey("ctrl+alt+b", lambda: app.start_blink_detection())
     keyboard.add_hotkey("ctrl+alt+c", lambda: app.show_calibration())
     keyboard.add_hotkey("ctrl+alt+s", lambda: app.stop_tracking())
-    print("Keyboard shortcuts activated. Press Ctrl+Alt+T to start tracking.")
+    logger.info("Keyboard shortcuts activated. Press Ctrl+Alt+T to start tracking.")
 
 
-def setup_gui(app):
-    """Setup the main application window."""
+def fill_camera_devices(root, device_selector):
+    """Lists cameras on a background thread and shows them in the selector when done."""
+    def show(devices):
+        device_selector["values"] = devices
+        device_selector.set(devices[0])
+
+    def enumerate_devices():
+        devices = list_camera_devices()
+        root.after(0, show, devices)  # Widgets are only touched on the GUI thread
+
+    threading.Thread(target=enumerate_devices, daemon=True).start()
+
+
+def build_gui(app):
+    """Builds the main application window without entering its event loop."""
     root = tk.Tk()
     root.title("Eye Tracking Cursor Control")
 
@@ -161,16 +280,17 @@ def setup_gui(app):
     tests_menu = tk.Menu(menu_bar, tearoff=0)
     for test_file in test_runner.tests:
         tests_menu.add_command(label=test_file, command=lambda t=test_file: test_runner.run_test(t))
+    tests_menu.add_separator()
+    tests_menu.add_command(label="Run Benchmarks", command=lambda: threading.Thread(target=test_runner.run_benchmark, daemon=True).start())
     menu_bar.add_cascade(label="Tests", menu=tests_menu)
 
     root.config(menu=menu_bar)
 
-    # Camera device selection
+    # Camera device selection; enumerating devices is slow, so the list is filled after the first paint
     tk.Label(root, text="Select Camera Device:").pack(pady=5)
-    devices = list_camera_devices()
     device_selector = ttk.Combobox(root, textvariable=app.selected_device, state="readonly")
-    device_selector["values"] = devices
-    device_selector.set(devices[0])
+    device_selector["values"] = ["Searching for cameras..."]
+    device_selector.set("Searching for cameras...")
     device_selector.pack(pady=5)
 
     # Main buttons
@@ -194,7 +314,14 @@ def setup_gui(app):
             app.quit_app()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
-    root.mainloop()
+    root.after(0, app.preload, root)
+    root.after(0, fill_camera_devices, root, device_selector)
+    return root
+
+
+def setup_gui(app):
+    """Setup the main application window and run it."""
+    build_gui(app).mainloop()
 
 
 if __name__ == "__main__":
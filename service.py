@@ -0,0 +1,289 @@
+"""
+Headless eye tracking service: the tracking and blink pipeline without Tk, text-to-speech or tray.
+
+Run from the project root:
+    python service.py --device 0 --width 640 --height 480 --fps 30 --mode track --backend pyautogui
+
+Control it over a local TCP socket with one command per line (start, stop, status, quit,
+or "user <name>" to switch to another user's calibration); each command gets a one-line
+JSON reply:
+    printf 'status\\n' | nc 127.0.0.1 47800
+"""
+import argparse
+import json
+import socketserver
+import sys
+import threading
+
+from blink_detector import BlinkDetector
+from eye_tracker import EyeTracker
+from utils.actuator import CursorActuator, NullBackend, PyAutoGuiBackend
+from utils.frame_bus import FrameBus
+from utils.logger import Logger
+from utils.metrics import MetricsExporter, MetricsRegistry
+from utils.models import ModelRegistry
+from utils.online_calibration import OnlineRecalibrator
+from utils.perception import PerceptionStage
+from utils.visualizer import Visualizer
+
+logger = Logger.get_logger("service")
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiBackend,
+    "null": NullBackend,
+}
+
+
+class TrackingService:
+    """Runs cursor tracking and blink detection on a shared frame bus and perception stage."""
+
+    def __init__(self, device=0, width=None, height=None, max_fps=None, mode="track", workers=2, backend="pyautogui",
+                 tracking=True, blinks=True, visualizer="off", user="default", recalibrate=True,
+                 head_pose=True, pupils=True, realtime=True):
+        """
+        Initialize the service.
+
+        Args:
+            device (int or str): Camera device index, or a FrameRecorder recording directory.
+            width (int): Requested capture width.
+            height (int): Requested capture height.
+            max_fps (float): Frames per second published by the camera stage; no cap if None.
+            mode (str): Perception mode, "detect" on every frame or "track" between re-detections.
+            workers (int): Perception worker threads.
+            backend (str): Cursor output backend, a key of BACKENDS.
+            tracking (bool): Move the cursor from gaze.
+            blinks (bool): Turn blinks into clicks and drags.
+            visualizer (str): Debug window mode, "off" for no window at all.
+            user (str): Whose stored calibration maps gaze to the screen.
+            recalibrate (bool): Refine the gaze mapping from blink clicks while running.
+            head_pose (bool): Compensate gaze for head movement; calibrations are made per setting.
+            pupils (bool): Locate the pupils for eye movement; calibrations are made per setting.
+            realtime (bool): Replay a recording at its recorded pace. False replays at maximum
+                speed and losslessly: every frame reaches every stage in order, so runs repeat.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+        self.device = device
+        self.width = width
+        self.height = height
+        self.max_fps = max_fps
+        self.mode = mode
+        self.workers = workers
+        self.realtime = realtime
+
+        self.metrics = MetricsRegistry.default()
+        self.actuator = CursorActuator(BACKENDS[backend]())
+        self.recalibrator = OnlineRecalibrator() if recalibrate else None
+        self.eye_tracker = EyeTracker(actuator=self.actuator, metrics=self.metrics, user=user, recalibrator=self.recalibrator,
+                                      head_pose=head_pose, pupils=pupils, visualizer=Visualizer("Eye Tracker", mode=visualizer, metrics=self.metrics)) if tracking else None
+        self.blink_detector = BlinkDetector(actuator=self.actuator, recalibrator=self.recalibrator,
+                                            visualizer=Visualizer("Blink Detector", mode="off")) if blinks else None
+        if self.eye_tracker is None and self.blink_detector is None:
+            raise ValueError("Nothing to run: both tracking and blink detection are disabled.")
+
+        self.frame_bus = None
+        self.perception = None
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def is_running(self):
+        """Returns True while the pipeline is delivering results."""
+        return self.perception is not None and self.perception.is_running()
+
+    def start(self):
+        """
+        Opens the camera and starts the pipeline threads.
+
+        Returns:
+            bool: True if the pipeline is running.
+        """
+        with self.lock:
+            if self.is_running():
+                return True
+            self.frame_bus = FrameBus(self.device, width=self.width, height=self.height, max_fps=self.max_fps, realtime=self.realtime)
+            models = self.eye_tracker or self.blink_detector
+            self.perception = PerceptionStage(self.frame_bus, models.detector, models.predictor, mode=self.mode, workers=self.workers)
+            if not self.perception.start():  # Also starts the frame bus
+                return False
+
+            # The loops find the stages running and just subscribe to them
+            self.threads = []
+            for component in (self.eye_tracker, self.blink_detector):
+                if component is not None:
+                    thread = threading.Thread(target=component.run, args=(self.device, self.frame_bus, self.perception), daemon=True)
+                    thread.start()
+                    self.threads.append(thread)
+            logger.info("Tracking service started on device %s.", self.device)
+            logger.info("Models:\n%s", ModelRegistry.format_report())
+            return True
+
+    def stop(self):
+        """Stops the pipeline and waits for the loops to finish."""
+        with self.lock:
+            if self.perception is not None:
+                self.perception.stop()
+            if self.frame_bus is not None:
+                self.frame_bus.stop()  # Ends every loop reading from the camera
+            for thread in self.threads:
+                thread.join(timeout=3)
+            self.threads = []
+            logger.info("Tracking service stopped.")
+
+    def shutdown(self):
+        """Stops the pipeline and the output threads."""
+        self.stop()
+        if self.blink_detector is not None:
+            self.blink_detector.dispatcher.stop()
+        self.actuator.stop()
+
+    def use_calibration(self, user):
+        """
+        Switches the running tracker to another user's calibration.
+
+        Returns:
+            dict: Metadata of the calibration now in use, or None if the user has none.
+        """
+        if self.eye_tracker is None:
+            raise ValueError("Cursor tracking is disabled.")
+        self.eye_tracker.use_calibration(user=user)
+        return self.calibration_status()
+
+    def calibration_status(self):
+        """Returns the metadata of the active calibration, or None."""
+        if self.eye_tracker is None or self.eye_tracker.calibration is None:
+            return None
+        return self.eye_tracker.calibration.metadata
+
+    def status(self):
+        """Returns the service state and current metrics."""
+        return {
+            "running": self.is_running(),
+            "device": self.device,
+            "mode": self.mode,
+            "realtime": self.realtime,
+            "user": self.eye_tracker.calibration_key.user if self.eye_tracker is not None else None,
+            "calibration": self.calibration_status(),
+            "frames": self.frame_bus.frame_count if self.frame_bus is not None else 0,
+            "metrics": self.metrics.snapshot(),
+        }
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    """Line-based control socket for a TrackingService, bound to localhost."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, port=47800, host="127.0.0.1"):
+        super().__init__((host, port), ControlHandler)
+        self.service = service
+        self.quit_event = threading.Event()
+
+    def execute(self, command):
+        """Runs one control command and returns its JSON-serializable reply."""
+        command, _, argument = command.partition(" ")
+        command, argument = command.lower(), argument.strip()
+        if command == "user" and argument:
+            return {"ok": True, "calibration": self.service.use_calibration(argument)}
+        if command == "start":
+            return {"ok": self.service.start()}
+        if command == "stop":
+            self.service.stop()
+            return {"ok": True}
+        if command == "status":
+            return {"ok": True, **self.service.status()}
+        if command == "quit":
+            self.quit_event.set()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command '{command}'. Use start, stop, status, quit or user <name>."}
+
+
+class ControlHandler(socketserver.StreamRequestHandler):
+    """Reads commands, one per line, until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            command = line.decode("utf-8", "replace").strip()
+            if not command:
+                continue
+            try:
+                reply = self.server.execute(command)
+            except Exception as e:
+                logger.error("Error running control command '%s': %s", command, e)
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(reply, default=str) + "\n").encode("utf-8"))
+            if command.lower() == "quit":
+                break
+
+
+def parse_device(value):
+    """Camera index if numeric, otherwise a recording directory."""
+    return int(value) if value.isdigit() else value
+
+
+def main(argv=None):
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Run eye tracking and blink detection as a headless service.")
+    parser.add_argument("--device", type=parse_device, default=0, help="Camera index or FrameRecorder recording directory.")
+    parser.add_argument("--width", type=int, help="Requested capture width.")
+    parser.add_argument("--height", type=int, help="Requested capture height.")
+    parser.add_argument("--fps", type=float, help="Maximum frames per second to process.")
+    parser.add_argument("--mode", choices=["detect", "track"], default="track", help="Face detection mode.")
+    parser.add_argument("--workers", type=int, default=2, help="Perception worker threads.")
+    parser.add_argument("--max-speed", action="store_true",
+                        help="Replay a recording as fast as possible, processing every frame in order (deterministic).")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="pyautogui", help="Cursor output backend.")
+    parser.add_argument("--no-tracking", action="store_true", help="Don't move the cursor from gaze.")
+    parser.add_argument("--no-blinks", action="store_true", help="Don't turn blinks into clicks.")
+    parser.add_argument("--user", default="default", help="Whose stored calibration to use.")
+    parser.add_argument("--no-head-pose", action="store_true", help="Map raw eye positions without head pose compensation.")
+    parser.add_argument("--no-pupils", action="store_true", help="Use eye landmark positions without locating the pupils.")
+    parser.add_argument("--no-recalibration", action="store_true", help="Don't refine the gaze mapping from blink clicks.")
+    parser.add_argument("--visualizer", choices=Visualizer.MODES, default="off", help="Debug window mode.")
+    parser.add_argument("--control-port", type=int, default=47800, help="Localhost control socket port; 0 disables it.")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this localhost port.")
+    parser.add_argument("--log-file", default="app.log", help="Log file path.")
+    parser.add_argument("--idle", action="store_true", help="Wait for a start command instead of starting right away.")
+    args = parser.parse_args(argv)
+
+    Logger.setup_logger(log_file=args.log_file)
+    service = TrackingService(args.device, args.width, args.height, args.fps, args.mode, args.workers, args.backend,
+                              tracking=not args.no_tracking, blinks=not args.no_blinks, visualizer=args.visualizer,
+                              user=args.user, recalibrate=not args.no_recalibration, head_pose=not args.no_head_pose,
+                              pupils=not args.no_pupils, realtime=not args.max_speed)
+    exporter = MetricsExporter(service.metrics, port=args.metrics_port)
+    exporter.start()
+
+    server = None
+    if args.control_port:
+        server = ControlServer(service, args.control_port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        logger.info("Control socket listening on 127.0.0.1:%d.", args.control_port)
+
+    exit_code = 0
+    if not args.idle and not service.start():
+        exit_code = 1
+    elif server is not None:
+        try:
+            server.quit_event.wait()
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            while service.is_running():
+                threading.Event().wait(1.0)
+        except KeyboardInterrupt:
+            pass
+
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    service.shutdown()
+    exporter.stop()
+    Logger.shutdown()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
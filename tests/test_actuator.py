@@ -0,0 +1,69 @@
+# test_actuator.py
+import time
+import unittest
+from utils.actuator import CursorActuator, RecordingBackend
+
+
+class TestCursorActuator(unittest.TestCase):
+    """Unit tests for the CursorActuator module."""
+
+    def setUp(self):
+        """Set up an actuator with a recording backend."""
+        self.backend = RecordingBackend()
+        self.actuator = CursorActuator(self.backend, dead_zone=3, max_rate_hz=1000)
+
+    def tearDown(self):
+        """Stop the output thread."""
+        self.actuator.stop()
+
+    def test_pending_moves_are_coalesced(self):
+        """Test that only the newest move is sent when moves arrive faster than the rate cap."""
+        actuator = CursorActuator(self.backend, dead_zone=3, max_rate_hz=5)
+        actuator.move(10, 10)
+        deadline = time.time() + 2
+        while actuator.moves_sent < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        actuator.move(20, 20)
+        actuator.move(30, 30)
+        while actuator.moves_sent < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        actuator.stop()
+        self.assertEqual(self.backend.events, [("move_to", (10, 10)), ("move_to", (30, 30))])
+        self.assertEqual(actuator.moves_coalesced, 1)
+
+    def test_dead_zone_skips_small_moves(self):
+        """Test that moves inside the dead zone are not sent."""
+        self.actuator._send_move((100, 100, None))
+        self.assertFalse(self.actuator._send_move((101, 102, None)))
+        self.assertTrue(self.actuator._send_move((110, 100, None)))
+        self.assertEqual(self.actuator.moves_skipped, 1)
+
+    def test_hand_moves_hold_gaze_moves(self):
+        """Test that a cursor moved by hand stays put until the hold expires."""
+        actuator = CursorActuator(self.backend, dead_zone=3, max_rate_hz=1000, manual_hold=0.2)
+        actuator._send_move((100, 100, None))
+        self.assertIsNone(actuator.hand_position())
+
+        self.backend.pointer = (140, 90)  # Moved with the mouse
+        self.assertFalse(actuator._send_move((300, 300, None)))
+        self.assertEqual(self.backend.pointer, (140, 90))
+        self.assertEqual(actuator.hand_position(), (140, 90))
+        self.assertEqual(actuator.manual_moves, 1)
+
+        time.sleep(0.25)
+        self.assertIsNone(actuator.hand_position())
+        self.assertTrue(actuator._send_move((300, 300, None)))
+        self.assertEqual(self.backend.pointer, (300, 300))
+
+    def test_button_actions_keep_order(self):
+        """Test that button actions are all delivered in order."""
+        self.actuator.mouse_down()
+        self.actuator.click("right")
+        self.actuator.mouse_up()
+        self.actuator.stop()
+        actions = [(action, args[0]) for action, args in self.backend.events]
+        self.assertEqual(actions, [("mouse_down", "left"), ("click", "right"), ("mouse_up", "left")])
+
+
+if __name__ == "__main__":
+    unittest.main()
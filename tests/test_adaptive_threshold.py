@@ -0,0 +1,66 @@
+# test_adaptive_threshold.py
+import unittest
+import numpy as np
+from utils.adaptive_threshold import AdaptiveEarThreshold
+
+
+class TestAdaptiveEarThreshold(unittest.TestCase):
+    """Unit tests for the AdaptiveEarThreshold module."""
+
+    def test_threshold_follows_open_eye_baseline(self):
+        """Test that a user with narrow eyes gets a lower threshold than the default."""
+        adaptive = AdaptiveEarThreshold(initial_threshold=0.25, warmup=10)
+        rng = np.random.default_rng(0)
+        for ear in rng.normal(0.3, 0.01, size=500):
+            adaptive.update(ear)
+        self.assertAlmostEqual(adaptive.baseline, 0.3, delta=0.01)
+        self.assertAlmostEqual(adaptive.threshold, 0.21, delta=0.01)
+
+    def test_baseline_below_initial_threshold(self):
+        """Test that an open-eye EAR below the initial threshold is still learned."""
+        adaptive = AdaptiveEarThreshold(initial_threshold=0.25)
+        rng = np.random.default_rng(0)
+        for ear in rng.normal(0.22, 0.01, size=2000):
+            adaptive.update(ear)
+        self.assertEqual(adaptive.samples, 2000)
+        self.assertAlmostEqual(adaptive.baseline, 0.22, delta=0.01)
+        self.assertLess(adaptive.threshold, 0.2)
+
+    def test_baseline_follows_drift_below_threshold(self):
+        """Test that an open-eye EAR drifting below the learned threshold is not locked out."""
+        adaptive = AdaptiveEarThreshold(warmup=10)
+        for _ in range(100):
+            adaptive.update(0.35)
+        self.assertGreater(adaptive.threshold, 0.2)
+        for _ in range(2000):
+            adaptive.update(0.2)
+        self.assertAlmostEqual(adaptive.baseline, 0.2, delta=0.005)
+        self.assertLess(adaptive.threshold, 0.2)
+
+    def test_warmup_blinks_do_not_move_baseline(self):
+        """Test that blinks during the warm-up are outvoted by the median."""
+        adaptive = AdaptiveEarThreshold(warmup=10)
+        for ear in (0.3, 0.05, 0.3, 0.31, 0.29, 0.06, 0.3, 0.3, 0.31, 0.29):
+            adaptive.update(ear)
+        self.assertAlmostEqual(adaptive.baseline, 0.3, delta=0.005)
+
+    def test_blinks_do_not_move_baseline(self):
+        """Test that closed-eye samples are excluded from the statistics."""
+        adaptive = AdaptiveEarThreshold(warmup=5)
+        for _ in range(50):
+            adaptive.update(0.3)
+        baseline = adaptive.baseline
+        for _ in range(20):
+            adaptive.update(0.05)
+        self.assertEqual(adaptive.baseline, baseline)
+
+    def test_warmup_keeps_initial_threshold(self):
+        """Test that the initial threshold is used until enough samples arrive."""
+        adaptive = AdaptiveEarThreshold(initial_threshold=0.25, warmup=30)
+        for _ in range(10):
+            adaptive.update(0.4)
+        self.assertEqual(adaptive.threshold, 0.25)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+# test_benchmark.py
+import unittest
+from utils.benchmark import BenchmarkSuite, compare_results, measure_startup
+
+
+class TestBenchmark(unittest.TestCase):
+    """Unit tests for the benchmark suite helpers."""
+
+    def test_measure_reports_percentiles(self):
+        """Test that a measured stage reports latency, throughput and allocation figures."""
+        suite = BenchmarkSuite(iterations=20, warmup=2)
+        result = suite.measure("sum", sum, [[1, 2, 3]])
+        for key in ("p50_us", "p95_us", "p99_us", "throughput_per_s", "alloc_bytes_per_call"):
+            self.assertIn(key, result)
+        self.assertLessEqual(result["p50_us"], result["p99_us"])
+
+    def test_compare_flags_regressions(self):
+        """Test that only stages slower than the tolerance are flagged."""
+        baseline = {"ear": {"p95_us": 10.0}, "homography": {"p95_us": 2.0}, "landmarks": {"skipped": "no model"}}
+        results = {"ear": {"p95_us": 11.0}, "homography": {"p95_us": 3.0}, "landmarks": {"p95_us": 50.0}}
+        self.assertEqual(compare_results(results, baseline, tolerance=0.2), [("homography", 2.0, 3.0)])
+
+    def test_measure_startup(self):
+        """Test that startup steps run in fresh interpreters and failures are skipped."""
+        steps = [("import json", "", "import json"), ("missing", "", "import no_such_module_here")]
+        results = measure_startup(steps, repeats=1)
+        self.assertGreaterEqual(results["import json"]["startup_ms"], 0.0)
+        self.assertIn("ModuleNotFoundError", results["missing"]["skipped"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# test_blink_classifier.py
+import unittest
+from utils.blink_classifier import BlinkClassifier
+
+
+class TestBlinkClassifier(unittest.TestCase):
+    """Unit tests for the BlinkClassifier module."""
+
+    def setUp(self):
+        """Set up a classifier with the default intervals."""
+        self.classifier = BlinkClassifier(blink_threshold=0.25, blink_duration=0.2, double_blink_interval=0.5, long_blink_duration=2.0)
+
+    def feed(self, samples):
+        """Feeds (ear, timestamp) samples and returns the kinds of all events."""
+        kinds = []
+        for ear, timestamp in samples:
+            kinds += [event.kind for event in self.classifier.update(ear, timestamp)]
+        return kinds
+
+    def test_single_blink_waits_for_double_interval(self):
+        """Test that a quick blink is reported only after no second blink followed."""
+        self.assertEqual(self.feed([(0.3, 0.0), (0.1, 0.1), (0.3, 0.2), (0.3, 0.5)]), [])
+        self.assertEqual(self.feed([(0.3, 0.8)]), ["single"])
+
+    def test_double_blink(self):
+        """Test that two quick blinks within the interval form one double blink."""
+        samples = [(0.3, 0.0), (0.1, 0.1), (0.3, 0.2), (0.1, 0.5), (0.3, 0.6), (0.3, 2.0)]
+        self.assertEqual(self.feed(samples), ["double"])
+
+    def test_closure_interrupted_by_face_loss(self):
+        """Test that a closure cut short by a lost face is not reported when the face returns."""
+        self.assertEqual(self.classifier.update(0.1, 0.0), [])
+        for timestamp in (1.0, 2.5, 4.9):  # Face gone
+            self.assertEqual(self.classifier.interrupt(timestamp), [])
+        self.assertEqual(self.classifier.update(0.35, 5.0), [])
+        self.assertEqual(self.classifier.update(0.35, 6.0), [])
+
+    def test_pending_blink_survives_face_loss(self):
+        """Test that a quick blink before the face was lost is still reported once due."""
+        self.feed([(0.3, 0.0), (0.1, 0.1), (0.3, 0.2)])
+        self.assertEqual(self.classifier.interrupt(0.4), [])
+        self.assertEqual([event.kind for event in self.classifier.interrupt(0.8)], ["single"])
+
+    def test_long_blink_reported_while_closed(self):
+        """Test that a long blink fires once the closure reaches the long duration."""
+        samples = [(0.1, t / 10) for t in range(25)]
+        self.assertEqual(self.feed(samples), ["long"])
+        self.assertEqual(self.feed([(0.3, 2.6), (0.3, 4.0)]), [])
+
+    def test_uses_capture_timestamps(self):
+        """Test that classification depends on sample timestamps, not on when they are processed."""
+        # Two quick blinks 1.0 s apart in capture time stay two singles, however fast they are fed
+        samples = [(0.1, 0.0), (0.3, 0.1), (0.1, 1.1), (0.3, 1.2), (0.3, 2.0)]
+        self.assertEqual(self.feed(samples), ["single", "single"])
+
+
+if __name__ == "__main__":
+    unittest.main()
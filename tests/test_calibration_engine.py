@@ -0,0 +1,106 @@
+# test_calibration_engine.py
+import os
+import tempfile
+import unittest
+import numpy as np
+from utils.calibration_engine import (CalibrationEngine, HomographyModel, PolynomialModel, RbfModel,
+                                      load_mapping, robust_center, save_mapping)
+
+
+def grid(columns=4, rows=4):
+    """Screen targets on a regular grid."""
+    xs, ys = np.meshgrid(np.linspace(200, 1700, columns), np.linspace(150, 950, rows))
+    return np.column_stack([xs.ravel(), ys.ravel()])
+
+
+def curved_gaze(screen_points):
+    """Gaze points related to the screen by a mildly non-projective distortion."""
+    u = (screen_points[:, 0] - 960) / 960
+    v = (screen_points[:, 1] - 540) / 540
+    return np.column_stack([320 + 40 * u + 6 * u * v, 240 + 25 * v + 5 * u * u])
+
+
+class TestCalibrationEngine(unittest.TestCase):
+    """Unit tests for robust calibration fitting."""
+
+    def engine_with_samples(self, screen_points, gaze_points, noise=0.05, outliers=0, kinds=None):
+        rng = np.random.default_rng(0)
+        engine = CalibrationEngine(**({"kinds": kinds} if kinds else {}))
+        for screen, gaze in zip(screen_points, gaze_points):
+            index = engine.add_target(screen)
+            for sample in gaze + rng.normal(0, noise, (30, 2)):
+                engine.add_sample(index, sample)
+            for _ in range(outliers):
+                engine.add_sample(index, gaze + rng.uniform(-30, 30, 2))  # Blinks and glances away
+        return engine
+
+    def test_robust_center_ignores_outliers(self):
+        """Test that a few wild samples don't move the target center."""
+        samples = np.vstack([np.full((20, 2), 10.0) + np.random.default_rng(1).normal(0, 0.1, (20, 2)), [[200.0, -50.0], [90.0, 90.0]]])
+        center, inliers = robust_center(samples)
+        np.testing.assert_allclose(center, (10.0, 10.0), atol=0.1)
+        self.assertEqual(int(inliers.sum()), 20)
+
+    def test_homography_recovered_with_outliers(self):
+        """Test that a projective relation is recovered despite outlier samples."""
+        matrix = np.array([[30.0, 1.0, -9000.0], [0.5, 28.0, -6000.0], [0.0001, 0.0002, 1.0]])
+        screen_points = grid()
+        homogeneous = np.column_stack([screen_points, np.ones(len(screen_points))]) @ np.linalg.inv(matrix).T
+        gaze_points = homogeneous[:, :2] / homogeneous[:, 2:]
+        result = self.engine_with_samples(screen_points, gaze_points, noise=0.0, outliers=3, kinds=("homography",)).fit()
+        self.assertIsInstance(result.model, HomographyModel)
+        self.assertLess(result.rms["homography"], 1.0)
+
+    def test_nonlinear_gaze_prefers_flexible_model(self):
+        """Test that a curved gaze relation is fitted better than a homography can."""
+        screen_points = grid()
+        result = self.engine_with_samples(screen_points, curved_gaze(screen_points)).fit()
+        self.assertIn(result.kind, ("polynomial", "rbf"))
+        self.assertLess(result.rms[result.kind], result.rms["homography"])
+        self.assertEqual(result.residuals["homography"].shape, (16,))
+
+    def test_targets_without_samples_are_skipped(self):
+        """Test that a target with no samples is left out instead of faked."""
+        screen_points = grid()
+        engine = self.engine_with_samples(screen_points, curved_gaze(screen_points))
+        engine.add_target((960, 540))
+        result = engine.fit()
+        self.assertTrue(np.isnan(result.gaze_points[-1]).all())
+        self.assertTrue(np.isnan(result.residuals[result.kind][-1]))
+
+    def test_too_few_targets(self):
+        """Test that fitting without enough usable targets fails clearly."""
+        engine = CalibrationEngine()
+        engine.add_target((0, 0))
+        with self.assertRaises(ValueError):
+            engine.fit()
+        with self.assertRaises(ValueError):
+            CalibrationEngine(kinds=("spline",))
+
+    def test_point_and_batch_mapping_agree(self):
+        """Test that the scalar evaluators match the vectorized ones."""
+        screen_points = grid()
+        gaze_points = curved_gaze(screen_points)
+        probes = gaze_points[:5] + 0.3
+        for model_class in (PolynomialModel, RbfModel):
+            model = model_class.fit(gaze_points, screen_points)
+            expected = model.map_points(probes)
+            mapped = np.array([model.map_point(x, y) for x, y in probes])
+            np.testing.assert_allclose(mapped, expected, rtol=1e-9, atol=1e-6)
+
+    def test_save_and_load(self):
+        """Test that every mapping model survives a round trip to disk."""
+        screen_points = grid()
+        gaze_points = curved_gaze(screen_points)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "mapping.npz")
+            for model_class in (HomographyModel, PolynomialModel, RbfModel):
+                model = model_class.fit(gaze_points, screen_points)
+                save_mapping(model, path)
+                loaded = load_mapping(path)
+                self.assertIs(type(loaded), model_class)
+                np.testing.assert_allclose(loaded.map_point(321.0, 241.0), model.map_point(321.0, 241.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
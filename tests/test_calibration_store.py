@@ -0,0 +1,92 @@
+# test_calibration_store.py
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import numpy as np
+from utils.calibration_engine import HomographyModel, PolynomialModel
+from utils.calibration_store import CalibrationKey, CalibrationStore, CalibrationWatcher, STORE_VERSION, camera_id, layout_id
+
+
+def fitted_model(model_class, scale=3.0):
+    screen_points = np.array([(x, y) for y in (200, 500, 800) for x in (300, 900, 1500)], dtype=np.float64)
+    gaze_points = screen_points / scale + 0.001 * (screen_points / 100) ** 2
+    return model_class.fit(gaze_points, screen_points)
+
+
+class TestCalibrationStore(unittest.TestCase):
+    """Unit tests for the per-profile calibration store and its watcher."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = CalibrationStore(os.path.join(directory.name, "profiles"))
+        self.key = CalibrationKey("alice", "camera0", "1920x1080+0+0")
+
+    def test_save_and_load_with_metadata(self):
+        """Test that the mapping and its metadata survive a round trip."""
+        model = fitted_model(PolynomialModel)
+        self.store.save(self.key, model, resolution=(640, 480), residuals=[1.5, float("nan")], rms=1.5)
+        entry = self.store.load(self.key)
+        self.assertEqual(entry.key, self.key)
+        self.assertEqual(entry.metadata["kind"], "polynomial")
+        self.assertEqual(entry.metadata["resolution"], [640, 480])
+        self.assertEqual(entry.metadata["residuals"], [1.5, None])
+        self.assertEqual(entry.metadata["version"], STORE_VERSION)
+        np.testing.assert_allclose(entry.model.map_point(200.0, 150.0), model.map_point(200.0, 150.0))
+
+    def test_keys_are_separate(self):
+        """Test that users, cameras and layouts each get their own calibration."""
+        self.store.save(self.key, fitted_model(HomographyModel))
+        self.store.save(self.key._replace(user="bob"), fitted_model(PolynomialModel))
+        self.assertIsNone(self.store.load(self.key._replace(camera="camera1")))
+        self.assertEqual(self.store.load(self.key).metadata["kind"], "homography")
+        self.assertEqual(sorted(entry["user"] for entry in self.store.entries()), ["alice", "bob"])
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        """Test that saving leaves only the final file behind."""
+        self.store.save(self.key, fitted_model(HomographyModel))
+        self.store.save(self.key, fitted_model(PolynomialModel))
+        self.assertEqual(os.listdir(self.store.directory), [os.path.basename(self.store.path_for(self.key))])
+
+    def test_corrupt_file(self):
+        """Test that an unreadable file is rejected clearly."""
+        os.makedirs(self.store.directory)
+        with open(self.store.path_for(self.key), "wb") as corrupt:
+            corrupt.write(b"not a calibration")
+        with self.assertRaises(ValueError):
+            self.store.load(self.key)
+
+    def test_watcher_reloads_changed_file(self):
+        """Test that the watcher calls back once per saved change."""
+        entries = []
+        watcher = CalibrationWatcher(self.store, self.key, entries.append, interval=0.01)
+        self.assertFalse(watcher.check())
+        self.store.save(self.key, fitted_model(HomographyModel))
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        self.store.save(self.key, fitted_model(PolynomialModel))
+        self.assertTrue(watcher.check())
+        self.assertEqual([entry.model.kind for entry in entries], ["homography", "polynomial"])
+
+    def test_watch_other_key(self):
+        """Test that switching keys doesn't report the new key's current file as a change."""
+        other = self.key._replace(user="bob")
+        self.store.save(other, fitted_model(HomographyModel))
+        entries = []
+        watcher = CalibrationWatcher(self.store, self.key, entries.append)
+        watcher.watch(other)
+        self.assertFalse(watcher.check())
+        self.store.save(other, fitted_model(PolynomialModel))
+        self.assertTrue(watcher.check())
+
+    def test_ids(self):
+        """Test camera and layout naming."""
+        self.assertEqual(camera_id(1), "camera1")
+        self.assertEqual(camera_id("recordings/session1/"), "session1")
+        monitors = [SimpleNamespace(width=1280, height=1024, x=1920, y=0), SimpleNamespace(width=1920, height=1080, x=0, y=0)]
+        self.assertEqual(layout_id(monitors), "1920x1080+0+0_1280x1024+1920+0")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# test_frame_bus.py
+import unittest
+import numpy as np
+from utils.frame_bus import FrameBus
+
+
+class FakeCapture:
+    """Minimal stand-in for cv2.VideoCapture that yields a fixed number of frames."""
+
+    def __init__(self, frame_count=5):
+        self.frame_count = frame_count
+        self.reads = 0
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.reads >= self.frame_count:
+            return False, None
+        self.reads += 1
+        return True, np.full((4, 4, 3), self.reads, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class TestFrameBus(unittest.TestCase):
+    """Unit tests for the FrameBus module."""
+
+    def test_publish_reaches_every_subscriber(self):
+        """Test that one published frame is delivered to all subscribers with its grayscale."""
+        bus = FrameBus(capture=FakeCapture())
+        first, second = bus.subscribe(), bus.subscribe()
+        bus.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+        frame_a, frame_b = first.get(timeout=0), second.get(timeout=0)
+        self.assertIs(frame_a, frame_b)
+        self.assertEqual(frame_a.gray.shape, (4, 4))
+
+    def test_drop_oldest(self):
+        """Test that a full ring buffer discards its oldest frame."""
+        bus = FrameBus(capture=FakeCapture())
+        subscription = bus.subscribe(capacity=2)
+        for _ in range(3):
+            bus.publish(np.zeros((4, 4, 3), dtype=np.uint8))
+        self.assertEqual(subscription.dropped, 1)
+        self.assertEqual(subscription.get(timeout=0).index, 1)
+
+    def test_capture_thread_closes_subscribers(self):
+        """Test that subscribers are released when the capture source ends."""
+        capture = FakeCapture(frame_count=3)
+        bus = FrameBus(capture=capture)
+        subscription = bus.subscribe(capacity=10)
+        self.assertTrue(bus.start())
+        received = []
+        while True:
+            frame = subscription.get(timeout=1.0)
+            if frame is None:
+                break
+            received.append(frame.index)
+        self.assertEqual(received, [0, 1, 2])
+        self.assertTrue(capture.released)
+        self.assertFalse(bus.is_running())
+
+    def test_fps_cap_drops_frames_at_source(self):
+        """Test that frames read faster than max_fps are skipped before publishing."""
+        capture = FakeCapture(frame_count=40)
+        capture.timestamp = None
+        read = capture.read
+
+        def timed_read():
+            ret, image = read()
+            capture.timestamp = capture.reads / 100.0  # A 100 FPS camera
+            return ret, image
+
+        capture.read = timed_read
+        bus = FrameBus(capture=capture, max_fps=25)
+        subscription = bus.subscribe(capacity=100)
+        self.assertTrue(bus.start())
+        received = []
+        while True:
+            frame = subscription.get(timeout=1.0)
+            if frame is None:
+                break
+            received.append(frame.timestamp)
+        self.assertEqual(len(received), 10)
+        self.assertEqual(bus.frames_skipped, 30)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# test_gestures.py
+import threading
+import unittest
+from utils.gestures import ActionDispatcher, GestureEvent, GestureStateMachine
+
+
+class TestGestures(unittest.TestCase):
+    """Unit tests for the gesture state machine and action dispatcher."""
+
+    def test_long_blink_starts_and_next_blink_ends_drag(self):
+        """Test that press and release are separate events around a drag."""
+        gestures = GestureStateMachine()
+        self.assertEqual([e.kind for e in gestures.on_blink("long", 1.0)], ["press"])
+        self.assertEqual(gestures.state, GestureStateMachine.DRAGGING)
+        self.assertEqual([e.kind for e in gestures.on_blink("single", 3.0)], ["release"])
+        self.assertEqual([e.kind for e in gestures.on_blink("single", 4.0)], ["click"])
+        self.assertEqual([e.kind for e in gestures.on_blink("double", 5.0)], ["right_click"])
+
+    def test_reset_releases_held_button(self):
+        """Test that resetting mid-drag emits a release."""
+        gestures = GestureStateMachine()
+        gestures.on_blink("long", 1.0)
+        self.assertEqual([e.kind for e in gestures.reset()], ["release"])
+        self.assertEqual(gestures.reset(), [])
+
+    def test_dispatch_does_not_block(self):
+        """Test that a slow action runs on the dispatcher thread, not the caller's."""
+        release = threading.Event()
+        handled = []
+        dispatcher = ActionDispatcher(actuator=None, handlers={"press": lambda event: (release.wait(2), handled.append(event.kind))})
+        dispatcher.dispatch(GestureEvent("press", 0.0))
+        self.assertEqual(handled, [])  # The call returned while the action is still running
+        release.set()
+        dispatcher.stop()
+        self.assertEqual(handled, ["press"])
+
+
+if __name__ == "__main__":
+    unittest.main()
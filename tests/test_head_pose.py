@@ -0,0 +1,72 @@
+# test_head_pose.py
+import unittest
+import cv2
+import numpy as np
+from utils.head_pose import FACE_MODELS, CameraModel, HeadPoseEstimator
+from utils.landmarks import LandmarkModel
+
+
+def project_face(num_points, rotation, translation, frame_shape=(480, 640)):
+    """Projects the generic face model into an (N, 2) landmark array for a given pose."""
+    indices, points = FACE_MODELS[num_points]
+    camera = CameraModel(frame_shape[1], frame_shape[0])
+    projected, _ = cv2.projectPoints(np.array(points), np.array(rotation, dtype=np.float64), np.array(translation, dtype=np.float64),
+                                     camera.matrix, camera.distortion)
+    landmarks = np.zeros((num_points, 2))
+    landmarks[indices] = projected.reshape(-1, 2)
+    return landmarks
+
+
+class TestHeadPose(unittest.TestCase):
+    """Unit tests for head pose estimation and head-relative gaze features."""
+
+    def setUp(self):
+        self.estimator = HeadPoseEstimator(LandmarkModel.for_points(5))
+
+    def test_translation_does_not_change_gaze(self):
+        """Test that moving the head without turning it leaves the gaze feature unchanged."""
+        centered = self.estimator.gaze_angles(project_face(5, (0.1, 0.2, 0.0), (0, 0, 600)), (480, 640))
+        for translation in ((80, 40, 600), (-120, -30, 500), (0, 0, 750)):
+            moved = self.estimator.gaze_angles(project_face(5, (0.1, 0.2, 0.0), translation), (480, 640))
+            np.testing.assert_allclose(moved, centered, atol=0.5)
+
+    def test_rotation_directions(self):
+        """Test that turning toward image right and tilting down give positive yaw and pitch."""
+        pose = self.estimator.estimate(project_face(5, (0.0, -0.3, 0.0), (0, 0, 600)), (480, 640))
+        self.assertAlmostEqual(pose.yaw, np.degrees(0.3), delta=0.5)
+        self.assertAlmostEqual(pose.pitch, 0.0, delta=0.5)
+        pose = self.estimator.estimate(project_face(5, (0.2, 0.0, 0.0), (0, 0, 600)), (480, 640))
+        self.assertAlmostEqual(pose.pitch, np.degrees(0.2), delta=0.5)
+        self.assertGreater(pose.translation[2], 0)
+
+    def test_68_point_model(self):
+        """Test that the 68-point model solves the same pose."""
+        estimator = HeadPoseEstimator(LandmarkModel.for_points(68))
+        pose = estimator.estimate(project_face(68, (0.0, -0.3, 0.0), (50, 0, 600)), (480, 640))
+        self.assertAlmostEqual(pose.yaw, np.degrees(0.3), delta=0.5)
+
+    def test_eye_rotation(self):
+        """Test that eye centers off the corner midpoint turn into eye-in-head angles."""
+        landmarks = project_face(5, (0.0, 0.0, 0.0), (0, 0, 600))
+        self.assertEqual(self.estimator.eye_rotation(landmarks), (0.0, 0.0))  # 5-point eye centers are the corner midpoints
+
+        corners = LandmarkModel.for_points(5).eye_corners(landmarks)
+        shifted = corners.mean(axis=1) + (2.0, 1.0)  # Pupils toward image right and down
+        eye_x, eye_y = self.estimator.eye_rotation(landmarks, shifted)
+        self.assertGreater(eye_x, 0)
+        self.assertGreater(eye_y, 0)
+
+    def test_camera_model_cached_per_frame_size(self):
+        """Test that the camera model is reused until the frame size changes."""
+        camera = self.estimator.camera_for((480, 640))
+        self.assertIs(self.estimator.camera_for((480, 640, 3)), camera)
+        self.assertIsNot(self.estimator.camera_for((720, 1280)), camera)
+
+    def test_unsupported_model(self):
+        """Test that a landmark model without a head model is rejected."""
+        with self.assertRaises(ValueError):
+            HeadPoseEstimator(LandmarkModel("custom", 12, [0, 1], [2, 3], supports_ear=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# test_homography.py
+import unittest
+import numpy as np
+from utils.homography import HomographyManager, HomographyMapper
+
+
+class TestHomographyMapper(unittest.TestCase):
+    """Unit tests for the HomographyMapper fast path."""
+
+    def setUp(self):
+        """Set up a non-affine test matrix."""
+        self.matrix = np.array([[1.2, 0.05, 30.0], [-0.02, 1.1, 15.0], [1e-4, 2e-4, 1.0]])
+        self.mapper = HomographyMapper(self.matrix)
+
+    def test_map_point_matches_perspective_transform(self):
+        """Test that single-point mapping matches the cv2 reference path."""
+        expected = HomographyManager.apply_homography(320.0, 240.0, self.matrix)
+        np.testing.assert_allclose(self.mapper.map_point(320.0, 240.0), expected, rtol=1e-5)
+
+    def test_map_points_matches_map_point(self):
+        """Test that the vectorized path matches single-point mapping."""
+        points = np.array([[0.0, 0.0], [320.0, 240.0], [640.0, 480.0]])
+        mapped = self.mapper.map_points(points)
+        for point, screen_point in zip(points, mapped):
+            np.testing.assert_allclose(screen_point, self.mapper.map_point(*point))
+
+    def test_point_at_infinity(self):
+        """Test that points on the horizon line are reported instead of raising."""
+        mapper = HomographyMapper([[1, 0, 0], [0, 1, 0], [1, 0, 0]])
+        self.assertIsNone(mapper.map_point(0.0, 5.0))
+        self.assertTrue(np.isnan(mapper.map_points([[0.0, 5.0]])).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# test_landmarks.py
+import unittest
+import cv2
+import numpy as np
+from utils.landmarks import LandmarkModel, eye_aspect_ratio, eye_features, intensity_openness, shape_to_array
+
+
+class FakeShape:
+    """Stand-in for a dlib full_object_detection."""
+
+    num_parts = 68
+
+    def parts(self):
+        return [type("Point", (), {"x": i * 10, "y": i * 5 + (i % 3)}) for i in range(self.num_parts)]
+
+
+class TestLandmarks(unittest.TestCase):
+    """Unit tests for the vectorized landmark helpers."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.left_eye_indices = [36, 37, 38, 39, 40, 41]
+        self.right_eye_indices = [42, 43, 44, 45, 46, 47]
+        self.landmarks = shape_to_array(FakeShape())
+
+    def test_shape_to_array(self):
+        """Test conversion into a preallocated (N, 2) int array."""
+        out = np.empty((68, 2), dtype=np.int32)
+        result = shape_to_array(FakeShape(), out=out)
+        self.assertIs(result, out)
+        self.assertEqual(tuple(out[40]), (400, 201))
+        np.testing.assert_array_equal(out, self.landmarks)
+
+    def test_shape_to_array_rejects_unusable_buffers(self):
+        """Test that buffers that cannot be filled in place are refused instead of silently left unchanged."""
+        for out in (np.empty((2, 68), dtype=np.int32).T,  # Non-contiguous view
+                    np.empty((68, 2), dtype=np.float64),
+                    np.empty((5, 2), dtype=np.int32)):
+            with self.assertRaises(ValueError):
+                shape_to_array(FakeShape(), out=out)
+
+    def test_eye_features_matches_scalar_ear(self):
+        """Test that the vectorized EAR and centroids match the per-eye computation."""
+        centroids, ears = eye_features(self.landmarks, self.left_eye_indices, self.right_eye_indices)
+        left_eye = self.landmarks[self.left_eye_indices]
+        self.assertAlmostEqual(ears[0], eye_aspect_ratio(left_eye))
+        np.testing.assert_allclose(centroids[0], left_eye.mean(axis=0))
+
+    def test_batched_eye_features(self):
+        """Test the batched path over several frames."""
+        batch = np.stack([self.landmarks, self.landmarks + 3])
+        centroids, ears = eye_features(batch, self.left_eye_indices, self.right_eye_indices)
+        self.assertEqual(centroids.shape, (2, 2, 2))
+        self.assertEqual(ears.shape, (2, 2))
+        np.testing.assert_allclose(ears[0], ears[1])
+
+    def make_eye_image(self, open_eye):
+        """Skin-colored frame with one eye between corners (40, 60) and (80, 60)."""
+        gray = np.full((120, 120), 170, dtype=np.uint8)
+        if open_eye:
+            cv2.circle(gray, (60, 60), 9, 40, -1)  # Iris
+        else:
+            cv2.line(gray, (40, 60), (80, 60), 40, 2)  # Lash line
+        return gray
+
+    def test_topology_selection(self):
+        """Test that 5- and 68-point models are described and others rejected."""
+        self.assertTrue(LandmarkModel.for_points(68).supports_ear)
+        five_point = LandmarkModel.for_points(5)
+        self.assertFalse(five_point.supports_ear)
+        self.assertTrue(max(five_point.left_eye_indices + five_point.right_eye_indices) < 5)
+        with self.assertRaises(ValueError):
+            LandmarkModel.for_points(81)
+
+    def test_eye_corners(self):
+        """Test that eye corners are taken from the right points of each topology."""
+        corners = LandmarkModel.for_points(68).eye_corners(self.landmarks)
+        np.testing.assert_array_equal(corners[0], self.landmarks[[36, 39]])
+        np.testing.assert_array_equal(corners[1], self.landmarks[[42, 45]])
+        five_point = self.landmarks[[45, 42, 36, 39, 33]]
+        np.testing.assert_array_equal(LandmarkModel.for_points(5).eye_corners(five_point)[0], self.landmarks[[36, 39]])
+
+    def test_68_point_openness_is_ear(self):
+        """Test that the 68-point model measures openness with the EAR."""
+        openness = LandmarkModel.for_points(68).eye_openness(self.landmarks)
+        _, ears = eye_features(self.landmarks, self.left_eye_indices, self.right_eye_indices)
+        np.testing.assert_allclose(openness, ears)
+
+    def test_5_point_eye_centers(self):
+        """Test that 5-point gaze input is the midpoint of each eye's corners."""
+        landmarks = np.array([(100, 50), (80, 50), (20, 52), (40, 52), (60, 80)])
+        centers = LandmarkModel.for_points(5).eye_centers(landmarks)
+        np.testing.assert_allclose(centers, [[30, 52], [90, 50]])
+
+    def test_intensity_openness_separates_open_and_closed(self):
+        """Test that an open eye scores well above a closed one on the EAR scale."""
+        opened = intensity_openness(self.make_eye_image(True), (40, 60), (80, 60))
+        closed = intensity_openness(self.make_eye_image(False), (40, 60), (80, 60))
+        self.assertGreater(opened, 0.3)
+        self.assertLess(closed, 0.15)
+        self.assertIsNone(intensity_openness(self.make_eye_image(True), (40, 60), (42, 60)))
+
+    def test_5_point_openness_needs_gray(self):
+        """Test that 5-point openness is NaN without a frame and measured with one."""
+        landmarks = np.array([(80, 60), (40, 60), (0, 0), (1, 0), (60, 90)])
+        five_point = LandmarkModel.for_points(5)
+        self.assertTrue(np.isnan(five_point.eye_openness(landmarks)).all())
+        openness = five_point.eye_openness(landmarks, self.make_eye_image(True))
+        self.assertGreater(openness[1], 0.3)
+        self.assertTrue(np.isnan(openness[0]))  # Corners too close together to measure
+
+
+if __name__ == "__main__":
+    unittest.main()
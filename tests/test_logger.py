@@ -0,0 +1,74 @@
+# test_logger.py
+import logging
+import os
+import tempfile
+import unittest
+from utils.logger import Logger, RateLimitFilter
+
+
+class TestLogger(unittest.TestCase):
+    """Unit tests for the asynchronous, rate-limited logger."""
+
+    def tearDown(self):
+        Logger.shutdown()
+
+    def make_record(self, msg, args=(), level=logging.WARNING):
+        return logging.LogRecord("EyeTrackingApp.test", level, __file__, 1, msg, args, None)
+
+    def test_rate_limit_drops_repeats(self):
+        """Test that repeats within the interval are dropped and counted."""
+        rate_filter = RateLimitFilter(interval=60.0)
+        self.assertTrue(rate_filter.filter(self.make_record("Eye region not detected.")))
+        self.assertFalse(rate_filter.filter(self.make_record("Eye region not detected.")))
+        self.assertFalse(rate_filter.filter(self.make_record("Eye region not detected.")))
+        self.assertEqual(rate_filter.total_suppressed, 2)
+        self.assertTrue(rate_filter.filter(self.make_record("Another message.")))
+
+    def test_rate_limit_keys_on_format_string(self):
+        """Test that the same message with different arguments is deduplicated."""
+        rate_filter = RateLimitFilter(interval=60.0)
+        self.assertTrue(rate_filter.filter(self.make_record("Error: %s", ("a",))))
+        self.assertFalse(rate_filter.filter(self.make_record("Error: %s", ("b",))))
+
+    def test_info_is_not_rate_limited(self):
+        """Test that regular events below WARNING are never dropped."""
+        rate_filter = RateLimitFilter(interval=60.0)
+        for point in range(9):
+            self.assertTrue(rate_filter.filter(self.make_record("Captured %d gaze samples for point %d.", (30, point), logging.INFO)))
+        self.assertEqual(rate_filter.total_suppressed, 0)
+
+    def test_suppressed_count_reported(self):
+        """Test that the next emitted repeat reports how many were suppressed."""
+        rate_filter = RateLimitFilter(interval=0.0)
+        rate_filter.filter(self.make_record("Lost face."))
+        rate_filter.interval = 60.0
+        rate_filter.filter(self.make_record("Lost face."))
+        rate_filter.interval = 0.0
+        record = self.make_record("Lost face.")
+        self.assertTrue(rate_filter.filter(record))
+        self.assertIn("1 similar messages suppressed", record.getMessage())
+
+    def test_writes_through_listener(self):
+        """Test that records reach the log file once the listener is flushed."""
+        with tempfile.TemporaryDirectory() as directory:
+            log_file = os.path.join(directory, "app.log")
+            Logger.setup_logger(log_file=log_file, console=False)
+            logger = Logger.get_logger("test")
+            for _ in range(100):
+                logger.warning("Skipping frame.")
+            Logger.shutdown()
+            with open(log_file) as handle:
+                lines = handle.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("Skipping frame.", lines[0])
+
+    def test_get_logger_configures_console(self):
+        """Test that a child logger works without explicit setup."""
+        Logger.shutdown()
+        logger = Logger.get_logger("child")
+        self.assertEqual(logger.name, "EyeTrackingApp.child")
+        self.assertIsNotNone(Logger.listener)
+
+
+if __name__ == "__main__":
+    unittest.main()
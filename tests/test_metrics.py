@@ -0,0 +1,93 @@
+# test_metrics.py
+import logging
+import os
+import tempfile
+import unittest
+import numpy as np
+from utils.metrics import LatencyHistogram, MetricsExporter, MetricsRegistry
+from utils.pipeline import StageLatency
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the instrumentation registry and exporter."""
+
+    def test_histogram_percentiles(self):
+        """Test that percentiles land in the bucket holding the samples."""
+        histogram = LatencyHistogram()
+        for _ in range(95):
+            histogram.record(0.001)
+        for _ in range(5):
+            histogram.record(0.100)
+        self.assertGreaterEqual(histogram.percentile(0.5), 0.001)
+        self.assertLess(histogram.percentile(0.5), 0.0015)
+        self.assertGreaterEqual(histogram.percentile(0.99), 0.100)
+        self.assertEqual(int(histogram.counts.sum()), 100)
+
+    def test_histogram_overflow_bucket(self):
+        """Test that samples beyond the last bound go to the +Inf bucket."""
+        histogram = LatencyHistogram()
+        histogram.record(60.0)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.percentile(0.5), float("inf"))
+
+    def test_stage_latency_feeds_histogram(self):
+        """Test that StageLatency records into its histogram."""
+        stage = StageLatency("detect")
+        stage.record(0.005)
+        self.assertEqual(stage.histogram.count, 1)
+        self.assertIn("p95_ms", stage.summary())
+
+    def test_snapshot_and_overlay(self):
+        """Test that stages, counters and gauges appear in the snapshot and overlay."""
+        registry = MetricsRegistry()
+        stage = registry.register_stage(StageLatency("map"))
+        stage.record(0.002)
+        registry.counter("face_lost").inc()
+        registry.counter("face_lost").inc()
+        registry.register_gauge("dropped_frames", lambda: 7)
+        registry.register_gauge("broken", lambda: 1 / 0)
+
+        snapshot = registry.snapshot()
+        self.assertEqual(snapshot["stages"]["map"]["count"], 1)
+        self.assertEqual(snapshot["counters"]["face_lost"], 2)
+        self.assertEqual(snapshot["gauges"]["dropped_frames"], 7)
+        self.assertIsNone(snapshot["gauges"]["broken"])
+        self.assertTrue(any(line.startswith("map:") for line in registry.overlay_lines()))
+
+    def test_prometheus_format(self):
+        """Test the histogram, counter and gauge exposition lines."""
+        registry = MetricsRegistry()
+        stage = registry.register_stage(StageLatency("glass-to-cursor"))
+        stage.record(0.010)
+        registry.counter("homography_failures", "Unmapped points.").inc(3)
+        registry.register_gauge("dropped_frames", lambda: 4)
+
+        text = registry.to_prometheus()
+        self.assertIn('eyetracker_glass_to_cursor_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("eyetracker_glass_to_cursor_seconds_count 1", text)
+        self.assertIn("eyetracker_homography_failures_total 3", text)
+        self.assertIn("eyetracker_dropped_frames 4", text)
+
+    def test_exporter_writes_file_and_log(self):
+        """Test that one export writes the Prometheus file and a log line."""
+        registry = MetricsRegistry()
+        registry.counter("face_lost").inc()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.prom")
+            exporter = MetricsExporter(registry, file_path=path, logger=logging.getLogger("test_metrics"))
+            with self.assertLogs("test_metrics", level="INFO") as logs:
+                exporter.export()
+            self.assertIn('"face_lost": 1', logs.output[0])
+            with open(path) as metrics_file:
+                self.assertIn("eyetracker_face_lost_total 1", metrics_file.read())
+
+    def test_draw_overlay(self):
+        """Test that the overlay draws onto the frame."""
+        from utils.visualizer import Visualizer
+        frame = np.full((240, 320, 3), 200, dtype=np.uint8)
+        Visualizer.draw_metrics(frame, ["map: 1.0 ms", "face_lost: 2"])
+        self.assertFalse(np.all(frame == 200))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# test_models.py
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+from utils.models import ModelRegistry, ModelValidationError, ThreadLocalModel
+
+
+class FakePredictor:
+    """Stand-in for dlib.shape_predictor with a configurable landmark count."""
+
+    def __init__(self, path, num_parts):
+        self.path = path
+        self.num_parts = num_parts
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Unit tests for the shared model registry."""
+
+    def setUp(self):
+        self.loads = []
+        self.num_parts = 5
+
+        def shape_predictor(path):
+            time.sleep(0.05)  # Slow enough for concurrent callers to overlap
+            self.loads.append(os.path.basename(path))
+            return FakePredictor(path, self.num_parts)
+
+        fake_dlib = types.SimpleNamespace(shape_predictor=shape_predictor, get_frontal_face_detector=lambda: object())
+        for patcher in (mock.patch.dict(sys.modules, {"dlib": fake_dlib}),
+                        mock.patch.object(ModelRegistry, "models", {}),
+                        mock.patch.object(ModelRegistry, "info", {})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def model_file(self, name, content=b"model"):
+        path = os.path.join(self.directory, name)
+        with open(path, "wb") as model_file:
+            model_file.write(content)
+        return path
+
+    def test_predictor_loaded_once(self):
+        """Test that every caller shares one predictor per path."""
+        first_path, second_path = self.model_file("a.dat"), self.model_file("b.dat")
+        first = ModelRegistry.shape_predictor(first_path)
+        self.assertIs(first, ModelRegistry.shape_predictor(first_path))
+        ModelRegistry.shape_predictor(second_path)
+        self.assertEqual(self.loads, ["a.dat", "b.dat"])
+
+    def test_concurrent_callers_wait_for_one_load(self):
+        """Test that concurrent first uses don't load the model twice."""
+        path = self.model_file("a.dat")
+        threads = [threading.Thread(target=ModelRegistry.shape_predictor, args=(path,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loads, ["a.dat"])
+
+    def test_missing_file(self):
+        """Test that a missing model fails with a clear error and is not cached."""
+        with self.assertRaises(ModelValidationError):
+            ModelRegistry.shape_predictor(os.path.join(self.directory, "missing.dat"))
+        self.assertEqual(ModelRegistry.models, {})
+
+    def test_checksum_validation(self):
+        """Test that explicit and sidecar checksums are enforced."""
+        path = self.model_file("a.dat")
+        with self.assertRaises(ModelValidationError):
+            ModelRegistry.shape_predictor(path, expected_sha256="0" * 64)
+
+        sidecar_path = self.model_file("b.dat")
+        with open(f"{sidecar_path}.sha256", "w") as sidecar:
+            sidecar.write(f"{hashlib.sha256(b'model').hexdigest()}  b.dat\n")
+        ModelRegistry.shape_predictor(sidecar_path)
+        self.assertEqual(self.loads, ["b.dat"])
+
+    def test_landmark_count_validation(self):
+        """Test that a predictor with the wrong landmark count is rejected."""
+        path = self.model_file("a.dat")
+        ModelRegistry.shape_predictor(path, expected_landmarks=5)
+        with self.assertRaises(ModelValidationError):
+            ModelRegistry.shape_predictor(path, expected_landmarks=68)
+
+    def test_report(self):
+        """Test that load time, checksum and landmark count are reported."""
+        path = self.model_file("a.dat")
+        ModelRegistry.shape_predictor(path)
+        ModelRegistry.face_detector()
+        report = {info["key"]: info for info in ModelRegistry.report()}
+        predictor_info = report[f"shape_predictor:{path}"]
+        self.assertEqual(predictor_info["landmarks"], 5)
+        self.assertEqual(predictor_info["sha256"], hashlib.sha256(b"model").hexdigest())
+        self.assertGreater(predictor_info["load_seconds"], 0.0)
+        self.assertIn("face_detector", report)
+        self.assertIn("5 landmarks", ModelRegistry.format_report())
+
+    def test_detector_is_per_thread(self):
+        """Test that each thread calling the detector handle gets its own instance."""
+        handle = ThreadLocalModel(object)
+        instances = []
+        thread = threading.Thread(target=lambda: instances.append(handle.get()))
+        thread.start()
+        thread.join()
+        self.assertIs(handle.get(), handle.get())
+        self.assertIsNot(handle.get(), instances[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+# test_online_calibration.py
+import tempfile
+import unittest
+import numpy as np
+from blink_detector import BlinkDetector
+from eye_tracker import EyeTracker
+from utils.actuator import CursorActuator, RecordingBackend
+from utils.blink_classifier import BlinkEvent
+from utils.calibration_store import CalibrationStore
+from utils.online_calibration import OnlineRecalibrator, SlidingWindowRls
+from utils.visualizer import Visualizer
+
+
+class TestSlidingWindowRls(unittest.TestCase):
+    """Unit tests for sliding-window recursive least squares."""
+
+    def test_matches_batch_solution(self):
+        """Test that incremental updates and downdates equal a batch fit over the window."""
+        rng = np.random.default_rng(0)
+        prior = np.array([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]])
+        rls = SlidingWindowRls(prior, window=10, prior_strength=2.0)
+        samples = [(np.append(rng.uniform(-1, 1, 2), 1.0), rng.uniform(-1, 1, 2)) for _ in range(27)]
+        for features, targets in samples:
+            rls.add(features, targets)
+
+        window = samples[-10:]
+        information = 2.0 * np.eye(3) + sum(np.outer(f, f) for f, _ in window)
+        moment = 2.0 * prior + sum(np.outer(f, t) for f, t in window)
+        np.testing.assert_allclose(rls.weights, np.linalg.solve(information, moment), atol=1e-9)
+        self.assertEqual(len(rls.samples), 10)
+
+
+class TestOnlineRecalibrator(unittest.TestCase):
+    """Unit tests for click-driven recalibration."""
+
+    def click(self, recalibrator, gaze, target, time_base):
+        """Fixates on a mapped gaze point for half a second, then blinks to click on the target."""
+        for i in range(15):
+            recalibrator.observe(time_base + i / 30, *gaze)
+        return recalibrator.on_click(target[0], target[1], time_base + 0.5)
+
+    def test_learns_drift(self):
+        """Test that clicks on hand-placed targets correct a constant offset in the mapped gaze."""
+        recalibrator = OnlineRecalibrator(window=20, prior_strength=1.0)
+        rng = np.random.default_rng(1)
+        for i in range(20):
+            target = rng.uniform((100, 100), (1800, 1000))
+            self.assertTrue(self.click(recalibrator, target + (60, -40), target, i * 2.0))
+
+        corrected = recalibrator.correct(960.0 + 60, 540.0 - 40)
+        np.testing.assert_allclose(corrected, (960.0, 540.0), atol=5.0)
+        self.assertEqual(recalibrator.samples_accepted, 20)
+
+    def test_identity_before_clicks(self):
+        """Test that the correction leaves points unchanged until something is learned."""
+        self.assertEqual(OnlineRecalibrator().correct(300.0, 200.0), (300.0, 200.0))
+
+    def test_ignores_unrelated_clicks(self):
+        """Test that clicks far from the gaze or without a fixation are not learned."""
+        recalibrator = OnlineRecalibrator(max_error=100)
+        self.assertFalse(self.click(recalibrator, (100.0, 100.0), (900.0, 700.0), 0.0))
+        self.assertFalse(recalibrator.on_click(100, 100, 50.0))  # No gaze recorded before this blink
+        self.assertEqual(recalibrator.samples_rejected, 1)
+        self.assertEqual(recalibrator.correct(10.0, 10.0), (10.0, 10.0))
+
+    def test_reset(self):
+        """Test that reset forgets the learned correction."""
+        recalibrator = OnlineRecalibrator(prior_strength=0.5)
+        self.click(recalibrator, (500.0, 500.0), (520.0, 480.0), 0.0)
+        self.assertNotEqual(recalibrator.correct(500.0, 500.0), (500.0, 500.0))
+        recalibrator.reset()
+        self.assertEqual(recalibrator.correct(500.0, 500.0), (500.0, 500.0))
+
+
+
+class DriftedMapping:
+    """Stale calibration: the true gaze point, scaled and shifted as if the camera had moved."""
+
+    kind = "drifted"
+
+    def map_point(self, x, y):
+        return 1.05 * x + 40.0, 0.97 * y - 30.0
+
+
+class TestRecalibrationFromClicks(unittest.TestCase):
+    """End-to-end test of click-driven recalibration through the tracker's gaze mapping."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.backend = RecordingBackend()
+        self.actuator = CursorActuator(self.backend, max_rate_hz=1000, manual_hold=5.0)
+        self.recalibrator = OnlineRecalibrator(window=20, prior_strength=1.0)
+        self.tracker = EyeTracker(actuator=self.actuator, visualizer=Visualizer(mode="off"), calibration_store=CalibrationStore(self.temp_dir.name),
+                                  recalibrator=self.recalibrator, head_pose=False, pupils=False)
+        self.tracker.gaze_mapper = DriftedMapping()
+        self.blinks = BlinkDetector(actuator=self.actuator, visualizer=Visualizer(mode="off"), recalibrator=self.recalibrator)
+
+    def tearDown(self):
+        self.blinks.dispatcher.stop()
+        self.actuator.stop()
+        self.temp_dir.cleanup()
+
+    def look_and_click(self, target, time_base, by_hand):
+        """Fixates a target for half a second, optionally nudging the cursor onto it, then blink-clicks."""
+        for i in range(15):
+            cursor = self.tracker.map_gaze_to_screen(target[0], target[1], time_base + i / 30)
+            self.actuator._send_move((*cursor, None))
+            if by_hand and i == 5:
+                self.backend.pointer = (int(target[0]), int(target[1]))
+        self.blinks.process_single_blink(BlinkEvent("single", time_base + 0.5, time_base + 0.6))
+        self.actuator.manual_until = 0.0  # Gaze takes over again before the next target
+
+    def mean_error(self, targets):
+        return np.mean([np.hypot(*np.subtract(self.tracker.map_gaze_to_screen(*target), target)) for target in targets])
+
+    def test_hand_placed_clicks_improve_accuracy(self):
+        """Test that clicks on targets the user reached by hand remove the drift from the cursor."""
+        rng = np.random.default_rng(2)
+        test_targets = rng.uniform((100, 100), (1800, 1000), size=(50, 2))
+        before = self.mean_error(test_targets)
+        for i, target in enumerate(rng.uniform((100, 100), (1800, 1000), size=(20, 2))):
+            self.look_and_click(target, i * 2.0, by_hand=True)
+        after = self.mean_error(test_targets)
+
+        self.assertGreater(self.recalibrator.samples_accepted, 10)  # Later cursors land on target without a nudge
+        self.assertGreater(before, 40.0)
+        self.assertLess(after, before * 0.1)
+
+    def test_clicks_at_gaze_cursor_learn_nothing(self):
+        """Test that clicks where the tracker itself put the cursor are not used as labels."""
+        rng = np.random.default_rng(3)
+        for i, target in enumerate(rng.uniform((100, 100), (1800, 1000), size=(10, 2))):
+            self.look_and_click(target, i * 2.0, by_hand=False)
+        self.assertEqual(self.recalibrator.samples_accepted, 0)
+        self.assertEqual(self.recalibrator.correct(500.0, 500.0), (500.0, 500.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
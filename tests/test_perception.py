@@ -0,0 +1,274 @@
+# test_perception.py
+import threading
+import time
+import unittest
+import numpy as np
+from utils.frame_bus import FrameBus
+from utils.metrics import MetricsRegistry
+from utils.perception import FaceTracker, PerceptionStage
+
+
+class FakeRect:
+    """Stand-in for a dlib rectangle."""
+
+    def __init__(self, left, top, right, bottom):
+        self._box = (left, top, right, bottom)
+
+    def left(self):
+        return self._box[0]
+
+    def top(self):
+        return self._box[1]
+
+    def right(self):
+        return self._box[2]
+
+    def bottom(self):
+        return self._box[3]
+
+    def width(self):
+        return self._box[2] - self._box[0]
+
+    def height(self):
+        return self._box[3] - self._box[1]
+
+
+class FakeShape:
+    """Stand-in for a dlib full_object_detection."""
+
+    num_parts = 5
+
+    def parts(self):
+        return [type("Point", (), {"x": i * 10, "y": i * 5}) for i in range(self.num_parts)]
+
+
+class FakeCorrelationTracker:
+    """Stand-in for a dlib correlation_tracker that records the frames it is updated with."""
+
+    def __init__(self, confidence=10.0, shift=(0, 0)):
+        self.confidence = confidence
+        self.shift = shift
+        self.frames = []
+        self.face = None
+
+    def start_track(self, gray, face):
+        self.face = FakeRect(face.left(), face.top(), face.right(), face.bottom())
+
+    def update(self, gray):
+        self.frames.append(int(gray[0, 0]))
+        self.face = FakeRect(self.face.left() + self.shift[0], self.face.top() + self.shift[1],
+                             self.face.right() + self.shift[0], self.face.bottom() + self.shift[1])
+        return self.confidence
+
+    def get_position(self):
+        return self.face
+
+
+def frame(number):
+    """A 200x200 grayscale frame tagged with its number in every pixel."""
+    return np.full((200, 200), number, dtype=np.uint8)
+
+
+class FakeCapture:
+    """Camera stand-in that yields numbered frames at a steady pace, then ends."""
+
+    def __init__(self, count, interval=0.01):
+        self.count = count
+        self.interval = interval
+        self.position = 0
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.position >= self.count:
+            return False, None
+        time.sleep(self.interval)
+        self.position += 1
+        return True, frame(self.position - 1)
+
+    def release(self):
+        pass
+
+
+def box(rect):
+    return rect.left(), rect.top(), rect.right(), rect.bottom()
+
+
+class FakeDetector:
+    """Face detector that records the image sizes it is run on and returns preset faces."""
+
+    def __init__(self, full_faces, roi_faces=()):
+        self.full_faces = list(full_faces)
+        self.roi_faces = list(roi_faces)
+        self.calls = []
+
+    def __call__(self, gray):
+        self.calls.append(gray.shape)
+        return self.full_faces if gray.shape == (200, 200) else self.roi_faces
+
+
+class TestFaceTracker(unittest.TestCase):
+    """Unit tests for correlation tracking with ROI and full re-detection."""
+
+    def setUp(self):
+        self.correlation = FakeCorrelationTracker(shift=(1, 0))
+        # Face (40, 40)-(100, 100) in a 200x200 frame; the padded ROI is (10, 10)-(130, 130)
+        self.detector = FakeDetector([FakeRect(0, 0, 10, 10), FakeRect(40, 40, 100, 100)], [FakeRect(35, 30, 95, 90)])
+        self.tracker = FaceTracker(self.detector, redetect_interval=1.0, min_confidence=7.0, roi_padding=0.5,
+                                   tracker_factory=lambda: self.correlation)
+
+    def test_tracks_between_detections(self):
+        """Test that frames within the re-detect interval come from the correlation tracker."""
+        self.assertEqual(box(self.tracker.locate(frame(0), 0.0)), (40, 40, 100, 100))  # Largest face
+        for i in range(1, 4):
+            face = self.tracker.locate(frame(i), i * 0.1)
+            self.assertEqual(box(face), (40 + i, 40, 100 + i, 100))
+        self.assertEqual(self.detector.calls, [(200, 200)])
+        self.assertEqual(self.correlation.frames, [1, 2, 3])
+        self.assertEqual((self.tracker.full_detections, self.tracker.tracked_frames), (1, 3))
+
+    def test_redetects_in_roi_after_interval(self):
+        """Test that the interval forces an ROI re-detection mapped back to frame coordinates."""
+        self.tracker.locate(frame(0), 0.0)
+        face = self.tracker.locate(frame(1), 1.0)
+        self.assertEqual(self.detector.calls, [(200, 200), (120, 120)])
+        self.assertEqual(box(face), (45, 40, 105, 100))
+        self.assertEqual(self.tracker.roi_detections, 1)
+        self.assertEqual(self.tracker.last_detection_time, 1.0)
+        self.assertEqual(self.correlation.frames, [])  # No correlation update once the interval is up
+
+    def test_low_confidence_falls_back_to_full_detection(self):
+        """Test that a weak correlation peak re-detects, in the full frame if the ROI is empty."""
+        self.tracker.locate(frame(0), 0.0)
+        self.correlation.confidence = 3.0
+        self.detector.roi_faces = []
+        face = self.tracker.locate(frame(1), 0.1)
+        self.assertEqual(self.detector.calls, [(200, 200), (120, 120), (200, 200)])
+        self.assertEqual(box(face), (40, 40, 100, 100))
+        self.assertEqual((self.tracker.full_detections, self.tracker.roi_detections, self.tracker.tracked_frames), (2, 1, 0))
+
+    def test_out_of_bounds_track_redetects(self):
+        """Test that a tracked box leaving the frame is not trusted."""
+        self.correlation.shift = (120, 0)
+        self.tracker.locate(frame(0), 0.0)
+        face = self.tracker.locate(frame(1), 0.1)
+        self.assertEqual(self.tracker.tracked_frames, 0)
+        self.assertEqual(box(face), (45, 40, 105, 100))  # Found again in the ROI around the last good face
+
+    def test_reset_when_face_lost(self):
+        """Test that losing the face clears the tracker and the next frame runs full detection."""
+        self.tracker.locate(frame(0), 0.0)
+        self.correlation.confidence = 0.0
+        self.detector.full_faces, self.detector.roi_faces = [], []
+        self.assertIsNone(self.tracker.locate(frame(1), 0.1))
+        self.assertIsNone(self.tracker.tracker)
+        self.assertIsNone(self.tracker.face)
+
+        self.detector.calls.clear()
+        self.assertIsNone(self.tracker.locate(frame(2), 0.2))
+        self.assertEqual(self.detector.calls, [(200, 200)])  # No face to track or search around
+
+    def test_reset(self):
+        """Test that reset() forces full detection on the next frame."""
+        self.tracker.locate(frame(0), 0.0)
+        self.tracker.reset()
+        self.tracker.locate(frame(1), 0.1)
+        self.assertEqual(self.detector.calls, [(200, 200), (200, 200)])
+        self.assertEqual(self.correlation.frames, [])
+
+
+class TestFaceTrackerConcurrency(unittest.TestCase):
+    """Tests that FaceTracker is safe and parallel across perception workers."""
+
+    def test_detection_runs_outside_the_lock(self):
+        """Test that two workers can be inside the face detector at the same time."""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def detector(gray):
+            barrier.wait()  # Breaks, and fails the test, if detections are serialized
+            return [FakeRect(40, 40, 100, 100)]
+
+        tracker = FaceTracker(detector, tracker_factory=FakeCorrelationTracker)
+        results = {}
+        workers = [threading.Thread(target=lambda t=t: results.setdefault(t, tracker.locate(frame(t), t))) for t in (1, 2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=5)
+        self.assertEqual(sorted(results), [1, 2])
+        self.assertEqual(tracker.face and box(tracker.face), (40, 40, 100, 100))
+
+    def test_late_frames_do_not_reach_the_tracker(self):
+        """Test that a frame finished after a newer one never updates the correlation tracker."""
+        correlation = FakeCorrelationTracker(shift=(2, 0))
+        tracker = FaceTracker(lambda gray: [FakeRect(40, 40, 100, 100)], tracker_factory=lambda: correlation)
+        tracker.locate(frame(0), 0.0)
+        tracker.locate(frame(2), 0.2)
+        late = tracker.locate(frame(1), 0.1)  # From a slower worker
+        self.assertEqual(correlation.frames, [2])
+        self.assertEqual(box(late), (42, 40, 102, 100))
+
+
+class TestPerceptionStage(unittest.TestCase):
+    """Unit tests for the PerceptionStage module."""
+
+    def setUp(self):
+        """Set up a stage with counting fake models."""
+        self.detector_calls = 0
+
+        def detector(gray):
+            self.detector_calls += 1
+            return [FakeRect(0, 0, 10, 10), FakeRect(0, 0, 50, 50)]
+
+        self.stage = PerceptionStage(None, detector, lambda gray, face: FakeShape())
+
+    def test_process_picks_largest_face(self):
+        """Test that the largest detected face is used and landmarks are read-only."""
+        result = self.stage.process(np.zeros((60, 60), dtype=np.uint8), frame_index=3, timestamp=1.5)
+        self.assertEqual(result.face, (0, 0, 50, 50))
+        self.assertEqual(result.landmarks.shape, (5, 2))
+        self.assertFalse(result.landmarks.flags.writeable)
+        self.assertEqual((result.frame_index, result.timestamp), (3, 1.5))
+
+    def test_publish_shares_one_result(self):
+        """Test that every subscriber receives the same result from a single detection."""
+        first, second = self.stage.subscribe(), self.stage.subscribe()
+        self.stage.publish(self.stage.process(np.zeros((60, 60), dtype=np.uint8)))
+        self.assertIs(first.get(timeout=0), second.get(timeout=0))
+        self.assertEqual(self.detector_calls, 1)
+
+    def run_with_failing_frames(self, workers):
+        """Runs ten frames through a stage whose detector fails on odd frames; returns (indices, errors)."""
+        def detector(gray):
+            if gray[0, 0] % 2:
+                raise RuntimeError("detector failed")
+            return []
+
+        metrics = MetricsRegistry()
+        stage = PerceptionStage(FrameBus(capture=FakeCapture(10)), detector, lambda gray, face: FakeShape(), workers=workers, metrics=metrics)
+        subscription = stage.subscribe(capacity=20)
+        self.assertTrue(stage.start())
+        indices = []
+        while True:
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                if not stage.is_running():
+                    break
+                continue
+            indices.append(result.frame_index)
+        stage.stop()
+        return indices, metrics.counter("perception_errors").value
+
+    def test_worker_errors_are_reported_and_survived(self):
+        """Test that a failing frame is counted and skipped with one worker or several."""
+        for workers in (1, 2):
+            with self.subTest(workers=workers), self.assertLogs("EyeTrackingApp.perception", level="ERROR") as logs:
+                indices, errors = self.run_with_failing_frames(workers)
+                self.assertEqual(indices, [0, 2, 4, 6, 8])
+                self.assertEqual(errors, 5)
+                self.assertIn("detector failed", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
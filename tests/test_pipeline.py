@@ -0,0 +1,44 @@
+# test_pipeline.py
+import threading
+import unittest
+from utils.pipeline import FixedRateWorker, LatestSlot, StageLatency, format_latency_report
+
+
+class TestPipeline(unittest.TestCase):
+    """Unit tests for the pipeline helpers."""
+
+    def test_latest_slot_keeps_newest(self):
+        """Test that a pending item is replaced by a newer one."""
+        slot = LatestSlot()
+        slot.put(1)
+        slot.put(2)
+        self.assertEqual(slot.get(timeout=0), 2)
+        self.assertEqual(slot.replaced, 1)
+        self.assertIsNone(slot.get(timeout=0))
+
+    def test_stage_latency_report(self):
+        """Test that statistics are kept and the slowest stage is marked."""
+        fast, slow = StageLatency("fast"), StageLatency("slow")
+        fast.record(0.001)
+        slow.record(0.010)
+        slow.record(0.030)
+        self.assertEqual(slow.count, 2)
+        self.assertAlmostEqual(slow.max, 0.030)
+        report = format_latency_report([fast, slow])
+        self.assertIn("slow", report.splitlines()[1])
+        self.assertIn("slowest", report.splitlines()[1])
+
+    def test_fixed_rate_worker_handles_items(self):
+        """Test that the worker runs its handler on its own thread."""
+        slot = LatestSlot()
+        handled = threading.Event()
+        worker = FixedRateWorker("actuate", slot, lambda item: handled.set(), rate_hz=100)
+        worker.start()
+        slot.put((1, 2))
+        self.assertTrue(handled.wait(timeout=2))
+        worker.stop()
+        self.assertEqual(worker.latency.count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
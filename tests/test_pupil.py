@@ -0,0 +1,74 @@
+# test_pupil.py
+import unittest
+import cv2
+import numpy as np
+from utils.pupil import PupilLocator
+
+
+def eye_image(pupil, roll=0.0):
+    """Draws a skin-toned frame with one eye between (260, 200) and (300, 200) and a dark pupil."""
+    gray = np.full((480, 640), 170, dtype=np.uint8)
+    cv2.ellipse(gray, (280, 200), (22, 10), roll, 0, 360, 220, -1)
+    cv2.circle(gray, pupil, 7, 40, -1)
+    return gray
+
+
+def closed_eye_image(lash_y=200, thickness=2):
+    """Draws a closed eye between (260, 200) and (300, 200): skin with a dark, slightly curved lash line."""
+    gray = np.full((480, 640), 170, dtype=np.uint8)
+    cv2.ellipse(gray, (280, lash_y - 3), (19, 4), 0, 20, 160, 50, thickness)
+    return gray
+
+
+class TestPupilLocator(unittest.TestCase):
+    """Unit tests for pupil localization on eye crops."""
+
+    def setUp(self):
+        self.locator = PupilLocator()
+
+    def test_pupil_position_in_eye_box(self):
+        """Test that the pupil is found and moves with the eye, not with the eyelid corners."""
+        positions = []
+        for pupil_x in (273, 280, 287):
+            box, image = self.locator.locate(eye_image((pupil_x, 201)), (260, 200), (300, 200))
+            np.testing.assert_allclose(image, (pupil_x, 201), atol=0.5)
+            positions.append(box[0])
+        self.assertLess(positions[0], -0.1)
+        self.assertAlmostEqual(positions[1], 0.0, delta=0.02)
+        self.assertGreater(positions[2], 0.1)
+
+    def test_corner_order_and_roll(self):
+        """Test that swapped corners and a tilted eye give the same pupil."""
+        gray = eye_image((284, 203), roll=10)
+        forward = self.locator.locate(gray, (261, 197), (299, 203))
+        backward = self.locator.locate(gray, (299, 203), (261, 197))
+        np.testing.assert_allclose(forward[0], backward[0], atol=1e-9)
+        np.testing.assert_allclose(forward[1], (284, 203), atol=0.5)
+
+    def test_no_pupil(self):
+        """Test that a closed or featureless eye reports no pupil."""
+        self.assertIsNone(self.locator.locate(np.full((480, 640), 170, dtype=np.uint8), (260, 200), (300, 200)))
+        self.assertIsNone(self.locator.locate(eye_image((280, 201)), (280, 200), (281, 200)))  # Eye too small
+        for lash_y in (199, 201, 203):
+            for thickness in (1, 2, 3):
+                self.assertIsNone(self.locator.locate(closed_eye_image(lash_y, thickness), (260, 200), (300, 200)))
+
+    def test_partly_covered_pupil(self):
+        """Test that a pupil half hidden by the upper eyelid is still found."""
+        gray = eye_image((280, 201))
+        gray[190:201, 270:291] = 170  # Lowered eyelid over the top half
+        box, _ = self.locator.locate(gray, (260, 200), (300, 200))
+        self.assertAlmostEqual(box[0], 0.0, delta=0.02)
+        self.assertGreater(box[1], 0.0)
+
+    def test_buffers_are_reused(self):
+        """Test that repeated calls work in the same preallocated crop."""
+        crop = self.locator.crop
+        corners = np.array([[(260, 200), (300, 200)], [(260, 200), (300, 200)]])
+        left, right = self.locator.locate_both(eye_image((280, 201)), corners)
+        self.assertIs(self.locator.crop, crop)
+        self.assertEqual(left, right)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# test_recorder.py
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import numpy as np
+from utils.frame_bus import FrameBus
+from utils.perception import PerceptionStage
+from utils.recorder import FrameRecorder, ReplaySource, open_capture
+
+
+class TestRecorder(unittest.TestCase):
+    """Unit tests for frame recording and replay."""
+
+    def setUp(self):
+        """Record a short synthetic session."""
+        self.directory = tempfile.mkdtemp()
+        recorder = FrameRecorder(self.directory, chunk_frames=4)
+        for i in range(10):
+            recorder.write(np.full((6, 8), i, dtype=np.uint8), 100.0 + i / 30)
+        recorder.close()
+
+    def tearDown(self):
+        """Remove the recording."""
+        shutil.rmtree(self.directory)
+
+    def test_replay_returns_recorded_frames(self):
+        """Test that frames come back in order across chunk boundaries."""
+        source = ReplaySource(self.directory)
+        self.assertTrue(source.isOpened())
+        values = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            self.assertEqual(frame.shape, (6, 8))
+            values.append(int(frame[0, 0]))
+        self.assertEqual(values, list(range(10)))
+        self.assertEqual(len(os.listdir(self.directory)), 5)  # 3 chunks, timestamps, index
+
+    def test_replay_keeps_recorded_timing(self):
+        """Test that replayed timestamps keep the recorded frame spacing."""
+        source = ReplaySource(self.directory)
+        source.read()
+        first = source.timestamp
+        source.read()
+        self.assertAlmostEqual(source.timestamp - first, 1 / 30)
+
+    def test_frame_bus_replays_recording(self):
+        """Test that a recording can stand in for a camera on the frame bus."""
+        bus = FrameBus(capture=open_capture(self.directory, realtime=False))
+        subscription = bus.subscribe(capacity=20)
+        self.assertTrue(bus.start())
+        frames = []
+        while True:
+            frame = subscription.get(timeout=1.0)
+            if frame is None:
+                break
+            frames.append(frame)
+        self.assertEqual(len(frames), 10)
+        self.assertAlmostEqual(frames[-1].timestamp - frames[0].timestamp, 9 / 30)
+
+    def replay_through_pipeline(self):
+        """Replays the recording at maximum speed through a perception stage into a slow consumer."""
+        bus = FrameBus(self.directory, realtime=False)
+        perception = PerceptionStage(bus, lambda gray: [], lambda gray, face: None, mode="track", workers=2)
+        subscription = perception.subscribe(capacity=1)
+        self.assertTrue(perception.start())
+        results = []
+        while True:
+            result = subscription.get(timeout=1.0)
+            if result is None:
+                if not perception.is_running():
+                    break
+                continue
+            results.append((result.frame_index, int(result.gray[0, 0])))
+            time.sleep(0.01)  # Slower than capture: a drop-oldest pipeline would lose frames here
+        perception.stop()
+        return results
+
+    def test_lossless_replay_delivers_every_frame_in_order(self):
+        """Test that a maximum-speed replay reaches the consumer frame by frame, the same every run."""
+        first = self.replay_through_pipeline()
+        self.assertEqual(first, [(i, i) for i in range(10)])
+        self.assertEqual(self.replay_through_pipeline(), first)
+
+    def test_lossless_bus_applies_backpressure(self):
+        """Test that a full lossless subscription holds the capture thread instead of dropping."""
+        bus = FrameBus(self.directory, realtime=False)
+        subscription = bus.subscribe(capacity=1)
+        self.assertTrue(bus.start())
+        time.sleep(0.05)
+        self.assertEqual(bus.frame_count, 2)  # One buffered, one waiting to be pushed
+        values = []
+        while True:
+            frame = subscription.get_latest(timeout=1.0)
+            if frame is None:
+                break
+            values.append(int(frame.gray[0, 0]))
+        self.assertEqual(values, list(range(10)))
+        self.assertEqual(subscription.dropped, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+# test_service.py
+import json
+import socket
+import threading
+import unittest
+from service import ControlServer, parse_device
+
+
+class FakeService:
+    """Stand-in for TrackingService that records the commands it receives."""
+
+    def __init__(self):
+        self.running = False
+        self.user = "default"
+
+    def start(self):
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def use_calibration(self, user):
+        self.user = user
+        return {"user": user}
+
+    def status(self):
+        return {"running": self.running}
+
+
+class TestService(unittest.TestCase):
+    """Unit tests for the headless service control socket."""
+
+    def setUp(self):
+        self.service = FakeService()
+        self.server = ControlServer(self.service, port=0)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def send(self, *commands):
+        with socket.create_connection(self.server.server_address, timeout=2) as connection:
+            connection.sendall("".join(f"{command}\n" for command in commands).encode())
+            reader = connection.makefile()
+            return [json.loads(reader.readline()) for _ in commands]
+
+    def test_start_status_stop(self):
+        """Test that commands on one connection drive the service in order."""
+        start, status, stop, stopped = self.send("start", "status", "stop", "status")
+        self.assertTrue(start["ok"])
+        self.assertTrue(status["running"])
+        self.assertTrue(stop["ok"])
+        self.assertFalse(stopped["running"])
+
+    def test_unknown_command(self):
+        """Test that an unknown command is reported, not fatal."""
+        (reply,) = self.send("pause")
+        self.assertFalse(reply["ok"])
+        self.assertIn("Unknown command", reply["error"])
+
+    def test_switch_user(self):
+        """Test that the user command keeps the name's case and replies with the calibration."""
+        (reply,) = self.send("USER Alice")
+        self.assertTrue(reply["ok"])
+        self.assertEqual(self.service.user, "Alice")
+        self.assertEqual(reply["calibration"], {"user": "Alice"})
+
+    def test_quit_sets_event(self):
+        """Test that quit asks the main thread to shut down."""
+        self.send("quit")
+        self.assertTrue(self.server.quit_event.is_set())
+
+    def test_parse_device(self):
+        """Test that numeric devices are camera indices and others are paths."""
+        self.assertEqual(parse_device("1"), 1)
+        self.assertEqual(parse_device("recordings/session1"), "recordings/session1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+# test_smoothing.py
+import unittest
+import numpy as np
+from utils.smoothing import FILTERS, create_filter
+
+
+class TestSmoothing(unittest.TestCase):
+    """Unit tests for the cursor smoothing filters."""
+
+    def setUp(self):
+        """Set up a noisy fixation at (500, 300) sampled at 30 FPS."""
+        rng = np.random.default_rng(0)
+        self.samples = [(500 + dx, 300 + dy, i / 30) for i, (dx, dy) in enumerate(rng.normal(0, 8, size=(120, 2)))]
+
+    def test_filters_reduce_jitter(self):
+        """Test that every smoothing filter moves the cursor less than the raw gaze does."""
+        for name in ("exponential", "one_euro", "kalman"):
+            with self.subTest(filter=name):
+                cursor_filter = create_filter(name)
+                for x, y, timestamp in self.samples:
+                    cursor_filter.filter(x, y, timestamp)
+                metrics = cursor_filter.metrics.summary()
+                self.assertEqual(metrics["updates"], len(self.samples))
+                self.assertLess(metrics["jitter_px"], metrics["raw_jitter_px"])
+
+    def test_filters_follow_a_step(self):
+        """Test that filters converge to a new fixation after a saccade."""
+        for name in FILTERS:
+            with self.subTest(filter=name):
+                cursor_filter = create_filter(name)
+                for i in range(60):
+                    x, y = cursor_filter.filter(100.0 if i < 10 else 900.0, 200.0, i / 30)
+                self.assertAlmostEqual(x, 900.0, delta=10.0)
+                self.assertAlmostEqual(y, 200.0, delta=10.0)
+
+    def test_unknown_filter(self):
+        """Test that an unknown filter name is rejected."""
+        with self.assertRaises(ValueError):
+            create_filter("median")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+# test_visualizer.py
+import time
+import unittest
+from collections import namedtuple
+from unittest import mock
+import numpy as np
+from utils.visualizer import Visualizer
+
+# Same fields as utils.perception.PerceptionResult, without needing dlib
+PerceptionResult = namedtuple("PerceptionResult", ["frame_index", "timestamp", "image", "gray", "face", "landmarks"])
+
+
+def make_result(index=0):
+    image = np.zeros((120, 160, 3), dtype=np.uint8)
+    landmarks = np.array([(20 + 5 * i, 40 + i % 3) for i in range(48)], dtype=np.int32)
+    return PerceptionResult(index, 0.0, image, image[..., 0], (10, 10, 100, 100), landmarks)
+
+
+class TestVisualizer(unittest.TestCase):
+    """Unit tests for the debug render sink."""
+
+    def test_unknown_mode(self):
+        """Test that an unknown mode is rejected."""
+        with self.assertRaises(ValueError):
+            Visualizer(mode="verbose")
+
+    @mock.patch("utils.visualizer.cv2.imshow")
+    def test_off_mode_renders_nothing(self, imshow):
+        """Test that submitting in off mode never reaches the render thread."""
+        visualizer = Visualizer(mode="off")
+        visualizer.start()
+        visualizer.submit(make_result())
+        time.sleep(0.1)
+        visualizer.stop()
+        imshow.assert_not_called()
+        self.assertFalse(visualizer.enabled)
+
+    @mock.patch("utils.visualizer.cv2.waitKey", return_value=ord("q"))
+    @mock.patch("utils.visualizer.cv2.imshow")
+    def test_render_draws_copy_and_handles_quit(self, imshow, wait_key):
+        """Test that rendering draws on a copy and 'q' requests a stop."""
+        visualizer = Visualizer(mode="full", eye_indices=([36, 37, 38, 39, 40, 41], [42, 43, 44, 45, 46, 47]))
+        result = make_result()
+        visualizer._render((result, (("EAR: 0.300", (0, 255, 0)),)))
+        drawn = imshow.call_args[0][1]
+        self.assertTrue(drawn.any())
+        self.assertFalse(result.image.any())  # The shared result is untouched
+        self.assertTrue(visualizer.quit_requested.is_set())
+
+    @mock.patch("utils.visualizer.cv2.waitKey", return_value=-1)
+    @mock.patch("utils.visualizer.cv2.imshow")
+    def test_render_rate_is_capped(self, imshow, wait_key):
+        """Test that the render thread shows at most max_fps frames per second."""
+        visualizer = Visualizer(mode="overlay", max_fps=10)
+        visualizer.start()
+        end_time = time.monotonic() + 0.5
+        index = 0
+        while time.monotonic() < end_time:
+            visualizer.submit(make_result(index))
+            index += 1
+            time.sleep(0.005)
+        with mock.patch("utils.visualizer.cv2.destroyWindow"):
+            visualizer.stop()
+        self.assertGreater(index, 50)
+        self.assertLessEqual(imshow.call_count, 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,259 @@
+# actuator.py
+import threading
+import time
+from collections import deque
+
+from utils.pipeline import StageLatency
+from utils.logger import Logger
+
+logger = Logger.get_logger("actuator")
+
+
+class PyAutoGuiBackend:
+    """Sends cursor output through pyautogui with its per-call pause disabled."""
+
+    def __init__(self, fail_safe=False):
+        """
+        Initialize the backend.
+
+        Args:
+            fail_safe (bool): Keep pyautogui's corner fail-safe. Off by default because
+                gaze legitimately reaches the screen corners.
+        """
+        import pyautogui  # Imported here so headless backends don't need a display
+
+        self.pyautogui = pyautogui
+        self.pyautogui.PAUSE = 0
+        self.pyautogui.FAILSAFE = fail_safe
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self, button):
+        self.pyautogui.click(button=button, _pause=False)
+
+    def mouse_down(self, button):
+        self.pyautogui.mouseDown(button=button, _pause=False)
+
+    def mouse_up(self, button):
+        self.pyautogui.mouseUp(button=button, _pause=False)
+
+    def position(self):
+        x, y = self.pyautogui.position()
+        return x, y
+
+
+class NullBackend:
+    """Discards all cursor output; for headless runs and benchmarks."""
+
+    def move_to(self, x, y):
+        pass
+
+    def click(self, button):
+        pass
+
+    def mouse_down(self, button):
+        pass
+
+    def mouse_up(self, button):
+        pass
+
+    def position(self):
+        """Returns the (x, y) cursor position, or None if the backend can't read it."""
+        return None
+
+
+class RecordingBackend(NullBackend):
+    """Records cursor output as (action, args) tuples for headless tests; set `pointer` to move the cursor by hand."""
+
+    def __init__(self):
+        self.events = []
+        self.pointer = None
+
+    def move_to(self, x, y):
+        self.events.append(("move_to", (x, y)))
+        self.pointer = (x, y)
+
+    def position(self):
+        return self.pointer
+
+    def click(self, button):
+        self.events.append(("click", (button,)))
+
+    def mouse_down(self, button):
+        self.events.append(("mouse_down", (button,)))
+
+    def mouse_up(self, button):
+        self.events.append(("mouse_up", (button,)))
+
+
+class CursorActuator:
+    """
+    Sends cursor output on its own thread, coalescing moves and capping the output rate.
+
+    When the user moves the cursor with another pointing device, gaze moves are held
+    back for `manual_hold` seconds so the cursor stays where the hand put it.
+    """
+
+    def __init__(self, backend=None, dead_zone=2, max_rate_hz=60, manual_hold=2.0, manual_tolerance=3):
+        """
+        Initialize the actuator.
+
+        Args:
+            backend: Output backend; a PyAutoGuiBackend is created when None.
+            dead_zone (float): Moves closer than this many pixels to the last sent position are skipped.
+            max_rate_hz (float): Maximum number of cursor moves per second, normally the display refresh rate.
+            manual_hold (float): Seconds gaze moves wait after the cursor was moved by hand; 0 disables.
+            manual_tolerance (float): Pixels the cursor may differ from the last sent move before
+                it counts as moved by hand.
+        """
+        self.backend = backend if backend is not None else PyAutoGuiBackend()
+        self.dead_zone = dead_zone
+        self.interval = 1.0 / max_rate_hz
+        self.manual_hold = manual_hold
+        self.manual_tolerance = manual_tolerance
+
+        self.condition = threading.Condition()
+        self.pending_move = None
+        self.pending_buttons = deque()
+        self.position = None
+        self.running = False
+
+        # Where the backend reported the cursor after the last sent move, and the last hand move
+        self.manual_lock = threading.Lock()
+        self.cursor = None
+        self.manual_position = None
+        self.manual_until = 0.0
+        self.thread = None
+
+        # Output statistics
+        self.moves_sent = 0
+        self.moves_coalesced = 0
+        self.moves_skipped = 0
+        self.manual_moves = 0
+        self.latency = StageLatency("actuate")
+        self.glass_to_cursor_latency = StageLatency("glass-to-cursor")
+
+    def start(self):
+        """Starts the output thread."""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+            self.thread = threading.Thread(target=self._output_loop, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Flushes pending button actions and stops the output thread."""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+
+    def move(self, x, y, timestamp=None):
+        """
+        Requests a cursor move. Only the newest pending target is sent.
+
+        Args:
+            x (int): Target screen x coordinate.
+            y (int): Target screen y coordinate.
+            timestamp (float): Optional time.monotonic() capture time, for glass-to-cursor latency.
+        """
+        self.start()
+        with self.condition:
+            if self.pending_move is not None:
+                self.moves_coalesced += 1
+            self.pending_move = (x, y, timestamp)
+            self.condition.notify()
+
+    def click(self, button="left"):
+        """Requests a click at the current cursor position."""
+        self._queue_button("click", button)
+
+    def right_click(self):
+        """Requests a right click at the current cursor position."""
+        self._queue_button("click", "right")
+
+    def mouse_down(self, button="left"):
+        """Requests a button press."""
+        self._queue_button("mouse_down", button)
+
+    def mouse_up(self, button="left"):
+        """Requests a button release."""
+        self._queue_button("mouse_up", button)
+
+    def _queue_button(self, action, button):
+        """Button actions are never coalesced and keep their order."""
+        self.start()
+        with self.condition:
+            self.pending_buttons.append((action, button))
+            self.condition.notify()
+
+    def hand_position(self):
+        """
+        Returns where the user put the cursor by hand, or None once gaze moves have taken over again.
+
+        Unlike the gaze-driven position, this does not depend on the gaze mapping.
+        """
+        return self.manual_position if self._manual_hold() else None
+
+    def _manual_hold(self):
+        """Detects a cursor moved by hand since the last sent move; True while gaze moves wait for it."""
+        if self.cursor is None:
+            return False
+        with self.manual_lock:
+            now = time.monotonic()
+            current = self.backend.position()
+            if current is not None and max(abs(current[0] - self.cursor[0]), abs(current[1] - self.cursor[1])) > self.manual_tolerance:
+                self.cursor = self.position = self.manual_position = (int(current[0]), int(current[1]))
+                self.manual_until = now + self.manual_hold
+                self.manual_moves += 1
+            return now < self.manual_until
+
+    def _send_move(self, move):
+        """Sends one move unless it falls inside the dead zone or the user is moving the cursor by hand."""
+        x, y, timestamp = move
+        if self._manual_hold():
+            self.moves_skipped += 1
+            return False
+        if self.position is not None and abs(x - self.position[0]) < self.dead_zone and abs(y - self.position[1]) < self.dead_zone:
+            self.moves_skipped += 1
+            return False
+        self.backend.move_to(x, y)
+        self.position = (x, y)
+        if self.manual_hold > 0:
+            with self.manual_lock:  # Read back, as the system clamps the cursor to the screens
+                self.cursor = self.backend.position()
+        self.moves_sent += 1
+        if timestamp is not None:
+            self.glass_to_cursor_latency.record(time.monotonic() - timestamp)
+        return True
+
+    def _output_loop(self):
+        """Sends the newest move and any queued button actions, at most once per interval."""
+        next_move_time = 0.0
+        while True:
+            with self.condition:
+                while self.running and not self.pending_buttons and (self.pending_move is None or time.perf_counter() < next_move_time):
+                    timeout = None if self.pending_move is None else max(0.0, next_move_time - time.perf_counter())
+                    self.condition.wait(timeout)
+                if not self.running and not self.pending_buttons:
+                    return
+
+                move = None
+                if self.pending_move is not None and time.perf_counter() >= next_move_time:
+                    move, self.pending_move = self.pending_move, None
+                buttons = list(self.pending_buttons)
+                self.pending_buttons.clear()
+
+            start_time = time.perf_counter()
+            try:
+                if move is not None and self._send_move(move):
+                    next_move_time = start_time + self.interval
+                for action, button in buttons:
+                    getattr(self.backend, action)(button)
+            except Exception as e:
+                logger.error("Error sending cursor output: %s", e)
+            self.latency.record_since(start_time)
@@ -0,0 +1,87 @@
+# adaptive_threshold.py
+import statistics
+
+
+class AdaptiveEarThreshold:
+    """Derives the blink EAR threshold from streaming statistics of the user's open-eye EAR."""
+
+    def __init__(self, initial_threshold=0.25, window=300, closed_ratio=0.7, deviations=3.0, warmup=30,
+                 min_threshold=0.1, max_threshold=0.35, reject_ratio=0.5):
+        """
+        Initialize the adaptive threshold.
+
+        Args:
+            initial_threshold (float): Threshold used until enough samples have been seen.
+            window (int): Effective number of recent open-eye samples in the running statistics.
+            closed_ratio (float): The threshold is at most this fraction of the open-eye baseline.
+            deviations (float): The threshold is also at least this many mean absolute
+                deviations below the baseline.
+            warmup (int): Open-eye samples collected before the threshold starts adapting.
+            min_threshold (float): Lower clamp for the derived threshold.
+            max_threshold (float): Upper clamp for the derived threshold.
+            reject_ratio (float): After the warm-up, samples below this fraction of the
+                baseline are treated as closed eyes and left out of the statistics.
+        """
+        self.alpha = 2.0 / (window + 1)
+        self.closed_ratio = closed_ratio
+        self.deviations = deviations
+        self.warmup = warmup
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.reject_ratio = reject_ratio
+
+        self.initial_threshold = initial_threshold
+        self.threshold = initial_threshold
+        self.baseline = None  # Exponentially weighted mean of open-eye EAR
+        self.deviation = 0.0  # Exponentially weighted mean absolute deviation
+        self.samples = 0
+        self.warmup_samples = []
+
+    def update(self, ear):
+        """
+        Adds one EAR sample and returns the current threshold.
+
+        The baseline starts as the median of the warm-up samples, which the few blinks
+        among them cannot move, so it does not depend on the initial threshold. After
+        that, samples below `reject_ratio` of the baseline are blinks and are left out;
+        an open-eye EAR that drifts below the current threshold still pulls it along.
+        """
+        if ear is None:
+            return self.threshold
+
+        if self.baseline is None:
+            self.warmup_samples.append(ear)
+            self.samples += 1
+            if self.samples < self.warmup:
+                return self.threshold
+            self.baseline = statistics.median(self.warmup_samples)
+            self.deviation = statistics.median(abs(sample - self.baseline) for sample in self.warmup_samples)
+            self.warmup_samples = []
+        elif ear < self.baseline * self.reject_ratio:
+            return self.threshold
+        else:
+            self.samples += 1
+            error = ear - self.baseline
+            self.baseline += self.alpha * error
+            self.deviation += self.alpha * (abs(error) - self.deviation)
+
+        threshold = min(self.baseline * self.closed_ratio, self.baseline - self.deviations * self.deviation)
+        self.threshold = min(max(threshold, self.min_threshold), self.max_threshold)
+        return self.threshold
+
+    def reset(self):
+        """Starts again from the initial threshold, e.g. after a user or camera change."""
+        self.threshold = self.initial_threshold
+        self.baseline = None
+        self.deviation = 0.0
+        self.samples = 0
+        self.warmup_samples = []
+
+    def summary(self):
+        """Returns the current statistics for display."""
+        return {
+            "threshold": self.threshold,
+            "baseline": self.baseline if self.baseline is not None else 0.0,
+            "deviation": self.deviation,
+            "samples": self.samples,
+        }
@@ -0,0 +1,358 @@
+# benchmark.py
+"""
+End-to-end benchmark of the tracking pipeline stages.
+
+Run from the project root:
+    python -m utils.benchmark [--recording DIR] [--output FILE] [--compare BASELINE] [--startup]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from utils.actuator import CursorActuator, NullBackend
+from utils.calibration_engine import PolynomialModel, RbfModel
+from utils.head_pose import HeadPoseEstimator
+from utils.homography import HomographyMapper
+from utils.pupil import PupilLocator
+from utils.landmarks import LandmarkModel, eye_features, shape_to_array
+from utils.recorder import ReplaySource
+from utils.smoothing import FILTERS, create_filter
+
+
+LEFT_EYE_INDICES = [36, 37, 38, 39, 40, 41]
+RIGHT_EYE_INDICES = [42, 43, 44, 45, 46, 47]
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cold-start steps, each timed in a fresh interpreter: (name, setup, timed statement)
+STARTUP_STEPS = [
+    ("interpreter", "", "pass"),
+    ("import numpy", "", "import numpy"),
+    ("import cv2", "", "import cv2"),
+    ("import dlib", "", "import dlib"),
+    ("import pyautogui", "", "import pyautogui"),
+    ("import pyttsx3", "", "import pyttsx3"),
+    ("import pystray", "", "import pystray"),
+    ("import main", "", "import main"),
+    ("app init", "import main", "main.EyeTrackingApp()"),
+    ("window ready", "import main", "main.build_gui(main.EyeTrackingApp()).update()"),
+    ("load models", "from utils.models import ModelRegistry",
+     "ModelRegistry.face_detector(); ModelRegistry.shape_predictor()"),
+]
+
+
+def load_frames(recording=None, count=120, size=(480, 640)):
+    """
+    Loads benchmark frames as BGR images.
+
+    Args:
+        recording (str): Optional FrameRecorder directory; synthetic frames are used otherwise.
+        count (int): Maximum number of frames.
+        size (tuple): (height, width) of synthetic frames.
+
+    Returns:
+        list: BGR frames.
+    """
+    if recording:
+        source = ReplaySource(recording)
+        frames = []
+        while len(frames) < count:
+            ret, gray = source.read()
+            if not ret:
+                break
+            frames.append(cv2.cvtColor(np.array(gray), cv2.COLOR_GRAY2BGR))
+        source.release()
+        return frames
+
+    # Smooth synthetic frames with a bright face-sized blob so detection has realistic work
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        frame = cv2.GaussianBlur(rng.integers(0, 256, size=(*size, 3), dtype=np.uint8), (7, 7), 0)
+        cv2.ellipse(frame, (size[1] // 2 + i % 20, size[0] // 2), (90, 120), 0, 0, 360, (190, 170, 160), -1)
+        frames.append(frame)
+    return frames
+
+
+def synthetic_landmarks(count, rng):
+    """Returns (count, 68, 2) landmark arrays with plausible eye contours and head pose points."""
+    base = np.zeros((68, 2), dtype=np.int32)
+    eye = np.array([(0, 0), (10, -5), (20, -5), (30, 0), (20, 5), (10, 5)])
+    base[LEFT_EYE_INDICES] = eye + (260, 200)
+    base[RIGHT_EYE_INDICES] = eye + (340, 200)
+    base[[30, 33, 8, 48, 54]] = [(315, 245), (315, 258), (315, 330), (288, 283), (342, 283)]  # Nose, chin, mouth
+    return base + rng.integers(-2, 3, size=(count, 68, 2))
+
+
+class BenchmarkSuite:
+    """Times pipeline stages and reports latency percentiles, throughput and allocations."""
+
+    def __init__(self, iterations=300, warmup=10):
+        """
+        Initialize the suite.
+
+        Args:
+            iterations (int): Timed calls per stage.
+            warmup (int): Untimed calls before measuring.
+        """
+        self.iterations = iterations
+        self.warmup = warmup
+        self.results = {}
+
+    def measure(self, name, stage, inputs):
+        """
+        Times one stage.
+
+        Args:
+            name (str): Stage name.
+            stage (callable): Called once per iteration with the next input.
+            inputs (list): Inputs cycled through during the run.
+
+        Returns:
+            dict: Latency percentiles (microseconds), throughput (calls/s) and
+                peak transient allocation per call (bytes).
+        """
+        for i in range(self.warmup):
+            stage(inputs[i % len(inputs)])
+
+        timings = np.empty(self.iterations, dtype=np.float64)
+        for i in range(self.iterations):
+            item = inputs[i % len(inputs)]
+            start_time = time.perf_counter()
+            stage(item)
+            timings[i] = time.perf_counter() - start_time
+
+        # Allocation pass, separate so tracing overhead does not skew the timings
+        allocation_runs = min(self.iterations, 50)
+        tracemalloc.start()
+        peak_bytes = 0
+        for i in range(allocation_runs):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            stage(inputs[i % len(inputs)])
+            peak_bytes += tracemalloc.get_traced_memory()[1] - baseline
+        tracemalloc.stop()
+
+        p50, p95, p99 = np.percentile(timings, [50, 95, 99]) * 1e6
+        result = {
+            "p50_us": float(p50),
+            "p95_us": float(p95),
+            "p99_us": float(p99),
+            "throughput_per_s": float(self.iterations / timings.sum()),
+            "alloc_bytes_per_call": float(peak_bytes / allocation_runs),
+            "iterations": self.iterations,
+        }
+        self.results[name] = result
+        return result
+
+    def skip(self, name, reason):
+        """Records a stage that could not run in this environment."""
+        self.results[name] = {"skipped": reason}
+
+    def run(self, frames, predictor_path="models/shape_predictor_5_face_landmarks.dat"):
+        """Runs every stage over the given BGR frames and returns the results."""
+        rng = np.random.default_rng(0)
+        grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+
+        self.measure("grayscale", lambda frame: cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), frames)
+
+        try:
+            import dlib
+        except ImportError:
+            dlib = None
+        if dlib is None:
+            self.skip("face_detection", "dlib not installed")
+            self.skip("landmarks", "dlib not installed")
+        else:
+            detector = dlib.get_frontal_face_detector()
+            self.measure("face_detection", detector, grays)
+            if os.path.exists(predictor_path):
+                predictor = dlib.shape_predictor(predictor_path)
+                height, width = grays[0].shape
+                face = dlib.rectangle(width // 2 - 90, height // 2 - 120, width // 2 + 90, height // 2 + 120)
+                points = np.empty((predictor.num_parts, 2), dtype=np.int32)
+                self.measure("landmarks", lambda gray: shape_to_array(predictor(gray, face), out=points), grays)
+            else:
+                self.skip("landmarks", f"model not found: {predictor_path}")
+
+        landmarks = list(synthetic_landmarks(len(frames), rng))
+        self.measure("ear", lambda points: eye_features(points, LEFT_EYE_INDICES, RIGHT_EYE_INDICES), landmarks)
+
+        # 5-point models have no eyelid points; openness is measured from the image instead
+        five_point = LandmarkModel.for_points(5)
+        corners = [points[[45, 42, 36, 39, 33]] for points in landmarks]  # Eye corners in 5-point order
+        head_pose = HeadPoseEstimator(LandmarkModel.for_points(68))
+        self.measure("head_pose", lambda item: head_pose.gaze_angles(item[0], item[1].shape), list(zip(landmarks, grays)))
+
+        pupils = PupilLocator()
+        eye_corners = [head_pose.landmark_model.eye_corners(points) for points in landmarks]
+        self.measure("pupils", lambda item: pupils.locate_both(*item), list(zip(grays, eye_corners)))
+
+        self.measure("openness_5pt", lambda item: five_point.eye_openness(*item), list(zip(corners, grays)))
+
+        mapper = HomographyMapper([[3.0, 0.1, -500.0], [0.05, 3.2, -400.0], [1e-5, 2e-5, 1.0]])
+        gaze_points = [tuple(point) for point in rng.uniform(250, 400, size=(len(frames), 2))]
+        self.measure("homography", lambda point: mapper.map_point(*point), gaze_points)
+
+        # Calibrated mappings fitted to a 3x3 grid, as the calibration engine would produce
+        targets = np.array([(x, y) for y in (270, 540, 810) for x in (480, 960, 1440)], dtype=np.float64)
+        target_gaze = rng.uniform(250, 400, size=(len(targets), 2))
+        for model_class in (PolynomialModel, RbfModel):
+            model = model_class.fit(target_gaze, targets)
+            self.measure(f"mapping_{model.kind}", lambda point: model.map_point(*point), gaze_points)
+
+        samples = [(x, y, i / 30) for i, (x, y) in enumerate(rng.uniform(0, 1920, size=(len(frames), 2)))]
+        for filter_name in FILTERS:
+            cursor_filter = create_filter(filter_name)
+            self.measure(f"smoothing_{filter_name}", lambda sample: cursor_filter.filter(*sample), samples)
+
+        actuator = CursorActuator(NullBackend(), max_rate_hz=1000)
+        self.measure("cursor_dispatch", lambda sample: actuator.move(int(sample[0]), int(sample[1])), samples)
+        actuator.stop()
+        return self.results
+
+
+def measure_startup(steps=STARTUP_STEPS, repeats=3):
+    """
+    Times cold-start steps, each in a fresh interpreter so nothing is already imported.
+
+    Args:
+        steps (list): (name, setup, statement) tuples; only the statement is timed.
+        repeats (int): Runs per step; the fastest is reported.
+
+    Returns:
+        dict: Per-step "startup_ms", or "skipped" with the reason when the step fails here.
+    """
+    results = {}
+    for name, setup, statement in steps:
+        code = f"{setup}\nimport time\nstart = time.perf_counter()\n{statement}\nprint(time.perf_counter() - start)"
+        if name == "interpreter":
+            code = statement
+        samples = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+            elapsed = time.perf_counter() - start_time
+            if completed.returncode != 0:
+                error_lines = completed.stderr.strip().splitlines()
+                results[name] = {"skipped": error_lines[-1] if error_lines else f"exit code {completed.returncode}"}
+                break
+            # The interpreter step is the whole process; the others are the timed statement only
+            samples.append(elapsed if name == "interpreter" else float(completed.stdout.strip().splitlines()[-1]))
+        else:
+            results[name] = {"startup_ms": min(samples) * 1000, "repeats": repeats}
+    return results
+
+
+def format_startup(results):
+    """Formats startup results as a table."""
+    lines = [f"{'startup step':<24}{'ms':>10}"]
+    for name, result in results.items():
+        if "skipped" in result:
+            lines.append(f"{name:<24}skipped: {result['skipped']}")
+        else:
+            lines.append(f"{name:<24}{result['startup_ms']:>10.1f}")
+    return "\n".join(lines)
+
+
+def compare_results(results, baseline, tolerance=0.2, metric="p95_us"):
+    """
+    Flags stages that got slower than a baseline run.
+
+    Args:
+        results (dict): Stage results of the current run.
+        baseline (dict): Stage results of an earlier run.
+        tolerance (float): Allowed relative slowdown, e.g. 0.2 for 20%.
+        metric (str): Latency metric to compare.
+
+    Returns:
+        list: (stage, baseline_value, current_value) for every regression.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name, {})
+        if metric in result and metric in previous and result[metric] > previous[metric] * (1 + tolerance):
+            regressions.append((name, previous[metric], result[metric]))
+    return regressions
+
+
+def format_results(results):
+    """Formats stage results as a table."""
+    lines = [f"{'stage':<24}{'p50 us':>10}{'p95 us':>10}{'p99 us':>10}{'calls/s':>12}{'alloc B':>10}"]
+    for name, result in results.items():
+        if "skipped" in result:
+            lines.append(f"{name:<24}skipped: {result['skipped']}")
+            continue
+        lines.append(
+            f"{name:<24}{result['p50_us']:>10.1f}{result['p95_us']:>10.1f}{result['p99_us']:>10.1f}"
+            f"{result['throughput_per_s']:>12.0f}{result['alloc_bytes_per_call']:>10.0f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command-line entry point; returns a non-zero exit code when a regression is found."""
+    parser = argparse.ArgumentParser(description="Benchmark the eye tracking pipeline stages.")
+    parser.add_argument("--recording", help="FrameRecorder directory to replay instead of synthetic frames.")
+    parser.add_argument("--frames", type=int, default=120, help="Number of frames to load.")
+    parser.add_argument("--iterations", type=int, default=300, help="Timed calls per stage.")
+    parser.add_argument("--output", default=os.path.join("benchmark_results", f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json"),
+                        help="Where to save the JSON results.")
+    parser.add_argument("--compare", help="Earlier results JSON to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p95 slowdown.")
+    parser.add_argument("--startup", action="store_true", help="Also time cold imports, app init and model loading.")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.recording, args.frames)
+    if not frames:
+        print("Error: No frames to benchmark.")
+        return 2
+
+    results = BenchmarkSuite(iterations=args.iterations).run(frames)
+    print(format_results(results))
+    startup = measure_startup() if args.startup else {}
+    if startup:
+        print(format_startup(startup))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "source": args.recording or "synthetic",
+        "frame_shape": list(frames[0].shape),
+        "stages": results,
+        "startup": startup,
+    }
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline_report = json.load(baseline_file)
+        regressions = compare_results(results, baseline_report["stages"], args.tolerance)
+        for name, previous, current in regressions:
+            print(f"REGRESSION {name}: p95 {previous:.1f} us -> {current:.1f} us")
+        startup_regressions = compare_results(startup, baseline_report.get("startup", {}), args.tolerance, metric="startup_ms")
+        for name, previous, current in startup_regressions:
+            print(f"REGRESSION {name}: {previous:.1f} ms -> {current:.1f} ms")
+        regressions += startup_regressions
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
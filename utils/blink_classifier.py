@@ -0,0 +1,118 @@
+# blink_classifier.py
+from collections import namedtuple
+
+
+# A classified blink: kind is "single", "double" or "long"; start and end are capture timestamps.
+BlinkEvent = namedtuple("BlinkEvent", ["kind", "start", "end"])
+
+
+class BlinkClassifier:
+    """Classifies single, double and long blinks from timestamped per-frame EAR samples."""
+
+    def __init__(self, blink_threshold=0.25, blink_duration=0.2, double_blink_interval=0.5, long_blink_duration=2.0):
+        """
+        Initialize the classifier.
+
+        All timing uses the capture timestamps passed to update(), so classification
+        does not change when processing lags behind the camera.
+
+        Args:
+            blink_threshold (float): EAR below which the eyes count as closed.
+            blink_duration (float): Longest closure, in seconds, that counts as a quick blink.
+                Two quick blinks within double_blink_interval form a double blink; a longer
+                (held) closure is a single blink straight away.
+            double_blink_interval (float): Longest gap between two quick blinks of a double blink.
+            long_blink_duration (float): Closure length that triggers a long blink, reported
+                as soon as it is reached rather than when the eyes reopen.
+        """
+        self.blink_threshold = blink_threshold
+        self.blink_duration = blink_duration
+        self.double_blink_interval = double_blink_interval
+        self.long_blink_duration = long_blink_duration
+
+        self.closed_since = None
+        self.long_reported = False
+        self.pending_blink = None  # Quick blink waiting to see whether a second one follows
+        self.last_blink_time = None
+
+    def update(self, ear, timestamp):
+        """
+        Adds one EAR sample.
+
+        Args:
+            ear (float): Average Eye Aspect Ratio of the frame.
+            timestamp (float): Capture time of the frame.
+
+        Returns:
+            list: BlinkEvent objects completed by this sample.
+        """
+        events = self.expire(timestamp)
+
+        if ear < self.blink_threshold:  # Eye closed
+            if self.closed_since is None:
+                self.closed_since = timestamp
+            elif not self.long_reported and timestamp - self.closed_since >= self.long_blink_duration:
+                self.long_reported = True
+                events += self._take_pending()
+                events.append(self._blink("long", self.closed_since, timestamp))
+            return events
+
+        if self.closed_since is None:  # Eye open and still open
+            return events
+
+        start, self.closed_since = self.closed_since, None
+        if self.long_reported:
+            self.long_reported = False
+            return events
+
+        if timestamp - start >= self.blink_duration:  # Held blink: no need to wait for a second one
+            events += self._take_pending()
+            events.append(self._blink("single", start, timestamp))
+        elif self.pending_blink is not None:
+            first, self.pending_blink = self.pending_blink, None
+            events.append(self._blink("double", first.start, timestamp))
+        else:
+            self.pending_blink = BlinkEvent("single", start, timestamp)
+        return events
+
+    def expire(self, timestamp):
+        """Reports a pending quick blink as a single blink once no second blink can follow."""
+        if self.pending_blink is None:
+            return []
+        # The gap to a second blink is measured to the start of its closure
+        reference = self.closed_since if self.closed_since is not None else timestamp
+        if reference - self.pending_blink.end > self.double_blink_interval:
+            return self._take_pending()
+        return []
+
+    def interrupt(self, timestamp):
+        """
+        Handles a frame without an EAR, e.g. while the face is lost.
+
+        A pending quick blink that is due is reported. A closure in progress is dropped,
+        as its length can't be measured across the gap; otherwise the first open-eye
+        sample after the gap would end a blink spanning the whole gap.
+
+        Returns:
+            list: BlinkEvent objects that became due.
+        """
+        events = self.expire(timestamp)
+        self.closed_since = None
+        self.long_reported = False
+        return events
+
+    def reset(self):
+        """Forgets any blink in progress, e.g. after the face was lost."""
+        self.closed_since = None
+        self.long_reported = False
+        self.pending_blink = None
+
+    def _take_pending(self):
+        if self.pending_blink is None:
+            return []
+        pending, self.pending_blink = self.pending_blink, None
+        return [self._blink("single", pending.start, pending.end)]
+
+    def _blink(self, kind, start, end):
+        self.last_blink_time = end
+        return BlinkEvent(kind, start, end)
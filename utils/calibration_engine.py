@@ -0,0 +1,361 @@
+# calibration_engine.py
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from utils.homography import HomographyMapper
+
+
+# Outcome of a calibration fit. residuals maps each model kind to the per-target
+# leave-one-out error in screen pixels (NaN for targets without samples), and rms
+# maps it to the root mean square of those errors.
+CalibrationResult = namedtuple("CalibrationResult", ["model", "kind", "residuals", "rms", "targets", "gaze_points", "sample_counts"])
+
+
+def robust_center(samples, threshold=3.5):
+    """
+    Averages raw gaze samples after dropping outliers around their median.
+
+    Samples further from the per-axis median than `threshold` robust standard
+    deviations (1.4826 x the median distance) are ignored, so blinks, glances
+    away and tracking glitches don't pull the average.
+
+    Args:
+        samples (array-like): (N, 2) gaze samples.
+        threshold (float): Cut-off in robust standard deviations.
+
+    Returns:
+        tuple: (center, inlier_mask).
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    median = np.median(samples, axis=0)
+    distances = np.linalg.norm(samples - median, axis=1)
+    scale = 1.4826 * np.median(distances)
+    inliers = distances <= threshold * scale if scale > 0 else distances == 0
+    return samples[inliers].mean(axis=0), inliers
+
+
+class _Normalization:
+    """Centers and scales gaze points so polynomial and RBF fits stay well conditioned."""
+
+    def __init__(self, mean_x, mean_y, scale):
+        self.mean_x, self.mean_y, self.scale = float(mean_x), float(mean_y), float(scale)
+
+    @classmethod
+    def fit(cls, points):
+        mean = points.mean(axis=0)
+        spread = np.abs(points - mean).max()
+        return cls(mean[0], mean[1], 1.0 / spread if spread > 0 else 1.0)
+
+    def apply(self, points):
+        return (np.asarray(points, dtype=np.float64) - (self.mean_x, self.mean_y)) * self.scale
+
+    def parameters(self):
+        return np.array([self.mean_x, self.mean_y, self.scale])
+
+
+class HomographyModel(HomographyMapper):
+    """Projective gaze-to-screen mapping fitted with RANSAC."""
+
+    kind = "homography"
+    min_points = 4
+
+    @classmethod
+    def fit(cls, gaze_points, screen_points, ransac_threshold=50.0):
+        """Fits a homography, ignoring targets more than `ransac_threshold` pixels off the consensus."""
+        matrix, _ = cv2.findHomography(np.asarray(gaze_points, dtype=np.float64), np.asarray(screen_points, dtype=np.float64),
+                                       cv2.RANSAC, ransac_threshold)
+        if matrix is None:
+            raise ValueError("Homography fit failed; the gaze points may be collinear.")
+        return cls(matrix)
+
+    def parameters(self):
+        return {"matrix": self.matrix}
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        return cls(parameters["matrix"])
+
+
+class PolynomialModel:
+    """Second-order polynomial mapping: each screen axis is a quadratic in gaze x and y."""
+
+    kind = "polynomial"
+    min_points = 6
+
+    def __init__(self, normalization, coefficients):
+        """
+        Initialize the mapping.
+
+        Args:
+            normalization (_Normalization): Gaze normalization applied before evaluation.
+            coefficients (np.ndarray): (6, 2) weights of [1, u, v, u^2, uv, v^2] for screen x and y.
+        """
+        self.normalization = normalization
+        self.coefficients = np.asarray(coefficients, dtype=np.float64).reshape(6, 2)
+
+        # Plain floats make single-point evaluation a handful of multiply-adds
+        self.mean_x, self.mean_y, self.scale = normalization.mean_x, normalization.mean_y, normalization.scale
+        (self.x0, self.x1, self.x2, self.x3, self.x4, self.x5) = self.coefficients[:, 0].tolist()
+        (self.y0, self.y1, self.y2, self.y3, self.y4, self.y5) = self.coefficients[:, 1].tolist()
+
+    @staticmethod
+    def features(uv):
+        u, v = uv[:, 0], uv[:, 1]
+        return np.column_stack([np.ones_like(u), u, v, u * u, u * v, v * v])
+
+    @classmethod
+    def fit(cls, gaze_points, screen_points):
+        gaze_points = np.asarray(gaze_points, dtype=np.float64)
+        normalization = _Normalization.fit(gaze_points)
+        design = cls.features(normalization.apply(gaze_points))
+        coefficients, *_ = np.linalg.lstsq(design, np.asarray(screen_points, dtype=np.float64), rcond=None)
+        return cls(normalization, coefficients)
+
+    def map_point(self, x, y):
+        """Maps one gaze point to (screen_x, screen_y)."""
+        u = (x - self.mean_x) * self.scale
+        v = (y - self.mean_y) * self.scale
+        uu, uv, vv = u * u, u * v, v * v
+        return (self.x0 + self.x1 * u + self.x2 * v + self.x3 * uu + self.x4 * uv + self.x5 * vv,
+                self.y0 + self.y1 * u + self.y2 * v + self.y3 * uu + self.y4 * uv + self.y5 * vv)
+
+    def map_points(self, points):
+        """Maps an (N, 2) array of gaze points."""
+        return self.features(self.normalization.apply(points)) @ self.coefficients
+
+    def parameters(self):
+        return {"normalization": self.normalization.parameters(), "coefficients": self.coefficients}
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        return cls(_Normalization(*parameters["normalization"]), parameters["coefficients"])
+
+
+class RbfModel:
+    """Thin-plate spline mapping: an affine part plus radial terms centered on the calibration targets."""
+
+    kind = "rbf"
+    min_points = 4
+
+    def __init__(self, normalization, centers, weights, affine):
+        """
+        Initialize the mapping.
+
+        Args:
+            normalization (_Normalization): Gaze normalization applied before evaluation.
+            centers (np.ndarray): (N, 2) normalized gaze points of the targets.
+            weights (np.ndarray): (N, 2) radial weights for screen x and y.
+            affine (np.ndarray): (3, 2) weights of [1, u, v].
+        """
+        self.normalization = normalization
+        self.centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+        self.weights = np.asarray(weights, dtype=np.float64).reshape(-1, 2)
+        self.affine = np.asarray(affine, dtype=np.float64).reshape(3, 2)
+
+        self.mean_x, self.mean_y, self.scale = normalization.mean_x, normalization.mean_y, normalization.scale
+        self.center_u = np.ascontiguousarray(self.centers[:, 0])
+        self.center_v = np.ascontiguousarray(self.centers[:, 1])
+        self.weights_x = np.ascontiguousarray(self.weights[:, 0])
+        self.weights_y = np.ascontiguousarray(self.weights[:, 1])
+        (self.a0x, self.a0y), (self.a1x, self.a1y), (self.a2x, self.a2y) = self.affine.tolist()
+        self.scratch = np.empty(len(self.centers), dtype=np.float64)
+        self.scratch_v = np.empty(len(self.centers), dtype=np.float64)
+
+    @staticmethod
+    def kernel(squared_distances):
+        """Thin-plate kernel r^2 log r, written in terms of r^2 and zero at r = 0."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = 0.5 * squared_distances * np.log(squared_distances)
+        return np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+
+    @classmethod
+    def fit(cls, gaze_points, screen_points, smoothing=1e-3):
+        """
+        Fits the spline; `smoothing` > 0 trades exact interpolation of the targets for
+        robustness to noise in their gaze averages.
+        """
+        gaze_points = np.asarray(gaze_points, dtype=np.float64)
+        screen_points = np.asarray(screen_points, dtype=np.float64)
+        normalization = _Normalization.fit(gaze_points)
+        centers = normalization.apply(gaze_points)
+        count = len(centers)
+
+        squared = ((centers[:, None, :] - centers[None, :, :]) ** 2).sum(axis=-1)
+        polynomial = np.column_stack([np.ones(count), centers])
+        system = np.zeros((count + 3, count + 3))
+        system[:count, :count] = cls.kernel(squared) + smoothing * np.eye(count)
+        system[:count, count:] = polynomial
+        system[count:, :count] = polynomial.T
+        rhs = np.zeros((count + 3, 2))
+        rhs[:count] = screen_points
+        solution, *_ = np.linalg.lstsq(system, rhs, rcond=None)
+        return cls(normalization, centers, solution[:count], solution[count:])
+
+    def map_point(self, x, y):
+        """Maps one gaze point to (screen_x, screen_y) using preallocated buffers."""
+        u = (x - self.mean_x) * self.scale
+        v = (y - self.mean_y) * self.scale
+        squared, other = self.scratch, self.scratch_v
+        np.subtract(self.center_u, u, out=squared)
+        np.multiply(squared, squared, out=squared)
+        np.subtract(self.center_v, v, out=other)
+        np.multiply(other, other, out=other)
+        squared += other
+
+        # r^2 log r without temporaries; the floor keeps log finite and r = 0 still gives 0
+        np.maximum(squared, 1e-300, out=other)
+        np.log(other, out=other)
+        np.multiply(squared, other, out=squared)
+        return (self.a0x + self.a1x * u + self.a2x * v + 0.5 * float(squared @ self.weights_x),
+                self.a0y + self.a1y * u + self.a2y * v + 0.5 * float(squared @ self.weights_y))
+
+    def map_points(self, points):
+        """Maps an (N, 2) array of gaze points."""
+        uv = self.normalization.apply(points)
+        squared = ((uv[:, None, :] - self.centers[None, :, :]) ** 2).sum(axis=-1)
+        return self.kernel(squared) @ self.weights + np.column_stack([np.ones(len(uv)), uv]) @ self.affine
+
+    def parameters(self):
+        return {"normalization": self.normalization.parameters(), "centers": self.centers, "weights": self.weights, "affine": self.affine}
+
+    @classmethod
+    def from_parameters(cls, parameters):
+        return cls(_Normalization(*parameters["normalization"]), parameters["centers"], parameters["weights"], parameters["affine"])
+
+
+MAPPING_MODELS = {model.kind: model for model in (HomographyModel, PolynomialModel, RbfModel)}
+
+
+class CalibrationEngine:
+    """Collects raw gaze samples per calibration target and fits the best gaze-to-screen mapping."""
+
+    def __init__(self, kinds=tuple(MAPPING_MODELS), outlier_threshold=3.5, min_samples=3):
+        """
+        Initialize the engine.
+
+        Args:
+            kinds (tuple): Mapping models to try, keys of MAPPING_MODELS.
+            outlier_threshold (float): Per-target sample rejection cut-off, in robust standard deviations.
+            min_samples (int): Inlier samples a target needs to take part in the fit.
+        """
+        unknown = [kind for kind in kinds if kind not in MAPPING_MODELS]
+        if unknown:
+            raise ValueError(f"Unknown mapping model(s): {', '.join(unknown)}. Choose from: {', '.join(MAPPING_MODELS)}")
+        self.kinds = tuple(kinds)
+        self.outlier_threshold = outlier_threshold
+        self.min_samples = min_samples
+        self.targets = []
+        self.samples = []
+
+    def add_target(self, screen_point):
+        """Registers a calibration target and returns its index."""
+        self.targets.append(tuple(screen_point))
+        self.samples.append([])
+        return len(self.targets) - 1
+
+    def add_sample(self, target_index, gaze_point):
+        """Adds one raw per-frame gaze sample for a target."""
+        self.samples[target_index].append(tuple(gaze_point))
+
+    def target_centers(self):
+        """
+        Returns the robust gaze center of every target.
+
+        Returns:
+            tuple: ((T, 2) centers, NaN for targets with too few inlier samples; (T,) inlier counts).
+        """
+        centers = np.full((len(self.targets), 2), np.nan)
+        counts = np.zeros(len(self.targets), dtype=int)
+        for i, samples in enumerate(self.samples):
+            if not samples:
+                continue
+            center, inliers = robust_center(samples, self.outlier_threshold)
+            counts[i] = int(inliers.sum())
+            if counts[i] >= self.min_samples:
+                centers[i] = center
+        return centers, counts
+
+    def fit(self):
+        """
+        Fits every mapping model and keeps the one with the lowest leave-one-out error.
+
+        Each target is predicted by a model fitted without it, so models that merely
+        interpolate the targets (like the spline) are not favored over ones that generalize.
+
+        Returns:
+            CalibrationResult: The best model and the per-target residuals of all models.
+
+        Raises:
+            ValueError: If too few targets have usable samples for any model.
+        """
+        centers, counts = self.target_centers()
+        targets = np.asarray(self.targets, dtype=np.float64)
+        valid = ~np.isnan(centers[:, 0])
+        gaze_points, screen_points = centers[valid], targets[valid]
+
+        residuals, rms, models = {}, {}, {}
+        for kind in self.kinds:
+            model_class = MAPPING_MODELS[kind]
+            if len(gaze_points) < model_class.min_points + 1:  # One spare point for leave-one-out
+                continue
+            errors = np.full(len(self.targets), np.nan)
+            errors[valid] = self._leave_one_out(model_class, gaze_points, screen_points)
+            residuals[kind] = errors
+            rms[kind] = float(np.sqrt(np.nanmean(errors ** 2)))
+            models[kind] = model_class.fit(gaze_points, screen_points)
+
+        if not models:
+            raise ValueError(f"Not enough calibration targets with samples: {int(valid.sum())} of {len(self.targets)}.")
+        best = min(rms, key=rms.get)
+        return CalibrationResult(models[best], best, residuals, rms, targets, centers, counts)
+
+    @staticmethod
+    def _leave_one_out(model_class, gaze_points, screen_points):
+        errors = np.empty(len(gaze_points))
+        for i in range(len(gaze_points)):
+            keep = np.arange(len(gaze_points)) != i
+            try:
+                model = model_class.fit(gaze_points[keep], screen_points[keep])
+                predicted = model.map_point(*gaze_points[i])
+            except (ValueError, np.linalg.LinAlgError, cv2.error):
+                predicted = None
+            errors[i] = np.inf if predicted is None else np.hypot(predicted[0] - screen_points[i][0], predicted[1] - screen_points[i][1])
+        return errors
+
+
+def format_calibration_report(result):
+    """Formats per-target residuals of every fitted model, marking the one kept."""
+    kinds = list(result.residuals)
+    lines = [f"{'target':>14}{'samples':>9}" + "".join(f"{kind:>13}" for kind in kinds)]
+    for i, (x, y) in enumerate(result.targets):
+        errors = "".join(f"{result.residuals[kind][i]:>10.1f} px" for kind in kinds)
+        lines.append(f"{f'({x:.0f}, {y:.0f})':>14}{result.sample_counts[i]:>9}{errors}")
+    lines.append(f"{'RMS':>23}" + "".join(f"{result.rms[kind]:>10.1f} px" for kind in kinds))
+    lines.append(f"Using {result.kind} mapping.")
+    return "\n".join(lines)
+
+
+def save_mapping(model, file, **extra):
+    """
+    Saves a fitted mapping model as .npz data.
+
+    Args:
+        model: A mapping model from MAPPING_MODELS.
+        file (str or file): Destination path or open binary file.
+        **extra: Additional arrays stored alongside the parameters.
+    """
+    np.savez(file, kind=np.array(model.kind), **model.parameters(), **extra)
+
+
+def mapping_from_arrays(arrays):
+    """Rebuilds a mapping model from the arrays written by save_mapping, ignoring extra ones."""
+    model_class = MAPPING_MODELS[str(arrays["kind"])]
+    return model_class.from_parameters({name: value for name, value in arrays.items() if name != "kind"})
+
+
+def load_mapping(file):
+    """Loads a mapping model saved with save_mapping."""
+    with np.load(file) as data:
+        return mapping_from_arrays({name: data[name] for name in data.files})
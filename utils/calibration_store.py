@@ -0,0 +1,217 @@
+# calibration_store.py
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from utils.calibration_engine import mapping_from_arrays, save_mapping
+from utils.logger import Logger
+
+logger = Logger.get_logger("calibration_store")
+
+
+STORE_DIRECTORY = "calibration_data/profiles"
+STORE_VERSION = 1
+
+# Identifies one calibration: who is looking, through which camera, at which screens
+CalibrationKey = namedtuple("CalibrationKey", ["user", "camera", "layout"])
+
+# A loaded calibration: the compiled mapping plus the metadata saved with it
+CalibrationEntry = namedtuple("CalibrationEntry", ["key", "model", "metadata"])
+
+
+def camera_id(device):
+    """Returns a stable name for a camera index or recording path."""
+    if isinstance(device, int):
+        return f"camera{device}"
+    return os.path.basename(os.path.normpath(str(device))) or str(device)
+
+
+def layout_id(monitors):
+    """Returns a name for a monitor layout, e.g. "1920x1080+0+0_1280x1024+1920+0"."""
+    return "_".join(f"{m.width}x{m.height}{m.x:+d}{m.y:+d}" for m in sorted(monitors, key=lambda m: (m.x, m.y)))
+
+
+class CalibrationStore:
+    """
+    Keeps one calibration per user, camera and monitor layout as .npz files.
+
+    Each file holds the mapping parameters and a JSON metadata record (format version,
+    model type, gaze features, camera resolution, residuals, timestamp). Files are written to a
+    temporary name and renamed into place, so readers never see a partial write.
+    """
+
+    def __init__(self, directory=STORE_DIRECTORY):
+        self.directory = directory
+
+    def path_for(self, key):
+        """Returns the file path of a calibration key."""
+        name = "__".join(re.sub(r"[^A-Za-z0-9_.+-]", "-", str(part)) for part in key)
+        return os.path.join(self.directory, f"{name}.npz")
+
+    def save(self, key, model, resolution=None, residuals=None, rms=None, features="image"):
+        """
+        Atomically saves a fitted mapping for a key.
+
+        Args:
+            key (CalibrationKey): User, camera and layout the mapping belongs to.
+            model: Mapping model from utils.calibration_engine.
+            resolution (tuple): Camera (width, height) during calibration.
+            residuals (list): Per-target errors in screen pixels.
+            rms (float): Root mean square of the residuals.
+            features (str): Gaze input the mapping expects, e.g. "image" or "head_pose".
+
+        Returns:
+            str: Path of the saved file.
+        """
+        metadata = {
+            "version": STORE_VERSION,
+            "user": key.user,
+            "camera": key.camera,
+            "layout": key.layout,
+            "kind": model.kind,
+            "features": features,
+            "resolution": list(resolution) if resolution is not None else None,
+            "residuals": [None if not np.isfinite(error) else float(error) for error in residuals] if residuals is not None else None,
+            "rms": float(rms) if rms is not None else None,
+            "timestamp": time.time(),
+        }
+        path = self.path_for(key)
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as temp_file:
+                save_mapping(model, temp_file, metadata=np.array(json.dumps(metadata)))
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        logger.info("Saved %s calibration for %s to %s", model.kind, "/".join(key), path)
+        return path
+
+    def load(self, key):
+        """
+        Loads the calibration for a key.
+
+        Returns:
+            CalibrationEntry: The entry, or None if the key has no calibration.
+
+        Raises:
+            ValueError: If the file is corrupt or from a newer format version.
+        """
+        return self.load_path(self.path_for(key), key)
+
+    def load_path(self, path, key=None):
+        """Loads a calibration file, returning None if it does not exist."""
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError) as e:  # np.load raises OSError for files it can't parse
+            raise ValueError(f"Corrupt calibration file {path}: {e}") from e
+
+        metadata = json.loads(str(arrays.pop("metadata")))
+        if metadata.get("version", 0) > STORE_VERSION:
+            raise ValueError(f"{path} was written by a newer version (format {metadata['version']}).")
+        if key is None:
+            key = CalibrationKey(metadata["user"], metadata["camera"], metadata["layout"])
+        return CalibrationEntry(key, mapping_from_arrays(arrays), metadata)
+
+    def entries(self):
+        """Returns the metadata of every stored calibration."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                entries.append(self.load_path(os.path.join(self.directory, name)).metadata)
+            except (ValueError, KeyError) as e:
+                logger.warning("Skipping calibration %s: %s", name, e)
+        return entries
+
+
+class CalibrationWatcher:
+    """
+    Polls one calibration file and calls back with the new entry whenever it changes.
+
+    Polling the file's modification time costs one stat() per interval and needs no
+    platform-specific watcher; renames from CalibrationStore.save are always complete
+    files, so a change can be loaded as soon as it is seen.
+    """
+
+    def __init__(self, store, key, on_change, interval=1.0):
+        """
+        Initialize the watcher.
+
+        Args:
+            store (CalibrationStore): Store holding the calibration.
+            key (CalibrationKey): Calibration to watch.
+            on_change (callable): Called with the new CalibrationEntry.
+            interval (float): Seconds between checks.
+        """
+        self.store = store
+        self.key = key
+        self.on_change = on_change
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.signature = self._signature()
+
+    def watch(self, key):
+        """Switches to another key whose current file the caller has just loaded itself."""
+        self.key = key
+        self.signature = self._signature()
+
+    def start(self):
+        """Starts the polling thread."""
+        if self.thread is not None:
+            return
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the polling thread."""
+        self.stop_event.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+
+    def check(self):
+        """Reloads the calibration if its file changed; returns True if the callback ran."""
+        key = self.key
+        signature = self._signature()
+        if signature == self.signature or signature is None:
+            return False
+        try:
+            entry = self.store.load(key)
+        except (ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable calibration for %s: %s", "/".join(key), e)
+            self.signature = signature
+            return False
+        self.signature = signature
+        if entry is None:
+            return False
+        self.on_change(entry)
+        return True
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.store.path_for(self.key))
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.check()
@@ -1,4 +1,6 @@
-from pygrabber.dshow_graph import FilterGraph
+from utils.logger import Logger
+
+logger = Logger.get_logger("camera_manager")
 
 
 class CameraDeviceManager:
@@ -13,14 +15,15 @@ class CameraDeviceManager:
             list: A list of dictionaries containing 'index' and 'name'.
         """
         try:
-            # Use pygrabber to get the list of input devices
+            # Use pygrabber to get the list of input devices; imported here as it is slow and Windows-only
+            from pygrabber.dshow_graph import FilterGraph
             graph = FilterGraph()
             device_names = graph.get_input_devices()
 
             devices = [{"index": idx, "name": name} for idx, name in enumerate(device_names)]
             return devices
         except Exception as e:
-            print(f"Error retrieving camera devices: {e}")
+            logger.error("Error retrieving camera devices: %s", e)
             return []
 
     @staticmethod
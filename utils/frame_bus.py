@@ -0,0 +1,239 @@
+# frame_bus.py
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+
+from utils.logger import Logger
+from utils.pipeline import StageLatency
+from utils.recorder import open_capture
+
+logger = Logger.get_logger("frame_bus")
+
+
+# A single captured frame together with its grayscale conversion.
+Frame = namedtuple("Frame", ["index", "timestamp", "image", "gray"])
+
+
+class FrameSubscription:
+    """
+    Per-consumer ring buffer of frames with a drop-oldest policy.
+
+    A lossless subscription applies backpressure instead: push() waits for room, and
+    get_latest() returns the oldest frame, so the consumer sees every frame in order.
+    """
+
+    def __init__(self, bus, capacity=2, lossless=False):
+        """
+        Initialize the subscription.
+
+        Args:
+            bus: The FrameBus (or PerceptionStage) this subscription is attached to.
+            capacity (int): Number of frames kept before the oldest is dropped, or before
+                a lossless push waits.
+            lossless (bool): Block the producer instead of dropping frames.
+        """
+        self.bus = bus
+        self.lossless = lossless
+        self.buffer = deque(maxlen=max(1, capacity))
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, frame):
+        """Adds a frame, discarding the oldest one if the buffer is full (or waiting, if lossless)."""
+        with self.condition:
+            if self.lossless:
+                # Re-check periodically so a stopped producer never stays blocked
+                while len(self.buffer) == self.buffer.maxlen and not self.closed and self.bus.is_running():
+                    self.condition.wait(0.1)
+                if self.closed:
+                    return
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(frame)
+            self.condition.notify_all()
+
+    def get(self, timeout=None):
+        """
+        Returns the oldest pending frame.
+
+        Args:
+            timeout (float): Seconds to wait for a frame. None waits forever.
+
+        Returns:
+            Frame: The next frame, or None on timeout or once the bus has stopped.
+        """
+        with self.condition:
+            if not self.buffer and not self.closed:
+                self.condition.wait(timeout)
+            if self.buffer:
+                frame = self.buffer.popleft()
+                self.condition.notify_all()  # Room for a waiting lossless push
+                return frame
+            return None
+
+    def get_latest(self, timeout=None):
+        """Returns the newest pending frame and discards any older ones; the oldest, if lossless."""
+        if self.lossless:
+            return self.get(timeout)
+        with self.condition:
+            if not self.buffer and not self.closed:
+                self.condition.wait(timeout)
+            if not self.buffer:
+                return None
+            frame = self.buffer.pop()
+            self.dropped += len(self.buffer)
+            self.buffer.clear()
+            return frame
+
+    def mark_closed(self):
+        """Wakes any waiting consumer; called by the bus when it stops."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def close(self):
+        """Detaches this subscription from its bus."""
+        self.bus.unsubscribe(self)
+        self.mark_closed()
+
+
+class FrameBus:
+    """Owns the camera on a single capture thread and fans frames out to subscribers."""
+
+    def __init__(self, device_index=0, capture=None, width=None, height=None, max_fps=None, realtime=True, lossless=None):
+        """
+        Initialize the frame bus.
+
+        Args:
+            device_index (int or str): Camera device opened when no capture is supplied, or the
+                directory of a FrameRecorder recording to replay.
+            capture: Optional object with the cv2.VideoCapture read/isOpened/release interface,
+                such as a ReplaySource.
+            width (int): Requested capture width; the camera default if None.
+            height (int): Requested capture height; the camera default if None.
+            max_fps (float): Publish at most this many frames per second; frames read
+                sooner are dropped at the source. No cap if None.
+            realtime (bool): Replay a recording at its recorded pace; False replays at maximum speed.
+            lossless (bool): Subscriptions apply backpressure instead of dropping frames, so
+                every frame reaches every consumer in order and a replay is deterministic.
+                Defaults to `not realtime`.
+        """
+        self.device_index = device_index
+        self.realtime = realtime
+        self.lossless = (not realtime) if lossless is None else lossless
+        self.capture = capture
+        self.width = width
+        self.height = height
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.frames_skipped = 0
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self.capture_thread = None
+        self.running = False
+        self.frame_count = 0
+        self.latency = StageLatency("capture")
+
+    def subscribe(self, capacity=2):
+        """Registers a new consumer and returns its subscription."""
+        subscription = FrameSubscription(self, capacity, self.lossless)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Removes a consumer from the bus."""
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def is_running(self):
+        """Returns True while the capture thread is delivering frames."""
+        return self.running
+
+    def start(self):
+        """
+        Opens the camera and starts the capture thread.
+
+        Returns:
+            bool: True if the bus is running, False if the camera is not accessible.
+        """
+        if self.running:
+            return True
+
+        if self.capture is None:
+            self.capture = open_capture(self.device_index, realtime=self.realtime)
+        if not self.capture.isOpened():
+            logger.error("Camera device %s not accessible.", self.device_index)
+            self.capture.release()
+            self.capture = None
+            return False
+        self._configure_capture()
+
+        self.running = True
+        self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.capture_thread.start()
+        return True
+
+    def stop(self):
+        """Stops the capture thread and releases the camera."""
+        self.running = False
+        if self.capture_thread and self.capture_thread is not threading.current_thread():
+            self.capture_thread.join(timeout=2)
+        self.capture_thread = None
+
+    def _configure_capture(self):
+        """Requests the configured resolution and frame rate from a live camera."""
+        if not hasattr(self.capture, "set"):  # Replay sources keep their recorded size
+            return
+        if self.width:
+            self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.min_interval:
+            self.capture.set(cv2.CAP_PROP_FPS, 1.0 / self.min_interval)  # A hint; the cap below is enforced
+
+    def publish(self, image, timestamp=None):
+        """Converts a frame to grayscale once and delivers it to every subscriber."""
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        frame = Frame(self.frame_count, timestamp if timestamp is not None else time.monotonic(), image, gray)
+        self.frame_count += 1
+
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.push(frame)
+        return frame
+
+    def _capture_loop(self):
+        """Reads frames from the camera until stopped or the camera fails."""
+        last_published = None
+        try:
+            while self.running:
+                start_time = time.perf_counter()
+                ret, image = self.capture.read()
+                if not ret:
+                    logger.warning("Failed to capture frame.")
+                    break
+                # Replay sources carry the recorded capture time; live cameras use the read time
+                timestamp = getattr(self.capture, "timestamp", None)
+                if timestamp is None:
+                    timestamp = time.monotonic()
+                # 10% slack so frame jitter at a camera rate equal to the cap doesn't halve it
+                if last_published is not None and timestamp - last_published < self.min_interval * 0.9:
+                    self.frames_skipped += 1  # Over the FPS cap: drop before any conversion
+                    continue
+                last_published = timestamp
+                self.publish(image, timestamp)
+                self.latency.record_since(start_time)
+        finally:
+            self.running = False
+            if self.capture is not None:
+                self.capture.release()
+                self.capture = None
+            with self.lock:
+                subscriptions = list(self.subscriptions)
+            for subscription in subscriptions:
+                subscription.mark_closed()
@@ -0,0 +1,111 @@
+# gestures.py
+import queue
+import threading
+import time
+from collections import namedtuple
+from utils.logger import Logger
+
+logger = Logger.get_logger("gestures")
+
+
+# A mouse gesture produced by blink classification: kind is one of
+# "click", "right_click", "press" or "release".
+GestureEvent = namedtuple("GestureEvent", ["kind", "timestamp"])
+
+
+class GestureStateMachine:
+    """Turns classified blinks into click, press and release gesture events."""
+
+    IDLE = "idle"
+    DRAGGING = "dragging"
+
+    def __init__(self):
+        self.state = self.IDLE
+
+    def on_blink(self, blink_kind, timestamp):
+        """
+        Advances the state machine with one classified blink.
+
+        A long blink presses the button and starts a drag; the cursor keeps following
+        the gaze while the button is held, and the next blink of any kind releases it.
+
+        Args:
+            blink_kind (str): "single", "double" or "long".
+            timestamp (float): Time of the blink.
+
+        Returns:
+            list: GestureEvent objects to dispatch.
+        """
+        if self.state == self.DRAGGING:
+            self.state = self.IDLE
+            return [GestureEvent("release", timestamp)]
+
+        if blink_kind == "single":
+            return [GestureEvent("click", timestamp)]
+        if blink_kind == "double":
+            return [GestureEvent("right_click", timestamp)]
+        if blink_kind == "long":
+            self.state = self.DRAGGING
+            return [GestureEvent("press", timestamp)]
+        return []
+
+    def reset(self):
+        """Returns to idle, releasing a held button if needed."""
+        if self.state == self.DRAGGING:
+            self.state = self.IDLE
+            return [GestureEvent("release", time.monotonic())]
+        return []
+
+
+class ActionDispatcher:
+    """Runs gesture actions on its own thread so the frame loop never waits on them."""
+
+    def __init__(self, actuator, handlers=None):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            actuator (CursorActuator): Receives the default mouse actions.
+            handlers (dict): Optional overrides mapping an event kind to a callable taking the event.
+        """
+        self.handlers = {
+            "click": lambda event: actuator.click(),
+            "right_click": lambda event: actuator.right_click(),
+            "press": lambda event: actuator.mouse_down(),
+            "release": lambda event: actuator.mouse_up(),
+        }
+        self.handlers.update(handlers or {})
+        self.events = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def dispatch(self, event):
+        """Queues an event and returns immediately."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self.thread.start()
+        self.events.put(event)
+
+    def stop(self):
+        """Runs any queued events, then stops the dispatcher thread."""
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None:
+            self.events.put(None)
+            thread.join(timeout=2)
+
+    def _dispatch_loop(self):
+        """Runs the handler for each queued event in order."""
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            handler = self.handlers.get(event.kind)
+            if handler is None:
+                logger.warning("No action registered for gesture '%s'.", event.kind)
+                continue
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error("Error running gesture action '%s': %s", event.kind, e)
@@ -0,0 +1,156 @@
+# head_pose.py
+import math
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+
+# Head rotation (Rodrigues vector) and translation (mm) in camera coordinates, plus the
+# direction the face points, in degrees: yaw > 0 toward image right, pitch > 0 toward image bottom.
+HeadPose = namedtuple("HeadPose", ["rotation", "translation", "yaw", "pitch"])
+
+# Generic face geometry in millimetres for solvePnP, keyed by landmark count: x toward
+# image right, y down, z into the head, with the nose tip at the origin. The 5-point
+# model has the outer and inner corner of each eye and the base of the nose.
+FACE_MODELS = {
+    5: ([0, 1, 2, 3, 4], [(45.0, -35.0, 30.0), (15.0, -35.0, 20.0), (-45.0, -35.0, 30.0), (-15.0, -35.0, 20.0), (0.0, 12.0, 10.0)]),
+    68: ([30, 8, 36, 45, 48, 54], [(0.0, 0.0, 0.0), (0.0, 70.0, 20.0), (-45.0, -35.0, 30.0), (45.0, -35.0, 30.0), (-25.0, 30.0, 25.0), (25.0, 30.0, 25.0)]),
+}
+
+EYE_WIDTH_MM = 30.0
+EYEBALL_RADIUS_MM = 12.0
+
+
+class CameraModel:
+    """Pinhole camera approximated from the frame size; no calibration target needed."""
+
+    def __init__(self, width, height, focal_length=None):
+        """
+        Initialize the model.
+
+        Args:
+            width (int): Frame width in pixels.
+            height (int): Frame height in pixels.
+            focal_length (float): Focal length in pixels; the frame width (about 53 degrees
+                horizontal field of view, typical of webcams) if None.
+        """
+        self.width, self.height = width, height
+        focal = float(focal_length or width)
+        self.matrix = np.array([[focal, 0.0, width / 2.0], [0.0, focal, height / 2.0], [0.0, 0.0, 1.0]])
+        self.distortion = np.zeros(4)
+
+
+class HeadPoseEstimator:
+    """
+    Estimates head pose from facial landmarks and expresses gaze in a head-relative frame.
+
+    The camera model is built once per frame size, and SQPnP solves the five or six
+    points globally without an initial guess in tens of microseconds, so it can run on
+    every frame.
+    """
+
+    def __init__(self, landmark_model, focal_length=None):
+        """
+        Initialize the estimator.
+
+        Args:
+            landmark_model (LandmarkModel): Topology of the landmark predictor.
+            focal_length (float): Camera focal length in pixels, estimated from the frame size if None.
+
+        Raises:
+            ValueError: If there is no face model for the landmark count.
+        """
+        if landmark_model.num_points not in FACE_MODELS:
+            raise ValueError(f"No head model for {landmark_model.num_points}-point landmarks.")
+        self.landmark_model = landmark_model
+        self.focal_length = focal_length
+        indices, points = FACE_MODELS[landmark_model.num_points]
+        self.indices = indices
+        self.model_points = np.array(points, dtype=np.float64)
+        self.camera = None
+
+    def camera_for(self, frame_shape):
+        """Returns the cached camera model, rebuilt when the frame size changes."""
+        height, width = frame_shape[:2]
+        camera = self.camera
+        if camera is None or (camera.width, camera.height) != (width, height):
+            camera = self.camera = CameraModel(width, height, self.focal_length)
+        return camera
+
+    def estimate(self, landmarks, frame_shape):
+        """
+        Solves the head pose for one frame.
+
+        Args:
+            landmarks (np.ndarray): (N, 2) landmark coordinates.
+            frame_shape (tuple): Shape of the frame the landmarks were found in.
+
+        Returns:
+            HeadPose: The pose, or None if it could not be solved.
+        """
+        camera = self.camera_for(frame_shape)
+        image_points = np.asarray(landmarks, dtype=np.float64)[self.indices]
+        ok, rotation, translation = cv2.solvePnP(self.model_points, image_points, camera.matrix, camera.distortion,
+                                                 flags=cv2.SOLVEPNP_SQPNP)
+        if not ok or translation[2, 0] <= 0:  # A head behind the camera is a degenerate solution
+            return None
+
+        # The face points along -z in head coordinates
+        matrix, _ = cv2.Rodrigues(rotation)
+        forward_x, forward_y, forward_z = -matrix[:, 2]
+        yaw = math.degrees(math.atan2(forward_x, -forward_z))
+        pitch = math.degrees(math.atan2(forward_y, -forward_z))
+        return HeadPose(rotation.ravel(), translation.ravel(), yaw, pitch)
+
+    def eye_rotation(self, landmarks, centers=None):
+        """
+        Returns the mean (x, y) eye-in-head rotation in degrees.
+
+        Each eye's center is measured from the midpoint of its corners along the
+        corner-to-corner axis, so it does not change with head translation or roll.
+
+        Args:
+            landmarks (np.ndarray): (N, 2) landmark coordinates.
+            centers (np.ndarray): (2, 2) [left, right] eye centers, e.g. located pupils;
+                the landmark eye centers if None.
+        """
+        if centers is None:
+            centers = self.landmark_model.eye_centers(landmarks)
+        corners = self.landmark_model.eye_corners(landmarks)
+
+        # Two eyes: plain float math is several times faster than small-array numpy here
+        limit = EYEBALL_RADIUS_MM / EYE_WIDTH_MM
+        total_x = total_y = 0.0
+        for (center_x, center_y), ((ax, ay), (bx, by)) in zip(centers.tolist(), corners.tolist()):
+            axis_x, axis_y = bx - ax, by - ay
+            if axis_x < 0:  # Point both axes toward image right
+                axis_x, axis_y = -axis_x, -axis_y
+            squared_width = max(axis_x * axis_x + axis_y * axis_y, 1e-12)
+            offset_x, offset_y = center_x - (ax + bx) / 2.0, center_y - (ay + by) / 2.0
+            along = (offset_x * axis_x + offset_y * axis_y) / squared_width
+            across = (offset_y * axis_x - offset_x * axis_y) / squared_width  # Positive toward image bottom
+            total_x += math.degrees(math.asin(max(-1.0, min(1.0, along / limit))))
+            total_y += math.degrees(math.asin(max(-1.0, min(1.0, across / limit))))
+        return total_x / 2.0, total_y / 2.0
+
+    def gaze_angles(self, landmarks, frame_shape, eye_centers=None):
+        """
+        Returns the head-relative gaze feature: head direction plus eye-in-head rotation.
+
+        The feature is in degrees, so moving the head without turning it leaves it
+        unchanged, unlike landmark positions in the image.
+
+        Args:
+            landmarks (np.ndarray): (N, 2) landmark coordinates.
+            frame_shape (tuple): Shape of the frame the landmarks were found in.
+            eye_centers (np.ndarray): Optional (2, 2) eye centers passed to eye_rotation().
+
+        Returns:
+            tuple: (x, y) gaze angles, or None if the head pose could not be solved.
+        """
+        pose = self.estimate(landmarks, frame_shape)
+        if pose is None:
+            return None
+        eye_x, eye_y = self.eye_rotation(landmarks, eye_centers)
+        return pose.yaw + eye_x, pose.pitch + eye_y
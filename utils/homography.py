@@ -1,6 +1,9 @@
 import os
 import cv2
 import numpy as np
+from utils.logger import Logger
+
+logger = Logger.get_logger("homography")
 
 
 class HomographyManager:
@@ -16,9 +19,9 @@ class HomographyManager:
 
             homography_matrix, _ = cv2.findHomography(gaze_points, screen_points)
             np.save(file_path, homography_matrix)
-            print(f"Homography matrix saved to {file_path}")
+            logger.info("Homography matrix saved to %s", file_path)
         except Exception as e:
-            print(f"Error saving homography matrix: {e}")
+            logger.error("Error saving homography matrix: %s", e)
 
     @staticmethod
     def load_homography_matrix(file_path="calibration_data/homography_matrix.npy"):
@@ -27,12 +30,19 @@ class HomographyManager:
             if not os.path.exists(file_path):
                 raise FileNotFoundError("Homography matrix not found. Run calibration first.")
             matrix = np.load(file_path)
-            print("Homography matrix loaded successfully.")
+            logger.info("Homography matrix loaded successfully.")
             return matrix
         except Exception as e:
-            print(f"Error loading homography matrix: {e}")
+            logger.error("Error loading homography matrix: %s", e)
             return None
 
+    @staticmethod
+    def compile(homography_matrix):
+        """Returns a HomographyMapper for per-frame use, or None if no matrix is loaded."""
+        if homography_matrix is None:
+            return None
+        return HomographyMapper(homography_matrix)
+
     @staticmethod
     def apply_homography(gaze_x, gaze_y, homography_matrix):
         """Applies the homography matrix to transform gaze coordinates."""
@@ -41,5 +51,81 @@ class HomographyManager:
             transformed_point = cv2.perspectiveTransform(gaze_point, homography_matrix)
             return transformed_point[0][0]
         except Exception as e:
-            print(f"Error applying homography: {e}")
+            logger.warning("Error applying homography: %s", e)
             return None, None
+
+
+class HomographyMapper:
+    """Applies a fixed homography without per-call array allocation or exception handling."""
+
+    def __init__(self, homography_matrix, batch_capacity=0):
+        """
+        Initialize the mapper.
+
+        Args:
+            homography_matrix (np.ndarray): 3x3 matrix mapping gaze to screen coordinates.
+            batch_capacity (int): Number of points to preallocate scratch space for.
+        """
+        self.matrix = np.array(homography_matrix, dtype=np.float64).reshape(3, 3)
+
+        # Plain floats make single-point mapping a handful of multiply-adds
+        (self.h00, self.h01, self.h02), (self.h10, self.h11, self.h12), (self.h20, self.h21, self.h22) = self.matrix.tolist()
+        self.linear = np.ascontiguousarray(self.matrix[:, :2].T)
+        self.offset = np.ascontiguousarray(self.matrix[:, 2])
+        self.scratch = np.empty((batch_capacity, 3), dtype=np.float64)
+
+    def map_point(self, x, y):
+        """
+        Maps one gaze point to screen coordinates.
+
+        Returns:
+            tuple: (screen_x, screen_y), or None if the point maps to infinity.
+        """
+        w = self.h20 * x + self.h21 * y + self.h22
+        if w == 0.0:
+            return None
+        return (self.h00 * x + self.h01 * y + self.h02) / w, (self.h10 * x + self.h11 * y + self.h12) / w
+
+    def map_points(self, points, out=None):
+        """
+        Maps an (N, 2) array of gaze points in one vectorized call.
+
+        Args:
+            points (np.ndarray): Gaze points.
+            out (np.ndarray): Optional (N, 2) float64 array receiving the result.
+
+        Returns:
+            np.ndarray: Screen points; rows mapping to infinity are NaN.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        count = len(points)
+        if self.scratch.shape[0] < count:
+            self.scratch = np.empty((count, 3), dtype=np.float64)
+        projected = self.scratch[:count]
+        np.matmul(points, self.linear, out=projected)
+        projected += self.offset
+        if out is None:
+            out = np.empty((count, 2), dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            np.divide(projected[:, :2], projected[:, 2:], out=out)
+        out[projected[:, 2] == 0.0] = np.nan
+        return out
+
+
+# Microbenchmark of the per-call cost against the cv2.perspectiveTransform path:
+# python -m utils.homography
+if __name__ == "__main__":
+    import timeit
+
+    matrix = np.array([[1.2, 0.05, 30.0], [-0.02, 1.1, 15.0], [1e-4, 2e-4, 1.0]])
+    mapper = HomographyMapper(matrix)
+    iterations = 100000
+
+    legacy = timeit.timeit(lambda: HomographyManager.apply_homography(320.0, 240.0, matrix), number=iterations)
+    fast = timeit.timeit(lambda: mapper.map_point(320.0, 240.0), number=iterations)
+    print(f"apply_homography: {legacy / iterations * 1e6:.2f} us/call")
+    print(f"HomographyMapper.map_point: {fast / iterations * 1e6:.2f} us/call ({legacy / fast:.1f}x faster)")
+
+    points = np.random.default_rng(0).uniform(0, 640, size=(10000, 2))
+    batch = timeit.timeit(lambda: mapper.map_points(points), number=100)
+    print(f"HomographyMapper.map_points: {batch / 100 / len(points) * 1e9:.1f} ns/point over {len(points)} points")
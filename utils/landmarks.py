@@ -0,0 +1,177 @@
+# landmarks.py
+import cv2
+import numpy as np
+
+
+def shape_to_array(shape, out=None):
+    """
+    Writes the points of a dlib full_object_detection into an (N, 2) int32 array.
+
+    The coordinates go straight into the destination array, so filling `out`
+    allocates no intermediate array.
+
+    Args:
+        shape: dlib full_object_detection returned by a shape predictor.
+        out (np.ndarray): Optional preallocated C-contiguous (N, 2) int32 array to fill.
+
+    Returns:
+        np.ndarray: The landmark coordinates (`out` when given).
+
+    Raises:
+        ValueError: If `out` is not a C-contiguous int32 array of shape (N, 2).
+    """
+    count = shape.num_parts
+    if out is None:
+        out = np.empty((count, 2), dtype=np.int32)
+    elif out.dtype != np.int32 or out.shape != (count, 2) or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous int32 array of shape ({count}, 2), "
+                         f"got {out.dtype} {out.shape}.")
+    points = shape.parts()
+    out[:, 0] = [point.x for point in points]
+    out[:, 1] = [point.y for point in points]
+    return out
+
+
+def eye_features(landmarks, left_eye_indices, right_eye_indices):
+    """
+    Computes the centroid and Eye Aspect Ratio (EAR) of both eyes in one vectorized call.
+
+    Works on a single (N, 2) landmark array or on a batch of shape (F, N, 2); the
+    outputs gain the same leading batch dimension.
+
+    Args:
+        landmarks (np.ndarray): Landmark coordinates.
+        left_eye_indices (list): Six contour indices of the left eye.
+        right_eye_indices (list): Six contour indices of the right eye.
+
+    Returns:
+        tuple: (centroids, ears) with shapes (..., 2, 2) for [left, right] x [x, y]
+            and (..., 2) for [left, right].
+    """
+    eyes = np.asarray(landmarks, dtype=np.float64)[..., [left_eye_indices, right_eye_indices], :]
+    centroids = eyes.mean(axis=-2)
+
+    # EAR = (|p1 - p5| + |p2 - p4|) / (2 * |p0 - p3|)
+    vertical = np.linalg.norm(eyes[..., [1, 2], :] - eyes[..., [5, 4], :], axis=-1).sum(axis=-1)
+    horizontal = np.linalg.norm(eyes[..., 0, :] - eyes[..., 3, :], axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ears = vertical / (2.0 * horizontal)
+    return centroids, ears
+
+
+def eye_aspect_ratio(eye_points):
+    """Computes the EAR of a single six-point eye contour."""
+    eye = np.asarray(eye_points, dtype=np.float64)
+    vertical = np.linalg.norm(eye[[1, 2]] - eye[[5, 4]], axis=-1).sum()
+    horizontal = np.linalg.norm(eye[0] - eye[3])
+    return float(vertical / (2.0 * horizontal))
+
+
+def intensity_openness(gray, corner_a, corner_b):
+    """
+    Estimates how open an eye is from image intensity, for models without eyelid points.
+
+    The dark iris and pupil of an open eye span many rows of a box around the eye
+    corners, while a closed eye leaves only the thin lash line. The result is the
+    number of rows holding dark (Otsu-thresholded) pixels divided by the eye width,
+    which falls on roughly the same scale as the EAR.
+
+    Args:
+        gray (np.ndarray): Grayscale frame.
+        corner_a: (x, y) of one eye corner.
+        corner_b: (x, y) of the other eye corner.
+
+    Returns:
+        float: Openness, or None if the eye is too small or outside the frame.
+    """
+    (ax, ay), (bx, by) = corner_a, corner_b
+    width = float(np.hypot(bx - ax, by - ay))
+    if width < 6:
+        return None
+    center_x, center_y = (ax + bx) / 2.0, (ay + by) / 2.0
+    half_width, half_height = 0.5 * width, 0.35 * width  # Tall enough for the iris, short of the eyebrow
+    top, bottom = max(0, int(center_y - half_height)), min(gray.shape[0], int(center_y + half_height) + 1)
+    left, right = max(0, int(center_x - half_width)), min(gray.shape[1], int(center_x + half_width) + 1)
+    patch = gray[top:bottom, left:right]
+    if patch.shape[0] < 3 or patch.shape[1] < 3:
+        return None
+
+    _, dark = cv2.threshold(patch, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    dark_rows = np.count_nonzero(dark.sum(axis=1) > 0.15 * patch.shape[1])
+    return dark_rows / width
+
+
+class LandmarkModel:
+    """Point layout of a landmark predictor and the eye features it supports."""
+
+    def __init__(self, name, num_points, left_eye_indices, right_eye_indices, supports_ear):
+        """
+        Initialize the topology.
+
+        Args:
+            name (str): Model name used in messages.
+            num_points (int): Number of landmarks the predictor returns.
+            left_eye_indices (list): Left eye points (six contour points, or two corners).
+            right_eye_indices (list): Right eye points, in the same layout.
+            supports_ear (bool): True when the eye points are six-point contours with eyelids.
+        """
+        self.name = name
+        self.num_points = num_points
+        self.left_eye_indices = left_eye_indices
+        self.right_eye_indices = right_eye_indices
+        self.supports_ear = supports_ear
+        self.corner_positions = (0, 3) if supports_ear else (0, 1)  # Where the corners sit in each eye's points
+
+    @staticmethod
+    def for_points(num_points):
+        """
+        Returns the topology of a predictor with `num_points` landmarks.
+
+        Raises:
+            ValueError: If no supported model has that many points.
+        """
+        model = LANDMARK_MODELS.get(num_points)
+        if model is None:
+            supported = ", ".join(str(count) for count in sorted(LANDMARK_MODELS))
+            raise ValueError(f"Unsupported landmark model with {num_points} points; supported: {supported}.")
+        return model
+
+    def eye_centers(self, landmarks):
+        """Returns the (..., 2, 2) [left, right] x [x, y] eye centers used as gaze input."""
+        eyes = np.asarray(landmarks, dtype=np.float64)[..., [self.left_eye_indices, self.right_eye_indices], :]
+        return eyes.mean(axis=-2)
+
+    def eye_corners(self, landmarks):
+        """Returns the (2, 2, 2) [left, right] x [corner] x [x, y] eye corners."""
+        first, second = self.corner_positions
+        indices = [[self.left_eye_indices[first], self.left_eye_indices[second]],
+                   [self.right_eye_indices[first], self.right_eye_indices[second]]]
+        return np.asarray(landmarks, dtype=np.float64)[indices]
+
+    def eye_openness(self, landmarks, gray=None):
+        """
+        Returns the [left, right] openness of both eyes.
+
+        The EAR is used when the model has eyelid points; otherwise openness is
+        estimated from the image around the eye corners, which needs `gray`.
+        Entries are NaN where an eye cannot be measured.
+        """
+        if self.supports_ear:
+            _, ears = eye_features(landmarks, self.left_eye_indices, self.right_eye_indices)
+            return ears
+        openness = np.full(2, np.nan)
+        if gray is None:
+            return openness
+        for i, indices in enumerate((self.left_eye_indices, self.right_eye_indices)):
+            value = intensity_openness(gray, landmarks[indices[0]], landmarks[indices[1]])
+            if value is not None:
+                openness[i] = value
+        return openness
+
+
+# dlib's 68-point model outlines each eye with six points. The 5-point model has only
+# the two corners of each eye (points 0-1 and 2-3) plus the base of the nose (point 4).
+LANDMARK_MODELS = {
+    5: LandmarkModel("dlib 5-point", 5, [2, 3], [0, 1], supports_ear=False),
+    68: LandmarkModel("dlib 68-point", 68, [36, 37, 38, 39, 40, 41], [42, 43, 44, 45, 46, 47], supports_ear=True),
+}
@@ -1,17 +1,136 @@
 # logger.py
+import atexit
 import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drops repeats of a warning or error within a time window and counts what it dropped.
+
+    Records below `min_level` always pass, so regular events such as clicks and
+    calibration progress are never hidden. Messages are keyed by logger, level and format string (not the formatted text),
+    so a per-frame error logged with changing arguments is still deduplicated. The
+    next message that gets through reports how many repeats were suppressed.
+    """
+
+    def __init__(self, interval=5.0, max_keys=1000, min_level=logging.WARNING):
+        """
+        Initialize the filter.
+
+        Args:
+            interval (float): Seconds during which repeats of a message are dropped.
+            max_keys (int): Distinct messages remembered before the table is cleared.
+            min_level (int): Lowest level that is rate limited.
+        """
+        super().__init__()
+        self.interval = interval
+        self.min_level = min_level
+        self.max_keys = max_keys
+        self.last_emitted = {}
+        self.suppressed = {}
+        self.total_suppressed = 0
+
+    def filter(self, record):
+        if record.levelno < self.min_level:
+            return True
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        last = self.last_emitted.get(key)
+        if last is not None and now - last < self.interval:
+            self.suppressed[key] = self.suppressed.get(key, 0) + 1
+            self.total_suppressed += 1
+            return False
+
+        if len(self.last_emitted) >= self.max_keys:
+            self.last_emitted.clear()
+        self.last_emitted[key] = now
+        count = self.suppressed.pop(key, 0)
+        if count:
+            record.msg = f"{record.msg} [{count} similar messages suppressed]"
+        return True
 
 
 class Logger:
-    """Sets up a centralized logger for the application."""
+    """Sets up a centralized, asynchronous logger for the application."""
+
+    NAME = "EyeTrackingApp"
+    listener = None
+    rate_limiter = None
+
+    @staticmethod
+    def setup_logger(log_file="app.log", level=logging.INFO, console=True, rate_limit=5.0, rate_limit_level=logging.WARNING):
+        """
+        Configures the logger.
+
+        Records are put on a queue by the calling thread and written to the console and
+        log file by a background QueueListener, so hot loops never block on I/O.
+        Calling it again replaces the previous configuration.
+
+        Args:
+            log_file (str): Log file path; None logs to the console only.
+            level (int): Minimum level.
+            console (bool): Also write to stderr.
+            rate_limit (float): Seconds during which repeats of a message are dropped; 0 disables it.
+            rate_limit_level (int): Lowest level that is rate limited; hot-path warnings are
+                limited, informational events are not.
+        """
+        Logger.shutdown()
+        logger = logging.getLogger(Logger.NAME)
+
+        formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+        handlers = []
+        if log_file:
+            handlers.append(logging.FileHandler(log_file))
+        if console:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        if rate_limit:
+            Logger.rate_limiter = RateLimitFilter(rate_limit, min_level=rate_limit_level)
+            queue_handler.addFilter(Logger.rate_limiter)  # Runs on the caller, before anything is queued
+        logger.addHandler(queue_handler)
+        logger.setLevel(level)
+        logger.propagate = False
+
+        Logger.listener = QueueListener(log_queue, *handlers)
+        Logger.listener.start()
+        return logger
 
     @staticmethod
-    def setup_logger(log_file="app.log", level=logging.INFO):
-        """Configures the logger."""
-        logging.basicConfig(filename=log_file, level=level, format="%(asctime)s - %(levelname)s - %(message)s")
-        return logging.getLogger("EyeTrackingApp")
+    def get_logger(name=None):
+        """
+        Returns the application logger or one of its children, e.g. get_logger("eye_tracker").
+
+        A console-only configuration is set up on first use if setup_logger() was not called.
+        """
+        if Logger.listener is None:
+            Logger.setup_logger(log_file=None)
+        return logging.getLogger(f"{Logger.NAME}.{name}" if name else Logger.NAME)
+
+    @staticmethod
+    def shutdown():
+        """Flushes queued records and stops the background writer."""
+        if Logger.listener is None:
+            return
+        Logger.listener.stop()
+        for handler in Logger.listener.handlers:
+            handler.close()
+        Logger.listener = None
+        logger = logging.getLogger(Logger.NAME)
+        for handler in list(logger.handlers):
+            if isinstance(handler, QueueHandler):
+                logger.removeHandler(handler)
+
+
+atexit.register(Logger.shutdown)
 
 
 # Usage example:
-# logger = Logger.setup_logger()
-# logger.info("Application started.")
+# logger = Logger.get_logger("eye_tracker")
+# logger.warning("Eye region not detected. Skipping frame.")
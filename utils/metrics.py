@@ -0,0 +1,231 @@
+# metrics.py
+import bisect
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from utils.logger import Logger
+
+
+# Latency bucket upper bounds in seconds: 50 us to ~3.3 s, four buckets per octave-pair
+LATENCY_BUCKETS = [50e-6 * 2 ** (i / 2) for i in range(33)]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording a sample never allocates."""
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = list(bounds)
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)  # Last bucket is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def record(self, seconds):
+        """Adds one sample, in seconds."""
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def percentile(self, fraction):
+        """Returns the bucket upper bound below which `fraction` of the samples fall."""
+        if self.count == 0:
+            return 0.0
+        index = int(np.searchsorted(np.cumsum(self.counts), fraction * self.count))
+        return self.bounds[index] if index < len(self.bounds) else float("inf")
+
+
+class Counter:
+    """Monotonic event counter."""
+
+    def __init__(self, name, description=""):
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class MetricsRegistry:
+    """Collects stage latencies, counters and gauges for overlays, log lines and export."""
+
+    _default = None
+
+    @classmethod
+    def default(cls):
+        """Returns the process-wide registry."""
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+
+    def register_stage(self, stage):
+        """Registers a StageLatency (anything with name, count, mean and histogram)."""
+        with self.lock:
+            self.stages[stage.name] = stage
+        return stage
+
+    def counter(self, name, description=""):
+        """Returns the named counter, creating it on first use."""
+        with self.lock:
+            if name not in self.counters:
+                self.counters[name] = Counter(name, description)
+            return self.counters[name]
+
+    def register_gauge(self, name, read_value):
+        """Registers a callable read whenever metrics are reported."""
+        with self.lock:
+            self.gauges[name] = read_value
+
+    def snapshot(self):
+        """Returns the current metrics as plain data."""
+        with self.lock:
+            stages, counters, gauges = dict(self.stages), dict(self.counters), dict(self.gauges)
+
+        snapshot = {"stages": {}, "counters": {}, "gauges": {}}
+        for name, stage in stages.items():
+            histogram = stage.histogram
+            snapshot["stages"][name] = {
+                "count": stage.count,
+                "mean_ms": stage.mean * 1000,
+                "p50_ms": histogram.percentile(0.50) * 1000,
+                "p95_ms": histogram.percentile(0.95) * 1000,
+                "p99_ms": histogram.percentile(0.99) * 1000,
+            }
+        for name, counter in counters.items():
+            snapshot["counters"][name] = counter.value
+        for name, read_value in gauges.items():
+            try:
+                snapshot["gauges"][name] = read_value()
+            except Exception:
+                snapshot["gauges"][name] = None
+        return snapshot
+
+    def overlay_lines(self):
+        """Returns short text lines for the on-frame metrics overlay."""
+        snapshot = self.snapshot()
+        lines = [f"{name}: {stats['mean_ms']:.1f} ms (p95 {stats['p95_ms']:.1f})" for name, stats in snapshot["stages"].items() if stats["count"]]
+        lines += [f"{name}: {value}" for name, value in {**snapshot["counters"], **snapshot["gauges"]}.items()]
+        return lines
+
+    def to_prometheus(self, prefix="eyetracker"):
+        """Formats the metrics in the Prometheus text exposition format."""
+        with self.lock:
+            stages, counters, gauges = dict(self.stages), dict(self.counters), dict(self.gauges)
+
+        lines = []
+        for name, stage in stages.items():
+            metric = f"{prefix}_{_metric_name(name)}_seconds"
+            histogram = stage.histogram
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += int(count)
+                lines.append(f'{metric}_bucket{{le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum {histogram.total:.9f}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, counter in counters.items():
+            metric = f"{prefix}_{_metric_name(name)}_total"
+            if counter.description:
+                lines.append(f"# HELP {metric} {counter.description}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {counter.value}")
+        for name, read_value in gauges.items():
+            metric = f"{prefix}_{_metric_name(name)}"
+            try:
+                value = read_value()
+            except Exception:
+                continue
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _metric_name(name):
+    return "".join(character if character.isalnum() else "_" for character in name.lower())
+
+
+class MetricsExporter:
+    """Periodically logs a structured metrics line, dumps Prometheus text and optionally serves it."""
+
+    def __init__(self, registry=None, interval=10.0, file_path="metrics.prom", port=None, logger=None):
+        """
+        Initialize the exporter.
+
+        Args:
+            registry (MetricsRegistry): Metrics to export; the process-wide registry by default.
+            interval (float): Seconds between log lines and file dumps.
+            file_path (str): Prometheus text file rewritten every interval; None disables it.
+            port (int): Serve the metrics on http://127.0.0.1:<port>/metrics; None disables it.
+            logger (logging.Logger): Destination of the periodic log line.
+        """
+        self.registry = registry if registry is not None else MetricsRegistry.default()
+        self.interval = interval
+        self.file_path = file_path
+        self.port = port
+        self.logger = logger if logger is not None else Logger.get_logger("metrics")
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.server = None
+
+    def start(self):
+        """Starts the export thread and, if a port is set, the HTTP endpoint."""
+        if self.port is not None:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler_class())
+            threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._export_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops exporting after a final dump."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=2)
+            self.thread = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server = None
+
+    def export(self):
+        """Writes one log line and one Prometheus dump."""
+        self.logger.info("metrics %s", json.dumps(self.registry.snapshot(), sort_keys=True))
+        if self.file_path:
+            temporary_path = f"{self.file_path}.tmp"
+            with open(temporary_path, "w") as metrics_file:
+                metrics_file.write(self.registry.to_prometheus())
+            os.replace(temporary_path, self.file_path)
+
+    def _export_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.export()
+        self.export()
+
+    def _handler_class(self):
+        registry = self.registry
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+
+        return MetricsHandler
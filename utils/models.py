@@ -0,0 +1,188 @@
+# models.py
+import hashlib
+import os
+import threading
+import time
+from collections import namedtuple
+
+from utils.logger import Logger
+
+logger = Logger.get_logger("models")
+
+
+DEFAULT_PREDICTOR_PATH = "models/shape_predictor_5_face_landmarks.dat"
+
+# What was loaded and what it cost; memory_bytes is the resident-memory growth during
+# the load, or None where it cannot be measured.
+ModelInfo = namedtuple("ModelInfo", ["key", "path", "sha256", "landmarks", "file_bytes", "load_seconds", "memory_bytes"])
+
+
+class ModelValidationError(ValueError):
+    """A model file is missing, corrupt, or not the model the caller expects."""
+
+
+class ThreadLocalModel:
+    """
+    Callable handle that gives each calling thread its own instance of a model.
+
+    dlib's object detectors must not be called from several threads at once, but
+    they are cheap to create, so every worker thread gets a private copy.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.local = threading.local()
+
+    def get(self):
+        """Returns the calling thread's instance, creating it on first use."""
+        model = getattr(self.local, "model", None)
+        if model is None:
+            model = self.local.model = self.factory()
+        return model
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+
+class ModelRegistry:
+    """
+    Loads each dlib model once per process and shares it between modules.
+
+    dlib is imported on first use, so importing this module is cheap and the
+    multi-second model load can happen in the background after the GUI is up.
+    Predictor files are checked against an expected SHA-256 (passed in, or from a
+    "<model>.sha256" file next to it) and the predictor's landmark count.
+    """
+
+    models = {}
+    info = {}
+    lock = threading.Lock()
+
+    @staticmethod
+    def face_detector():
+        """Returns the shared HOG frontal face detector handle, safe to call from any thread."""
+        def load(dlib):
+            detector = ThreadLocalModel(dlib.get_frontal_face_detector)
+            detector.get()  # Create the loading thread's copy so the load is measured
+            return detector, None, None
+
+        return ModelRegistry._get("face_detector", load)
+
+    @staticmethod
+    def shape_predictor(path=DEFAULT_PREDICTOR_PATH, expected_landmarks=None, expected_sha256=None):
+        """
+        Returns the shared landmark predictor loaded from `path`.
+
+        A dlib shape predictor may be used from several threads at once, so the same
+        instance is handed to every caller.
+
+        Args:
+            path (str): Predictor .dat file.
+            expected_landmarks (int): Required number of landmarks, e.g. 5 or 68.
+            expected_sha256 (str): Required file checksum; read from "<path>.sha256" if not given.
+
+        Raises:
+            ModelValidationError: If the file is missing or fails a check.
+        """
+        def load(dlib):
+            if not os.path.isfile(path):
+                raise ModelValidationError(f"Landmark model not found: {path}")
+            checksum = ModelRegistry.checksum(path)
+            expected = expected_sha256 or ModelRegistry._sidecar_checksum(path)
+            if expected and checksum != expected.lower():
+                raise ModelValidationError(f"Checksum mismatch for {path}: expected {expected}, got {checksum}")
+            predictor = dlib.shape_predictor(path)
+            return predictor, checksum, predictor.num_parts
+
+        key = f"shape_predictor:{path}"
+        predictor = ModelRegistry._get(key, load, path)
+        landmarks = ModelRegistry.info[key].landmarks
+        if expected_landmarks is not None and landmarks != expected_landmarks:
+            raise ModelValidationError(f"{path} predicts {landmarks} landmarks, expected {expected_landmarks}.")
+        return predictor
+
+    @staticmethod
+    def preload(predictor_path=DEFAULT_PREDICTOR_PATH):
+        """Loads the detector and predictor on a background thread and returns the thread."""
+        def load():
+            try:
+                ModelRegistry.face_detector()
+                ModelRegistry.shape_predictor(predictor_path)
+            except Exception as e:
+                logger.error("Error preloading models: %s", e)
+
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def checksum(path):
+        """Returns the SHA-256 hex digest of a file."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as model_file:
+            for block in iter(lambda: model_file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def report():
+        """Returns the load time, memory and checks of every loaded model."""
+        with ModelRegistry.lock:
+            return [info._asdict() for info in ModelRegistry.info.values()]
+
+    @staticmethod
+    def format_report():
+        """Formats the model report, one line per model."""
+        lines = []
+        for info in ModelRegistry.report():
+            memory = f"{info['memory_bytes'] / 2 ** 20:.1f} MiB" if info["memory_bytes"] is not None else "n/a"
+            landmarks = f", {info['landmarks']} landmarks" if info["landmarks"] is not None else ""
+            lines.append(f"{info['key']}: loaded in {info['load_seconds']:.2f} s, memory {memory}{landmarks}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _get(key, load, path=None):
+        """Returns a cached model, or runs load(dlib) -> (model, sha256, landmarks) once."""
+        model = ModelRegistry.models.get(key)
+        if model is not None:
+            return model
+        with ModelRegistry.lock:  # A second caller waits for the first load instead of repeating it
+            model = ModelRegistry.models.get(key)
+            if model is None:
+                import dlib
+
+                resident_before = _resident_bytes()
+                start_time = time.perf_counter()
+                model, checksum, landmarks = load(dlib)
+                load_seconds = time.perf_counter() - start_time
+                resident_after = _resident_bytes()
+
+                memory_bytes = resident_after - resident_before if resident_before is not None and resident_after is not None else None
+                file_bytes = os.path.getsize(path) if path else None
+                ModelRegistry.info[key] = ModelInfo(key, path, checksum, landmarks, file_bytes, load_seconds, memory_bytes)
+                ModelRegistry.models[key] = model
+                logger.info("Loaded %s in %.2f s.", key, load_seconds)
+        return model
+
+    @staticmethod
+    def _sidecar_checksum(path):
+        sidecar = f"{path}.sha256"
+        if not os.path.isfile(sidecar):
+            return None
+        with open(sidecar) as checksum_file:
+            content = checksum_file.read().split()
+        return content[0] if content else None  # "sha256sum" output: digest then file name
+
+
+def _resident_bytes():
+    """Current resident memory of this process, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
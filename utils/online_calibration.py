@@ -0,0 +1,157 @@
+# online_calibration.py
+import threading
+from collections import deque
+
+import numpy as np
+
+from utils.logger import Logger
+
+logger = Logger.get_logger("online_calibration")
+
+
+class SlidingWindowRls:
+    """
+    Recursive least squares over the most recent samples, pulled toward prior weights.
+
+    Adding a sample and dropping the oldest one are both rank-one updates of the
+    inverse covariance, so each update costs O(k^2) for k features regardless of
+    how long the session runs. The state is rebuilt from the window every `window`
+    updates to stop rounding errors from accumulating.
+    """
+
+    def __init__(self, prior, window=30, prior_strength=4.0):
+        """
+        Initialize the estimator.
+
+        Args:
+            prior (np.ndarray): (k, m) weights used before any samples arrive.
+            window (int): Number of recent samples the fit is based on.
+            prior_strength (float): Weight of the prior, in samples' worth of evidence.
+        """
+        self.prior = np.array(prior, dtype=np.float64)
+        self.window = window
+        self.prior_strength = prior_strength
+        self.samples = deque()
+        self.updates = 0
+        self.weights = self.prior.copy()
+        self.covariance = np.eye(len(self.prior)) / prior_strength
+
+    def add(self, features, targets):
+        """Adds one (features, targets) sample, forgetting the oldest beyond the window."""
+        features = np.asarray(features, dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        self._update(features, targets, 1.0)
+        self.samples.append((features, targets))
+        if len(self.samples) > self.window:
+            self._update(*self.samples.popleft(), -1.0)
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.refresh()
+        return self.weights
+
+    def refresh(self):
+        """Recomputes the weights and covariance directly from the window and prior."""
+        information = self.prior_strength * np.eye(len(self.prior))
+        moment = self.prior_strength * self.prior
+        for features, targets in self.samples:
+            information += np.outer(features, features)
+            moment += np.outer(features, targets)
+        self.covariance = np.linalg.inv(information)
+        self.weights = self.covariance @ moment
+
+    def _update(self, features, targets, sign):
+        """Rank-one update (sign=1) or downdate (sign=-1) via the Sherman-Morrison identity."""
+        projected = self.covariance @ features
+        gain = projected / (sign + features @ projected)
+        self.weights += np.outer(gain, targets - features @ self.weights)
+        self.covariance -= np.outer(gain, projected)
+
+
+class OnlineRecalibrator:
+    """
+    Corrects calibration drift from the clicks the user makes during normal use.
+
+    The tracker reports every mapped gaze point with observe(). When the user puts the
+    cursor on a target by hand and clicks it with a blink, on_click() pairs that
+    position with where the gaze was while the user fixated just before the blink,
+    and refits an affine correction of the mapped point with sliding-window RLS. The
+    click position must not come from the gaze mapping itself, or the fit only learns
+    its own output. correct() applies the current correction with six multiply-adds;
+    clicks further than `max_error` pixels from the gaze are ignored, as the user was
+    probably not looking at the cursor.
+    """
+
+    def __init__(self, window=30, prior_strength=4.0, scale=1000.0, max_error=250.0, fixation=(0.4, 0.05), history=256):
+        """
+        Initialize the recalibrator.
+
+        Args:
+            window (int): Number of recent clicks the correction is fitted to.
+            prior_strength (float): How many clicks' worth of evidence keeps the correction near identity.
+            scale (float): Screen pixels per normalized unit, for a well-conditioned fit.
+            max_error (float): Largest gaze-to-click distance, in pixels, accepted as a sample.
+            fixation (tuple): Gaze is averaged from this many seconds (earliest, latest) before the blink.
+            history (int): Number of recent gaze observations kept.
+        """
+        self.window = window
+        self.prior_strength = prior_strength
+        self.scale = scale
+        self.max_error = max_error
+        self.fixation = fixation
+        self.history = deque(maxlen=history)
+        self.lock = threading.Lock()
+        self.samples_accepted = 0
+        self.samples_rejected = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets all clicks, e.g. after a new calibration is loaded."""
+        with self.lock:
+            self.rls = SlidingWindowRls([[1.0, 0.0], [0.0, 1.0], [0.0, 0.0]], self.window, self.prior_strength)
+            self.coefficients = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+            self.history.clear()
+
+    def observe(self, timestamp, x, y):
+        """Records one mapped (uncorrected) gaze point with its capture timestamp."""
+        with self.lock:
+            self.history.append((timestamp, x, y))
+
+    def correct(self, x, y):
+        """Applies the current correction to a mapped gaze point."""
+        a, b, c, d, e, f = self.coefficients  # Replaced as a whole, so never half-updated
+        return a * x + b * y + c, d * x + e * y + f
+
+    def fixation_point(self, blink_start):
+        """Returns the median gaze point in the fixation window before a blink, or None."""
+        earliest, latest = blink_start - self.fixation[0], blink_start - self.fixation[1]
+        with self.lock:
+            points = [(x, y) for timestamp, x, y in self.history if earliest <= timestamp <= latest]
+        if not points:
+            return None
+        return tuple(np.median(points, axis=0))
+
+    def on_click(self, click_x, click_y, blink_start):
+        """
+        Learns from one click at (click_x, click_y) made by a blink starting at `blink_start`.
+
+        Returns:
+            bool: True if the click was used to update the correction.
+        """
+        gaze = self.fixation_point(blink_start)
+        if gaze is None:
+            return False
+        corrected_x, corrected_y = self.correct(*gaze)
+        if np.hypot(corrected_x - click_x, corrected_y - click_y) > self.max_error:
+            self.samples_rejected += 1
+            logger.debug("Ignoring click at (%d, %d): gaze was at (%.0f, %.0f).", click_x, click_y, corrected_x, corrected_y)
+            return False
+
+        scale = self.scale
+        with self.lock:
+            weights = self.rls.add((gaze[0] / scale, gaze[1] / scale, 1.0), (click_x / scale, click_y / scale))
+            # Weights act on normalized points; fold the scale into the offsets for pixel inputs
+            (a, d), (b, e), (c, f) = weights.tolist()
+            self.coefficients = (a, b, c * scale, d, e, f * scale)
+        self.samples_accepted += 1
+        return True
@@ -0,0 +1,314 @@
+# perception.py
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import dlib
+import numpy as np
+
+from utils.frame_bus import FrameSubscription
+from utils.landmarks import shape_to_array
+from utils.logger import Logger
+from utils.metrics import MetricsRegistry
+from utils.models import DEFAULT_PREDICTOR_PATH, ModelRegistry
+from utils.pipeline import StageLatency
+
+logger = Logger.get_logger("perception")
+
+
+# Immutable per-frame result: face is (left, top, right, bottom) and landmarks is a
+# read-only (N, 2) int array, both None when no face was found.
+PerceptionResult = namedtuple("PerceptionResult", ["frame_index", "timestamp", "image", "gray", "face", "landmarks"])
+
+
+class FaceTracker:
+    """
+    Follows a detected face with a correlation tracker and re-detects only when needed.
+
+    locate() is safe to call from several workers. Only the tracker state is locked:
+    correlation updates run in timestamp order under the lock, while detection runs
+    outside it and its result is kept only if no newer frame was handled meanwhile.
+    """
+
+    def __init__(self, detector, redetect_interval=1.0, min_confidence=7.0, roi_padding=0.5, tracker_factory=None):
+        """
+        Initialize the face tracker.
+
+        Args:
+            detector: dlib face detector used for (re-)detection.
+            redetect_interval (float): Seconds between forced re-detections.
+            min_confidence (float): Correlation tracker peak-to-sidelobe ratio below which the face is re-detected.
+            roi_padding (float): Fraction of the face size added on every side of the re-detection region.
+            tracker_factory (callable): Creates correlation trackers; dlib.correlation_tracker if None.
+        """
+        self.detector = detector
+        self.redetect_interval = redetect_interval
+        self.min_confidence = min_confidence
+        self.roi_padding = roi_padding
+        self.tracker_factory = tracker_factory if tracker_factory is not None else dlib.correlation_tracker
+
+        self.lock = threading.Lock()
+        self.tracker = None
+        self.face = None
+        self.last_detection_time = 0
+        self.last_timestamp = float("-inf")  # Newest frame whose result changed the tracker state
+
+        # Counters for comparing detection modes
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.tracked_frames = 0
+
+    def reset(self):
+        """Forgets the tracked face so the next frame runs full detection."""
+        with self.lock:
+            self._reset()
+
+    def _reset(self):
+        self.tracker = None
+        self.face = None
+
+    def locate(self, gray, timestamp):
+        """
+        Returns the face rectangle for this frame, or None if no face is visible.
+
+        Args:
+            gray (np.ndarray): Grayscale frame.
+            timestamp (float): Capture time of the frame.
+        """
+        with self.lock:
+            if timestamp <= self.last_timestamp:
+                # A worker already moved the tracker past this frame; the newer face is close enough
+                if self.face is not None:
+                    return self.face
+            elif self.tracker is not None and timestamp - self.last_detection_time < self.redetect_interval:
+                confidence = self.tracker.update(gray)
+                position = self.tracker.get_position()
+                face = dlib.rectangle(int(position.left()), int(position.top()), int(position.right()), int(position.bottom()))
+                height, width = gray.shape[:2]
+                self.last_timestamp = timestamp
+                if confidence >= self.min_confidence and face.left() >= 0 and face.top() >= 0 and face.right() < width and face.bottom() < height:
+                    self.tracked_frames += 1
+                    self.face = face
+                    return face
+            last_face = self.face
+
+        # Detection is the slow part and runs unlocked, so workers detect in parallel
+        face = self._detect_in_roi(gray, last_face) if last_face is not None else None
+        full = face is None
+        if full:
+            face = self._detect_full(gray)
+
+        with self.lock:
+            self.roi_detections += last_face is not None
+            self.full_detections += full
+            if timestamp < self.last_timestamp:
+                return face  # A newer frame has already updated the tracker
+            self.last_timestamp = timestamp
+            if face is None:
+                self._reset()
+                return None
+            self.tracker = self.tracker_factory()
+            self.tracker.start_track(gray, face)
+            self.face = face
+            self.last_detection_time = timestamp
+        return face
+
+    def _detect_full(self, gray):
+        """Runs the detector over the whole frame and returns the largest face."""
+        faces = self.detector(gray)
+        if len(faces) == 0:
+            return None
+        return max(faces, key=lambda rect: rect.width() * rect.height())
+
+    def _detect_in_roi(self, gray, around):
+        """Runs the detector inside a padded region around a known face."""
+        height, width = gray.shape[:2]
+        pad_x = int(around.width() * self.roi_padding)
+        pad_y = int(around.height() * self.roi_padding)
+        left, top = max(0, around.left() - pad_x), max(0, around.top() - pad_y)
+        right, bottom = min(width, around.right() + pad_x), min(height, around.bottom() + pad_y)
+        if right <= left or bottom <= top:
+            return None
+
+        faces = self.detector(gray[top:bottom, left:right])
+        if len(faces) == 0:
+            return None
+        face = max(faces, key=lambda rect: rect.width() * rect.height())
+        return dlib.rectangle(face.left() + left, face.top() + top, face.right() + left, face.bottom() + top)
+
+
+class PerceptionStage:
+    """Runs face detection and landmark prediction once per frame for every consumer."""
+
+    def __init__(self, frame_bus, detector=None, predictor=None, predictor_path=DEFAULT_PREDICTOR_PATH, mode="detect", workers=1,
+                 metrics=None):
+        """
+        Initialize the perception stage.
+
+        Args:
+            frame_bus (FrameBus): Source of captured frames.
+            detector: Optional dlib face detector to share with other modules.
+            predictor: Optional dlib shape predictor to share with other modules.
+            predictor_path (str): Model loaded when no predictor is supplied.
+            mode (str): "detect" runs full-frame detection every frame; "track" follows the
+                face with a FaceTracker between re-detections.
+            workers (int): Frames processed concurrently. dlib releases the GIL, so more than
+                one worker raises throughput when detection is the slowest stage. A lossless
+                frame bus (deterministic replay) always uses one worker, so results don't
+                depend on thread timing.
+            metrics (MetricsRegistry): Registry for the frame error counter; the default registry if None.
+        """
+        self.frame_bus = frame_bus
+        self.detector = detector if detector is not None else ModelRegistry.face_detector()
+        self.predictor = predictor if predictor is not None else ModelRegistry.shape_predictor(predictor_path)
+        self.face_tracker = FaceTracker(self.detector) if mode == "track" else None
+        self.workers = max(1, workers)
+        self.lossless = frame_bus is not None and frame_bus.lossless  # Every frame in order, with backpressure
+        self.latency = StageLatency("detect")
+        metrics = metrics if metrics is not None else MetricsRegistry.default()
+        self.frame_errors = metrics.counter("perception_errors", "Frames whose detection or landmarks raised an error.")
+        self.last_published_index = -1
+
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        self.frame_subscription = None
+        self.worker_thread = None
+        self.running = False
+
+    def process(self, gray, frame_index=0, timestamp=None, image=None):
+        """
+        Detects the largest face in a grayscale frame and predicts its landmarks.
+
+        Returns:
+            PerceptionResult: The detection result for this frame.
+        """
+        timestamp = timestamp if timestamp is not None else time.monotonic()
+        if self.face_tracker is not None:
+            face = self.face_tracker.locate(gray, timestamp)  # Locks only its own state, so workers overlap
+        else:
+            faces = self.detector(gray)
+            face = max(faces, key=lambda rect: rect.width() * rect.height()) if len(faces) else None
+        if face is None:
+            return PerceptionResult(frame_index, timestamp, image, gray, None, None)
+
+        shape = self.predictor(gray, face)
+        # Each result owns its landmarks: consumers keep published results across frames,
+        # so a buffer reused per worker would be overwritten under them
+        landmarks = shape_to_array(shape)
+        landmarks.flags.writeable = False
+        face_box = (face.left(), face.top(), face.right(), face.bottom())
+        return PerceptionResult(frame_index, timestamp, image, gray, face_box, landmarks)
+
+    def subscribe(self, capacity=2):
+        """Registers a new consumer of perception results."""
+        subscription = FrameSubscription(self, capacity, self.lossless)
+        with self.lock:
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Removes a consumer of perception results."""
+        with self.lock:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def is_running(self):
+        """Returns True while results are being produced."""
+        return self.running
+
+    def start(self):
+        """
+        Starts the frame bus (if needed) and the perception thread.
+
+        Returns:
+            bool: True if the stage is running.
+        """
+        if self.running:
+            return True
+        self.frame_subscription = self.frame_bus.subscribe(capacity=1)
+        if not self.frame_bus.start():
+            self.frame_subscription.close()
+            return False
+
+        self.running = True
+        self.last_published_index = -1
+        self.worker_thread = threading.Thread(target=self._perception_loop, daemon=True)
+        self.worker_thread.start()
+        return True
+
+    def stop(self):
+        """Stops the perception thread."""
+        self.running = False
+        if self.worker_thread and self.worker_thread is not threading.current_thread():
+            self.worker_thread.join(timeout=2)
+        self.worker_thread = None
+
+    def publish(self, result):
+        """Delivers a result to every subscriber, dropping it if a newer frame was already published."""
+        with self.lock:
+            if result.frame_index <= self.last_published_index:
+                return
+            self.last_published_index = result.frame_index
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            subscription.push(result)
+
+    def _process_frame(self, frame):
+        """Processes one frame, records its latency and publishes the result."""
+        start_time = time.perf_counter()
+        result = self.process(frame.gray, frame.index, frame.timestamp, frame.image)
+        self.latency.record_since(start_time)
+        self.publish(result)
+
+    def _report_error(self, frame, error):
+        """Logs and counts a frame that failed; the loop carries on with the next frame."""
+        self.frame_errors.inc()
+        logger.error("Error processing frame %d: %s", frame.index, error, exc_info=error)
+
+    def _frame_done(self, future, frame, free_workers):
+        """Worker completion callback: reports a failed frame and frees the worker."""
+        try:
+            error = future.exception()
+            if error is not None:
+                self._report_error(frame, error)
+        finally:
+            free_workers.release()
+
+    def _perception_loop(self):
+        """Processes the newest frame from the bus until stopped or the bus ends."""
+        workers = 1 if self.lossless else self.workers
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        free_workers = threading.BoundedSemaphore(workers)
+        try:
+            while self.running:
+                # Wait for a free worker first, so the frame taken below is the newest one
+                if not free_workers.acquire(timeout=1.0):
+                    continue
+                frame = self.frame_subscription.get_latest(timeout=1.0)
+                if frame is None:
+                    free_workers.release()
+                    if not self.frame_bus.is_running():
+                        break
+                    continue
+
+                # A failing frame is reported the same way on either path and never ends the loop
+                if executor is None:
+                    try:
+                        self._process_frame(frame)
+                    except Exception as e:
+                        self._report_error(frame, e)
+                    finally:
+                        free_workers.release()
+                else:
+                    future = executor.submit(self._process_frame, frame)
+                    future.add_done_callback(lambda done, frame=frame: self._frame_done(done, frame, free_workers))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            self.running = False
+            self.frame_subscription.close()
+            with self.lock:
+                subscriptions = list(self.subscriptions)
+            for subscription in subscriptions:
+                subscription.mark_closed()
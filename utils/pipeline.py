@@ -0,0 +1,164 @@
+# pipeline.py
+import threading
+import time
+
+from utils.logger import Logger
+from utils.metrics import LatencyHistogram
+
+logger = Logger.get_logger("pipeline")
+
+
+class StageLatency:
+    """Tracks the latency of one pipeline stage with constant-size state."""
+
+    def __init__(self, name, smoothing=0.1):
+        """
+        Initialize the latency tracker.
+
+        Args:
+            name (str): Stage name used in reports.
+            smoothing (float): Weight of the newest sample in the moving average.
+        """
+        self.name = name
+        self.smoothing = smoothing
+        self.lock = threading.Lock()  # Parallel perception workers record into the same stage
+        self.count = 0
+        self.last = 0.0
+        self.mean = 0.0
+        self.max = 0.0
+        self.histogram = LatencyHistogram()
+
+    def record(self, seconds):
+        """Adds one latency sample, in seconds."""
+        with self.lock:
+            self.count += 1
+            self.last = seconds
+            self.mean = seconds if self.count == 1 else self.mean + self.smoothing * (seconds - self.mean)
+            self.max = max(self.max, seconds)
+            self.histogram.record(seconds)
+
+    def record_since(self, start_time):
+        """Adds the time elapsed since a time.perf_counter() start value."""
+        self.record(time.perf_counter() - start_time)
+
+    def summary(self):
+        """Returns the stage statistics in milliseconds."""
+        return {
+            "stage": self.name,
+            "count": self.count,
+            "last_ms": self.last * 1000,
+            "mean_ms": self.mean * 1000,
+            "max_ms": self.max * 1000,
+            "p95_ms": self.histogram.percentile(0.95) * 1000,
+        }
+
+
+def format_latency_report(stages):
+    """
+    Formats latency statistics for a list of stages, marking the slowest one.
+
+    Args:
+        stages (list): StageLatency objects in pipeline order.
+
+    Returns:
+        str: One line per stage.
+    """
+    active = [stage for stage in stages if stage.count]
+    slowest = max(active, key=lambda stage: stage.mean) if active else None
+    lines = []
+    for stage in active:
+        marker = " <- slowest" if stage is slowest else ""
+        lines.append(f"{stage.name:>16}: mean {stage.mean * 1000:6.2f} ms, max {stage.max * 1000:6.2f} ms, n={stage.count}{marker}")
+    return "\n".join(lines)
+
+
+class LatestSlot:
+    """Bounded single-item queue between two stages: a newer item replaces the pending one."""
+
+    def __init__(self):
+        self.item = None
+        self.has_item = False
+        self.closed = False
+        self.replaced = 0
+        self.condition = threading.Condition()
+
+    def put(self, item):
+        """Stores an item, replacing any item the consumer has not taken yet."""
+        with self.condition:
+            if self.has_item:
+                self.replaced += 1
+            self.item = item
+            self.has_item = True
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """Takes the pending item, or returns None on timeout or once closed."""
+        with self.condition:
+            if not self.has_item and not self.closed:
+                self.condition.wait(timeout)
+            if not self.has_item:
+                return None
+            item, self.item, self.has_item = self.item, None, False
+            return item
+
+    def close(self):
+        """Wakes the consumer and stops accepting a wait."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class FixedRateWorker:
+    """Runs a handler on its own thread at a fixed rate with the newest item from a LatestSlot."""
+
+    def __init__(self, name, slot, handler, rate_hz=60):
+        """
+        Initialize the worker.
+
+        Args:
+            name (str): Stage name used for latency reporting.
+            slot (LatestSlot): Source of work items.
+            handler (callable): Called with each item taken from the slot.
+            rate_hz (float): Maximum number of handler calls per second.
+        """
+        self.slot = slot
+        self.handler = handler
+        self.interval = 1.0 / rate_hz
+        self.latency = StageLatency(name)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        """Starts the worker thread."""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the worker thread."""
+        self.running = False
+        self.slot.close()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+        self.thread = None
+
+    def _loop(self):
+        """Waits for work, runs the handler, then sleeps out the rest of the period."""
+        next_time = time.perf_counter()
+        while self.running:
+            item = self.slot.get(timeout=0.5)
+            if item is None:
+                continue
+            start_time = time.perf_counter()
+            try:
+                self.handler(item)
+            except Exception as e:
+                logger.error("Error in %s stage: %s", self.latency.name, e)
+            self.latency.record_since(start_time)
+
+            next_time = max(next_time + self.interval, time.perf_counter())
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
@@ -0,0 +1,109 @@
+# pupil.py
+import cv2
+import numpy as np
+
+
+class PupilLocator:
+    """
+    Finds the pupil in a small, roll- and scale-normalized crop of each eye.
+
+    Each eye is resampled into a fixed crop aligned with its corner-to-corner axis, so
+    the search costs the same at any face size, and all working images are allocated
+    once. The pupil is the darkness-weighted centroid of the pixels well below the
+    crop's mean intensity, inside an ellipse that leaves out the corners and lashes.
+    A dark region much longer than it is tall is the lash line of a closed eye, not
+    a pupil, and is rejected.
+    """
+
+    def __init__(self, crop_width=48, crop_height=24, margin=1.2, darkness=0.4, min_roundness=0.3):
+        """
+        Initialize the locator.
+
+        Args:
+            crop_width (int): Width of the eye crop in pixels.
+            crop_height (int): Height of the eye crop in pixels.
+            margin (float): Crop width as a multiple of the corner-to-corner distance.
+            darkness (float): Pixels darker than min + darkness * (mean - min) count as pupil.
+            min_roundness (float): Smallest ratio of the dark region's minor to major axis
+                (from its second moments) accepted as a pupil; a full disc is 1.
+        """
+        self.size = (crop_width, crop_height)
+        self.margin = margin
+        self.darkness = darkness
+        self.min_roundness = min_roundness
+        self.crop = np.empty((crop_height, crop_width), dtype=np.uint8)
+        self.blurred = np.empty_like(self.crop)
+        self.weights = np.empty_like(self.crop)
+        self.mask = np.zeros_like(self.crop)
+        cv2.ellipse(self.mask, (crop_width // 2, crop_height // 2), (int(crop_width * 0.45), int(crop_height * 0.45)), 0, 0, 360, 255, -1)
+        self.transform = np.empty((2, 3), dtype=np.float64)
+
+    def locate(self, gray, corner_a, corner_b):
+        """
+        Locates the pupil of one eye.
+
+        Args:
+            gray (np.ndarray): Grayscale frame.
+            corner_a: (x, y) of one eye corner.
+            corner_b: (x, y) of the other eye corner.
+
+        Returns:
+            tuple: ((box_x, box_y), (image_x, image_y)), or None if no pupil is visible.
+                box_x and box_y are the pupil position relative to the crop center, in
+                units of the crop width, with x toward image right and y toward image bottom.
+        """
+        (ax, ay), (bx, by) = corner_a, corner_b
+        axis_x, axis_y = float(bx - ax), float(by - ay)
+        if axis_x < 0:  # Keep the crop upright whichever corner comes first
+            axis_x, axis_y = -axis_x, -axis_y
+        width = (axis_x * axis_x + axis_y * axis_y) ** 0.5
+        if width < 4:
+            return None
+
+        # Crop-to-image transform: rotate the crop's x axis onto the eye axis and scale
+        crop_width, crop_height = self.size
+        scale = width * self.margin / crop_width
+        cos, sin = axis_x / width * scale, axis_y / width * scale
+        center_x, center_y = (ax + bx) / 2.0, (ay + by) / 2.0
+        transform = self.transform
+        transform[0] = (cos, -sin, center_x - cos * crop_width / 2.0 + sin * crop_height / 2.0)
+        transform[1] = (sin, cos, center_y - sin * crop_width / 2.0 - cos * crop_height / 2.0)
+        cv2.warpAffine(gray, transform, self.size, dst=self.crop, flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                       borderMode=cv2.BORDER_REPLICATE)
+
+        # Darkness above a threshold between the darkest and the mean intensity
+        cv2.GaussianBlur(self.crop, (5, 5), 0, dst=self.blurred)
+        lowest, _, _, _ = cv2.minMaxLoc(self.blurred, self.mask)
+        mean = cv2.mean(self.blurred, self.mask)[0]
+        if mean - lowest < 8:  # No contrast: closed eye or blown-out crop
+            return None
+        cv2.subtract(lowest + self.darkness * (mean - lowest), self.blurred, dst=self.weights)  # Saturates at 0
+        cv2.bitwise_and(self.weights, self.mask, dst=self.weights)
+
+        moments = cv2.moments(self.weights)
+        if moments["m00"] <= 0:
+            return None
+        # Eigenvalues of the second-moment matrix are the squared axis lengths, up to scale
+        half_sum = (moments["mu20"] + moments["mu02"]) / 2.0
+        half_difference = (moments["mu20"] - moments["mu02"]) / 2.0
+        spread = (half_difference * half_difference + moments["mu11"] * moments["mu11"]) ** 0.5
+        if half_sum - spread < self.min_roundness * self.min_roundness * (half_sum + spread):  # Lash line of a closed eye
+            return None
+        pupil_x, pupil_y = moments["m10"] / moments["m00"], moments["m01"] / moments["m00"]
+        image_x = transform[0, 0] * pupil_x + transform[0, 1] * pupil_y + transform[0, 2]
+        image_y = transform[1, 0] * pupil_x + transform[1, 1] * pupil_y + transform[1, 2]
+        box = ((pupil_x - crop_width / 2.0) / crop_width, (pupil_y - crop_height / 2.0) / crop_width)
+        return box, (float(image_x), float(image_y))
+
+    def locate_both(self, gray, corners):
+        """
+        Locates both pupils.
+
+        Args:
+            gray (np.ndarray): Grayscale frame.
+            corners (np.ndarray): (2, 2, 2) [left, right] x [corner] x [x, y] eye corners.
+
+        Returns:
+            list: [left, right] results of locate(), None for an eye without a visible pupil.
+        """
+        return [self.locate(gray, eye[0], eye[1]) for eye in corners]
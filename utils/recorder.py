@@ -0,0 +1,220 @@
+# recorder.py
+import json
+import os
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+class FrameRecorder:
+    """
+    Records grayscale frames and their capture timestamps to disk.
+
+    A recording is a directory holding raw uint8 chunk files of `chunk_frames` frames
+    each (memory-mappable with np.memmap), a raw float64 file of capture timestamps,
+    and an index.json describing the frame size and chunk layout.
+    """
+
+    def __init__(self, directory, chunk_frames=300):
+        """
+        Initialize the recorder.
+
+        Args:
+            directory (str): Output directory; created if needed.
+            chunk_frames (int): Number of frames per chunk file.
+        """
+        self.directory = directory
+        self.chunk_frames = chunk_frames
+        self.frame_shape = None
+        self.frame_count = 0
+        self.chunk_file = None
+        self.timestamp_file = None
+        self.subscription = None
+        self.thread = None
+        self.running = False
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, gray, timestamp):
+        """Appends one grayscale frame and its capture timestamp."""
+        if self.frame_shape is None:
+            self.frame_shape = gray.shape[:2]
+            self.timestamp_file = open(os.path.join(self.directory, "timestamps.f64"), "wb")
+        elif gray.shape[:2] != self.frame_shape:
+            raise ValueError(f"Frame size changed from {self.frame_shape} to {gray.shape[:2]} during recording.")
+
+        if self.frame_count % self.chunk_frames == 0:
+            if self.chunk_file is not None:
+                self.chunk_file.close()
+            chunk_name = f"chunk_{self.frame_count // self.chunk_frames:05d}.raw"
+            self.chunk_file = open(os.path.join(self.directory, chunk_name), "wb")
+
+        self.chunk_file.write(np.ascontiguousarray(gray, dtype=np.uint8).tobytes())
+        self.timestamp_file.write(np.float64(timestamp).tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        """Flushes the files and writes the index."""
+        for handle in (self.chunk_file, self.timestamp_file):
+            if handle is not None:
+                handle.close()
+        self.chunk_file = self.timestamp_file = None
+
+        index = {
+            "version": 1,
+            "frame_count": self.frame_count,
+            "height": self.frame_shape[0] if self.frame_shape else 0,
+            "width": self.frame_shape[1] if self.frame_shape else 0,
+            "chunk_frames": self.chunk_frames,
+            "dtype": "uint8",
+        }
+        with open(os.path.join(self.directory, "index.json"), "w") as index_file:
+            json.dump(index, index_file, indent=2)
+
+    def start(self, frame_bus):
+        """Records every frame published on a frame bus on a background thread."""
+        self.subscription = frame_bus.subscribe(capacity=30)
+        self.running = True
+        self.thread = threading.Thread(target=self._record_loop, args=(frame_bus,), daemon=True)
+        self.thread.start()
+        return frame_bus.start()
+
+    def stop(self):
+        """Stops recording and finalizes the recording directory."""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+            self.thread = None
+
+    def _record_loop(self, frame_bus):
+        try:
+            while self.running:
+                frame = self.subscription.get(timeout=0.5)
+                if frame is None:
+                    if not frame_bus.is_running():
+                        break
+                    continue
+                self.write(frame.gray, frame.timestamp)
+        finally:
+            self.subscription.close()
+            self.close()
+
+
+class ReplaySource:
+    """Plays a FrameRecorder recording through the cv2.VideoCapture read/isOpened/release interface."""
+
+    def __init__(self, directory, realtime=False, loop=False):
+        """
+        Initialize the replay source.
+
+        Args:
+            directory (str): Recording directory written by FrameRecorder.
+            realtime (bool): Pace frames by their recorded timestamps; otherwise replay at maximum speed.
+            loop (bool): Restart from the first frame after the last one.
+        """
+        self.directory = directory
+        self.realtime = realtime
+        self.loop = loop
+
+        with open(os.path.join(directory, "index.json")) as index_file:
+            self.index = json.load(index_file)
+        self.frame_count = self.index["frame_count"]
+        self.chunk_frames = self.index["chunk_frames"]
+        self.frame_shape = (self.index["height"], self.index["width"])
+        self.timestamps = np.fromfile(os.path.join(directory, "timestamps.f64"), dtype=np.float64, count=self.frame_count)
+
+        self.chunks = {}
+        self.position = 0
+        self.opened = self.frame_count > 0
+        self.start_time = None
+        self.timestamp = None  # Capture timestamp of the last frame read, on this process's clock
+
+    def isOpened(self):
+        return self.opened
+
+    def get_frame(self, frame_index):
+        """Returns a read-only view of one recorded frame without copying it."""
+        chunk_index, offset = divmod(frame_index, self.chunk_frames)
+        chunk = self.chunks.get(chunk_index)
+        if chunk is None:
+            chunk_path = os.path.join(self.directory, f"chunk_{chunk_index:05d}.raw")
+            chunk = np.memmap(chunk_path, dtype=np.uint8, mode="r").reshape(-1, *self.frame_shape)
+            self.chunks[chunk_index] = chunk
+        return chunk[offset]
+
+    def read(self):
+        """Returns (True, gray_frame) for the next frame, or (False, None) at the end."""
+        if not self.opened:
+            return False, None
+        if self.position >= self.frame_count:
+            if not self.loop:
+                return False, None
+            self.position = 0
+            self.start_time = None
+
+        # Recorded timestamps are rebased onto this process's monotonic clock
+        offset = self.timestamps[self.position] - self.timestamps[0]
+        if self.start_time is None:
+            self.start_time = time.monotonic()
+        if self.realtime:
+            delay = self.start_time + offset - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.timestamp = self.start_time + offset
+
+        frame = self.get_frame(self.position)
+        self.position += 1
+        return True, frame
+
+    def get(self, prop_id):
+        """Supports the frame size and count properties of cv2.VideoCapture.get."""
+        if prop_id == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.frame_shape[1])
+        if prop_id == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frame_shape[0])
+        if prop_id == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frame_count)
+        return 0.0
+
+    def release(self):
+        self.chunks.clear()
+        self.opened = False
+
+
+def open_capture(source, realtime=True):
+    """
+    Opens a camera index or a recording directory.
+
+    Args:
+        source (int or str): Camera device index, or the path of a FrameRecorder recording.
+        realtime (bool): Pace replayed frames by their recorded timestamps.
+
+    Returns:
+        An object with the cv2.VideoCapture read/isOpened/release interface.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        return ReplaySource(source, realtime=realtime)
+    return cv2.VideoCapture(source)
+
+
+# Record a session from a camera for later replay:
+# python -m utils.recorder recordings/session1 --device 0 --seconds 30
+if __name__ == "__main__":
+    import argparse
+    from utils.frame_bus import FrameBus
+
+    parser = argparse.ArgumentParser(description="Record grayscale camera frames for offline replay.")
+    parser.add_argument("directory", help="Output recording directory.")
+    parser.add_argument("--device", type=int, default=0, help="Camera device index.")
+    parser.add_argument("--seconds", type=float, default=30.0, help="Recording length.")
+    args = parser.parse_args()
+
+    bus = FrameBus(args.device)
+    recorder = FrameRecorder(args.directory)
+    if recorder.start(bus):
+        print(f"Recording {args.seconds:.0f} s from camera {args.device} to {args.directory}...")
+        time.sleep(args.seconds)
+        bus.stop()
+    recorder.stop()
+    print(f"Recorded {recorder.frame_count} frames.")
@@ -0,0 +1,227 @@
+# smoothing.py
+import math
+import time
+
+
+class FilterMetrics:
+    """Running latency, jitter and lag figures for a cursor filter, in O(1) state."""
+
+    def __init__(self, smoothing=0.05):
+        self.smoothing = smoothing
+        self.count = 0
+        self.update_time = 0.0  # Seconds spent per update
+        self.raw_jitter = 0.0  # Pixels moved per update before filtering
+        self.jitter = 0.0  # Pixels moved per update after filtering
+        self.lag = 0.0  # Pixels between the raw and the filtered point
+        self.last_raw = None
+        self.last_output = None
+
+    def _average(self, current, sample):
+        return sample if self.count == 1 else current + self.smoothing * (sample - current)
+
+    def record(self, raw, output, update_time):
+        """Adds one filter update."""
+        self.count += 1
+        self.update_time = self._average(self.update_time, update_time)
+        self.lag = self._average(self.lag, math.hypot(raw[0] - output[0], raw[1] - output[1]))
+        if self.last_raw is not None:
+            self.raw_jitter = self._average(self.raw_jitter, math.hypot(raw[0] - self.last_raw[0], raw[1] - self.last_raw[1]))
+            self.jitter = self._average(self.jitter, math.hypot(output[0] - self.last_output[0], output[1] - self.last_output[1]))
+        self.last_raw, self.last_output = raw, output
+
+    def summary(self):
+        """Returns the metrics as a dictionary."""
+        return {
+            "updates": self.count,
+            "update_us": self.update_time * 1e6,
+            "raw_jitter_px": self.raw_jitter,
+            "jitter_px": self.jitter,
+            "lag_px": self.lag,
+        }
+
+
+class CursorFilter:
+    """Base class for 2D cursor filters that sit between gaze mapping and cursor output."""
+
+    name = "none"
+
+    def __init__(self):
+        self.metrics = FilterMetrics()
+
+    def filter(self, x, y, timestamp):
+        """
+        Filters one screen point.
+
+        Args:
+            x (float): Raw screen x coordinate.
+            y (float): Raw screen y coordinate.
+            timestamp (float): Capture time of the sample, in seconds.
+
+        Returns:
+            tuple: The filtered (x, y).
+        """
+        start_time = time.perf_counter()
+        output = self.update(x, y, timestamp)
+        self.metrics.record((x, y), output, time.perf_counter() - start_time)
+        return output
+
+    def update(self, x, y, timestamp):
+        """Computes the filtered point; overridden by each filter."""
+        return x, y
+
+    def reset(self):
+        """Forgets the filter state, e.g. after the face was lost."""
+
+
+class ExponentialFilter(CursorFilter):
+    """Exponential moving average with a fixed smoothing factor."""
+
+    name = "exponential"
+
+    def __init__(self, alpha=0.5):
+        super().__init__()
+        self.alpha = alpha
+        self.state = None
+
+    def update(self, x, y, timestamp):
+        if self.state is None:
+            self.state = (x, y)
+        else:
+            self.state = (self.state[0] + self.alpha * (x - self.state[0]), self.state[1] + self.alpha * (y - self.state[1]))
+        return self.state
+
+    def reset(self):
+        self.state = None
+
+
+class OneEuroFilter(CursorFilter):
+    """One-Euro filter: heavy smoothing while the gaze rests, little lag while it moves."""
+
+    name = "one_euro"
+
+    def __init__(self, min_cutoff=1.0, beta=0.01, derivative_cutoff=1.0):
+        """
+        Initialize the filter.
+
+        Args:
+            min_cutoff (float): Cutoff frequency (Hz) at rest; lower is smoother.
+            beta (float): How fast the cutoff rises with speed; higher means less lag.
+            derivative_cutoff (float): Cutoff frequency (Hz) for the speed estimate.
+        """
+        super().__init__()
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.reset()
+
+    @staticmethod
+    def _alpha(cutoff, period):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / period)
+
+    def update(self, x, y, timestamp):
+        if self.last_timestamp is None:
+            self.last_timestamp = timestamp
+            self.x, self.y = x, y
+            return x, y
+
+        period = max(timestamp - self.last_timestamp, 1e-6)
+        self.last_timestamp = timestamp
+
+        # Smoothed speed, then a cutoff that grows with it
+        derivative_alpha = self._alpha(self.derivative_cutoff, period)
+        self.dx += derivative_alpha * ((x - self.x) / period - self.dx)
+        self.dy += derivative_alpha * ((y - self.y) / period - self.dy)
+        cutoff = self.min_cutoff + self.beta * math.hypot(self.dx, self.dy)
+
+        alpha = self._alpha(cutoff, period)
+        self.x += alpha * (x - self.x)
+        self.y += alpha * (y - self.y)
+        return self.x, self.y
+
+    def reset(self):
+        self.last_timestamp = None
+        self.x = self.y = 0.0
+        self.dx = self.dy = 0.0
+
+
+class KalmanFilter(CursorFilter):
+    """Constant-velocity Kalman filter, run independently on each axis."""
+
+    name = "kalman"
+
+    def __init__(self, process_noise=50000.0, measurement_noise=100.0):
+        """
+        Initialize the filter.
+
+        Args:
+            process_noise (float): Acceleration variance (px^2/s^4); higher follows faster.
+            measurement_noise (float): Gaze measurement variance (px^2); higher smooths more.
+        """
+        super().__init__()
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def _update_axis(self, state, measurement, period):
+        """Predicts and corrects one axis; state is [position, velocity, p00, p01, p11]."""
+        position, velocity, p00, p01, p11 = state
+
+        # Predict
+        position += velocity * period
+        q = self.process_noise
+        p00 += period * (2 * p01 + period * p11) + q * period ** 4 / 4
+        p01 += period * p11 + q * period ** 3 / 2
+        p11 += q * period ** 2
+
+        # Correct
+        innovation = measurement - position
+        gain_denominator = p00 + self.measurement_noise
+        k0, k1 = p00 / gain_denominator, p01 / gain_denominator
+        position += k0 * innovation
+        velocity += k1 * innovation
+        p11 -= k1 * p01
+        p01 -= k0 * p01
+        p00 -= k0 * p00
+        return [position, velocity, p00, p01, p11]
+
+    def update(self, x, y, timestamp):
+        if self.last_timestamp is None:
+            self.last_timestamp = timestamp
+            self.x_state = [x, 0.0, self.measurement_noise, 0.0, self.measurement_noise]
+            self.y_state = [y, 0.0, self.measurement_noise, 0.0, self.measurement_noise]
+            return x, y
+
+        period = max(timestamp - self.last_timestamp, 1e-6)
+        self.last_timestamp = timestamp
+        self.x_state = self._update_axis(self.x_state, x, period)
+        self.y_state = self._update_axis(self.y_state, y, period)
+        return self.x_state[0], self.y_state[0]
+
+    def reset(self):
+        self.last_timestamp = None
+        self.x_state = self.y_state = None
+
+
+FILTERS = {
+    CursorFilter.name: CursorFilter,
+    ExponentialFilter.name: ExponentialFilter,
+    OneEuroFilter.name: OneEuroFilter,
+    KalmanFilter.name: KalmanFilter,
+}
+
+
+def create_filter(name="one_euro", **params):
+    """
+    Creates a cursor filter by name.
+
+    Args:
+        name (str): One of "none", "exponential", "one_euro" or "kalman".
+        **params: Filter-specific tuning parameters.
+
+    Returns:
+        CursorFilter: The new filter.
+    """
+    if name not in FILTERS:
+        raise ValueError(f"Unknown cursor filter '{name}'. Choose from: {', '.join(FILTERS)}")
+    return FILTERS[name](**params)
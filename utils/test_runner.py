@@ -1,5 +1,9 @@
 import os
 import subprocess
+import sys
+from utils.logger import Logger
+
+logger = Logger.get_logger("test_runner")
 
 
 class TestRunner:
@@ -21,7 +25,7 @@ class TestRunner:
         """Scans the test directory for Python test files starting with 'test_'."""
         if not os.path.exists(self.test_dir):
             os.makedirs(self.test_dir, exist_ok=True)
-            print(f"Created test directory: {self.test_dir}")
+            logger.info("Created test directory: %s", self.test_dir)
         return [f for f in os.listdir(self.test_dir) if f.startswith("test_") and f.endswith(".py")]
 
     def run_test(self, test_file):
@@ -42,6 +46,23 @@ class TestRunner:
         except Exception as e:
             self.log_output(f"Error running test {test_file}: {e}")
 
+    def run_benchmark(self, output_file=None):
+        """Runs the pipeline benchmark suite and logs its report."""
+        command = [sys.executable, "-m", "utils.benchmark"]
+        if output_file:
+            command += ["--output", output_file]
+
+        try:
+            self.log_output("Running benchmarks")
+            self.log_output("-" * 50)
+            result = subprocess.run(command, capture_output=True, text=True)
+            self.log_output(result.stdout)
+            if result.stderr:
+                self.log_output(f"Errors:\n{result.stderr}")
+            self.log_output(f"{'-' * 50}\nBenchmarks complete")
+        except Exception as e:
+            self.log_output(f"Error running benchmarks: {e}")
+
     def log_output(self, message):
         """Logs output to the provided widget or prints it to the console."""
         if self.output_widget:
@@ -1,5 +1,9 @@
 from PIL import Image, ImageDraw
 import os
+from utils.logger import Logger
+
+logger = Logger.get_logger("tray_icon")
+
 
 class TrayIcon:
     """Handles tray icon image loading and resizing."""
@@ -27,13 +31,13 @@ class TrayIcon:
                     # Open and resize the image
                     tray_icon = Image.open(icon_path).convert("RGBA")
                     tray_icon = tray_icon.resize(default_size, Image.ANTIALIAS)
-                    print(f"Tray icon loaded: {icon_path}")
+                    logger.info("Tray icon loaded: %s", icon_path)
                     return tray_icon
                 except Exception as e:
-                    print(f"Error loading tray icon {icon_path}: {e}")
+                    logger.error("Error loading tray icon %s: %s", icon_path, e)
 
         # Fallback: Generate a blank icon if none is found
-        print("No tray icon found. Generating a default blank icon.")
+        logger.info("No tray icon found. Generating a default blank icon.")
         blank_icon = Image.new("RGBA", default_size, (0, 0, 255))  # Blue background
         draw = ImageDraw.Draw(blank_icon)
         draw.ellipse((16, 16, 48, 48), fill=(255, 255, 255))  # Draw a white circle
@@ -1,10 +1,122 @@
 # visualizer.py
+import threading
+
 import cv2
 import numpy as np
 
+from utils.pipeline import FixedRateWorker, LatestSlot
+
 
 class Visualizer:
-    """Utilities for visualizing landmarks and debug information."""
+    """
+    Optional debug render sink, plus static helpers for drawing landmarks and debug information.
+
+    Tracking loops submit their latest perception result and status text; a separate
+    thread draws and shows it at a capped rate, so the loops never wait on the GUI.
+    Modes: "off" (no window, submit() returns immediately), "overlay" (frame with
+    status text) and "full" (also face box, landmarks, eye contours and metrics).
+    """
+
+    MODES = ("off", "overlay", "full")
+
+    def __init__(self, window_name="Eye Tracker", mode="overlay", max_fps=10, metrics=None, eye_indices=()):
+        """
+        Initialize the render sink.
+
+        Args:
+            window_name (str): Title of the debug window.
+            mode (str): One of MODES.
+            max_fps (float): Maximum number of rendered frames per second.
+            metrics (MetricsRegistry): Shown in "full" mode or when toggled with 'm'.
+            eye_indices (tuple): Landmark index lists outlined as eye contours in "full" mode.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown visualizer mode '{mode}'. Choose from: {', '.join(self.MODES)}")
+        self.window_name = window_name
+        self.mode = mode
+        self.max_fps = max_fps
+        self.metrics = metrics
+        self.eye_indices = eye_indices
+        self.show_metrics = False
+        self.quit_requested = threading.Event()  # Set when 'q' is pressed in the window
+        self.worker = None
+        self.window_open = False
+
+    @property
+    def enabled(self):
+        """True when submitted results are rendered."""
+        return self.mode != "off"
+
+    def set_mode(self, mode):
+        """Switches between off, overlay and full debug while running."""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown visualizer mode '{mode}'. Choose from: {', '.join(self.MODES)}")
+        self.mode = mode
+
+    def start(self):
+        """Starts the render thread."""
+        if self.worker is not None:
+            return
+        self.quit_requested.clear()
+        self.worker = FixedRateWorker("render", LatestSlot(), self._render, rate_hz=self.max_fps)
+        self.worker.start()
+
+    def stop(self):
+        """Stops the render thread and closes the window."""
+        if self.worker is not None:
+            self.worker.stop()
+            self.worker = None
+        if self.window_open:
+            cv2.destroyWindow(self.window_name)
+            cv2.waitKey(1)
+            self.window_open = False
+
+    def submit(self, result, status=()):
+        """
+        Hands the latest result to the render thread without copying or drawing.
+
+        Args:
+            result (PerceptionResult): Latest perception result.
+            status (sequence): (text, color) lines drawn in the top-left corner.
+        """
+        if self.mode == "off" or self.worker is None:
+            return
+        self.worker.slot.put((result, status))
+
+    def _render(self, item):
+        result, status = item
+        mode = self.mode
+        if mode == "off":
+            if self.window_open:
+                cv2.destroyWindow(self.window_name)
+                self.window_open = False
+            return
+
+        frame = result.image.copy()  # Results are shared with other consumers
+        for i, (text, color) in enumerate(status):
+            Visualizer.overlay_text(frame, text, (10, 30 + 30 * i), color)
+        if mode == "full":
+            if result.face is not None:
+                left, top, right, bottom = result.face
+                cv2.rectangle(frame, (left, top), (right, bottom), (255, 255, 0), 1)
+            if result.landmarks is not None:
+                for indices in self.eye_indices:
+                    if len(result.landmarks) > max(indices):
+                        Visualizer.draw_eye_region(frame, result.landmarks[indices])
+                for x, y in result.landmarks:
+                    cv2.circle(frame, (int(x), int(y)), 1, (0, 0, 255), -1)
+        if self.metrics is not None and (mode == "full" or self.show_metrics):
+            Visualizer.draw_metrics(frame, self.metrics.overlay_lines(), origin=(10, 30 + 30 * len(status)))
+
+        cv2.imshow(self.window_name, frame)
+        self.window_open = True
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord("q"):
+            self.quit_requested.set()
+        elif key == ord("m"):
+            self.show_metrics = not self.show_metrics
+        elif key == ord("v"):
+            self.mode = "full" if mode == "overlay" else "overlay"
 
     @staticmethod
     def draw_eye_region(frame, eye_region, color=(0, 255, 0)):
@@ -20,3 +132,16 @@ class Visualizer:
     def overlay_text(frame, text, position=(10, 30), color=(0, 255, 0)):
         """Overlays text on the frame."""
         cv2.putText(frame, text, position, cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+
+    @staticmethod
+    def draw_metrics(frame, lines, origin=(10, 90), color=(0, 255, 255)):
+        """Draws metrics lines on a dark background panel."""
+        if not lines:
+            return
+        x, y = origin
+        line_height = 18
+        width = max(cv2.getTextSize(line, cv2.FONT_HERSHEY_SIMPLEX, 0.45, 1)[0][0] for line in lines) + 10
+        panel = frame[y - 15:y - 15 + line_height * len(lines) + 6, x - 5:x - 5 + width]
+        panel[:] = panel // 3  # Darken in place so the text stays readable
+        for i, line in enumerate(lines):
+            cv2.putText(frame, line, (x, y + i * line_height), cv2.FONT_HERSHEY_SIMPLEX, 0.45, color, 1)